@@ -0,0 +1,264 @@
+"""
+File: async_tester.py
+Description: Concurrent asyncio probe engine for LatencyTester sessions,
+    Runs the attempts of many LatencyTester sessions at the same time
+    instead of one blocking request after another.
+    A global in-flight limit and a per-host limit keep it from flooding
+    our own machine or a single server.
+    Results land in each tester's results list, so create_session_row
+    works exactly the same as after run_tests().
+
+Author: William TenCate
+Email: wtencate@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import asyncio
+import ssl
+import time
+from urllib.parse import urlsplit
+
+from latency import dns_cache as dns
+from latency.http_wire import Target, max_redirects, next_hop, parse_headers, parse_status
+from latency.result import Result
+from latency_utils.instrumentation import count, timer
+
+
+async def fetch_status(url, timeout=5, ssl_context=None, dns_cache=None):
+    """
+    Send one GET request to url and return the final status code.
+    Follows redirects and downloads the whole body so the timing lines up
+    with what requests.get measures. Raises on connection errors / timeout.
+    dns_cache: a DnsCache to resolve through instead of the system resolver
+    """
+    return await asyncio.wait_for(_fetch(url, ssl_context, dns_cache), timeout)
+
+
+async def _fetch(url, ssl_context=None, dns_cache=None):
+    for _ in range(max_redirects + 1):
+        status, location = await _get_once(url, ssl_context, dns_cache)
+
+        following = next_hop(url, status, location)
+        if following:
+            url = following
+            continue
+
+        return status
+
+    return status
+
+
+async def _get_once(url, ssl_context=None, dns_cache=None):
+    """
+    One HTTP/1.1 GET over a fresh connection (Connection: close),
+    so every async sample is a cold one.
+    Returns (status_code, location header or None).
+    """
+    target = Target(url)
+    host, port, secure = target.host, target.port, target.secure
+
+    tls = None
+    if secure:
+        tls = ssl_context or ssl.create_default_context()
+
+    if dns_cache is None:
+        reader, writer = await asyncio.open_connection(
+            host, port, ssl=tls, server_hostname=host if secure else None
+        )
+    else:
+        reader, writer = await _open_resolved(dns_cache, host, port, tls)
+
+    try:
+        writer.write(target.request())
+        await writer.drain()
+
+        status = parse_status(await reader.readline())
+
+        lines = []
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            lines.append(line)
+        location, length = parse_headers(lines)
+
+        # download the body like requests.get does
+        if length is not None:
+            await reader.readexactly(length)
+        else:
+            while await reader.read(65536):  # no length, read until close
+                pass
+
+        return status, location
+
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except Exception:
+            pass  # already closed / TLS shutdown errors don't matter here
+
+
+async def _open_resolved(dns_cache, host, port, tls):
+    """
+    open_connection to host's cached addresses, trying each in turn.
+    TLS still checks the certificate against the hostname.
+    """
+    error = None
+    for ip in await dns_cache.resolve_async(host):
+        try:
+            return await asyncio.open_connection(
+                ip, port, ssl=tls, server_hostname=host if tls else None
+            )
+        except OSError as e:
+            error = e
+    raise error
+
+
+class AsyncProbeEngine:
+    """
+    Runs the attempts of many LatencyTester sessions concurrently.
+        max_in_flight: most requests allowed in flight at once (all hosts)
+        per_host: most requests allowed in flight to one host at once
+    """
+
+    def __init__(self, max_in_flight=50, per_host=6, ssl_context=None):
+        if max_in_flight <= 0 or per_host <= 0:
+            raise ValueError("max_in_flight and per_host must be > 0.")
+
+        self.max_in_flight = max_in_flight
+        self.per_host = per_host
+        self.ssl_context = ssl_context
+
+    async def run_async(self, testers):
+        """
+        Run every attempt of every tester, filling in tester.results.
+        Adaptive testers probe one attempt at a time (each needs the ones before
+        it to decide whether to stop), alongside everything else.
+        Open-loop testers run their own schedule and in-flight limit
+        (see open_loop.py), the engine's limits don't apply to them.
+        Raises ValueError for pooled or instrumented testers.
+        """
+        for tester in testers:
+            # the engine speaks raw asyncio sockets: no keep-alive pool to tell cold
+            # from warm, no phase timings, rows would come out wrong without a word
+            if tester.pooled:
+                raise ValueError("Pooled sessions can't run on the async engine, use run_tests().")
+            if tester.instrumented:
+                raise ValueError("Instrumented sessions can't run on the async engine, use run_tests().")
+
+        # look up every target's host before the first request goes out
+        caches = {}
+        for tester in testers:
+            if tester.dns_cache is not None:
+                caches.setdefault(id(tester.dns_cache), (tester.dns_cache, []))[1].append(tester.url)
+        for cache, urls in caches.values():
+            await asyncio.to_thread(cache.preresolve, urls)
+
+        # semaphores have to be made inside the running loop
+        global_limit = asyncio.Semaphore(self.max_in_flight)
+        host_limits = {}
+
+        tasks = []
+        for tester in testers:
+            host = urlsplit(tester.url).hostname or tester.url
+            if host not in host_limits:
+                host_limits[host] = asyncio.Semaphore(self.per_host)
+
+            tester.results.clear()
+            tester.reset_stats()
+
+            if tester.open_loop:
+                from latency.open_loop import run_open_loop_async  # imports this module
+
+                tasks.append(run_open_loop_async(tester, self.ssl_context))
+                continue
+
+            if tester.adaptive:
+                tasks.append(
+                    self._run_adaptive(tester, global_limit, host_limits[host])
+                )
+                continue
+
+            for attempt in range(1, tester.attempts + 1):
+                tasks.append(
+                    self._probe(tester, attempt, global_limit, host_limits[host])
+                )
+
+        results = await asyncio.gather(*tasks)
+
+        # record results on their testers in attempt order
+        # (adaptive and open-loop testers already recorded theirs)
+        results = [pair for pair in results if pair is not None]
+        for tester, result in sorted(results, key=lambda pair: pair[1].attempt):
+            tester.record(result)
+
+        return testers
+
+    def run(self, testers):
+        """
+        Blocking wrapper around run_async for scripts and the notebook.
+        """
+        return asyncio.run(self.run_async(testers))
+
+    async def _run_adaptive(self, tester, global_limit, host_limit):
+        while not tester.done():
+            _, result = await self._probe(
+                tester, tester.recorded + 1, global_limit, host_limit
+            )
+            tester.record(result)
+
+    async def _probe(self, tester, attempt, global_limit, host_limit):
+        # host slot first so a slow host can't hog the global slots
+        async with host_limit:
+            async with global_limit:
+                dns.start_lookups()
+                sent_at = time.time()
+                start = time.perf_counter()
+
+                try:
+                    with timer("engine.request"):
+                        status = await fetch_status(
+                            tester.url, tester.timeout, self.ssl_context, tester.dns_cache
+                        )
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+
+                    # on success
+                    result = Result(
+                        tester.url,
+                        attempt,
+                        elapsed_ms,
+                        status,
+                        True,
+                        reused=False,
+                        timestamp=sent_at,
+                        dns_hit=dns.lookup_hit(),
+                    )
+
+                except Exception:
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+
+                    # on failure
+                    result = Result(
+                        tester.url,
+                        attempt,
+                        elapsed_ms,
+                        None,
+                        False,
+                        reused=False,
+                        timestamp=sent_at,
+                        dns_hit=dns.lookup_hit(),
+                    )
+                    count("engine.failures")
+
+        return tester, result
+
+
+def run_sessions(testers, max_in_flight=50, per_host=6):
+    """
+    Run a list of LatencyTester sessions concurrently and return them.
+    Each tester can then be used with create_session_row as usual.
+    """
+    engine = AsyncProbeEngine(max_in_flight=max_in_flight, per_host=per_host)
+    return engine.run(testers)
@@ -0,0 +1,272 @@
+"""
+File: cli.py
+Description: Command line entry point, the notebook workflow without the notebook,
+    latency probe URL [URL ...]      test URLs and append the sessions to the results file
+    latency analyze [--url/--label]  print overall and per-URL stats
+    latency plot [--output-dir DIR]  save every standard chart (headless)
+    latency clear                    delete the results file and everything derived from it
+
+    Every command also takes --metrics FILE (.prom or .json) to save the
+    tool's own timers / counters, and --profile STAGE to cProfile a stage
+    (see latency_utils/instrumentation.py), e.g.
+        latency analyze --metrics metrics.prom --profile analysis.per_url_statistics
+
+    Installed by `pip install -e .` (see pyproject.toml), or run from the
+    src folder with `python -m latency.cli`.
+    pandas / matplotlib are only imported inside analyze and plot, so a
+    probe from cron starts in a fraction of the time the notebook takes.
+    python tests/bench_cli_startup.py checks that stays within budget.
+
+Author: William TenCate
+Email: wtencate@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import argparse
+import os
+import sys
+
+from latency_utils import instrumentation
+from latency_utils.io_utils import results_file, side_file_for
+
+
+def _check_url(url):
+    # same rules as the notebook's prompt_and_validate(..., "URL")
+    url = url.strip()
+    if not url.startswith(("http://", "https://")):
+        raise argparse.ArgumentTypeError(f"URL must start with http:// or https://: {url}")
+    if "." not in url or url.endswith("."):
+        raise argparse.ArgumentTypeError(f"URL must contain a valid domain ending (.com): {url}")
+    return url
+
+
+def _positive_int(value):
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError("must be > 0")
+    return number
+
+
+def _pin(value):
+    # HOST=IP[,IP...]
+    host, _, ips = value.partition("=")
+    if not host or not ips:
+        raise argparse.ArgumentTypeError(f"expected HOST=IP, got {value}")
+    return host.strip(), [ip.strip() for ip in ips.split(",")]
+
+
+def probe(args):
+    """
+    Test every URL (concurrently, like the notebook seed cell) and append
+    the session rows. Returns how many rows were written.
+    """
+    from latency.async_tester import AsyncProbeEngine
+    from latency.latency_tester import LatencyTester
+    from latency_monitor.anomaly import check_session_rows, side_paths_for
+    from latency_utils.io_utils import append_session_rows
+
+    cache = None
+    if args.dns_cache or args.pin:
+        from latency.dns_cache import shared_cache
+
+        cache = shared_cache()
+        for host, ips in args.pin:
+            cache.pin(host, *ips)
+
+    testers = [
+        LatencyTester(
+            url,
+            attempts=args.attempts,
+            timeout=args.timeout,
+            label=args.label,
+            target_error=args.target_error,
+            keep_results=args.samples,  # only the sample store needs every attempt
+            rate=args.rate,
+            arrival=args.arrival,
+            max_in_flight=args.max_in_flight,
+            dns_cache=cache,
+        )
+        for url in args.urls
+    ]
+
+    engine = AsyncProbeEngine(max_in_flight=args.max_in_flight, per_host=args.per_host)
+    engine.run(testers)
+
+    rows = [tester.create_session_row() for tester in testers]
+    for row in rows:
+        if row["successes"] == 0:
+            print(f"{row['url']}: unreachable, not recorded")
+        else:
+            print(f"{row['url']}: {row['successes']}/{row['attempts']} ok, avg {row['avg_ms']} ms")
+
+    if args.partitions:
+        from latency_analysis.partitions import append_partitioned_rows
+
+        written = append_partitioned_rows(rows, args.partitions, args.host)
+        print(f"{written} session rows appended to the partitions in {args.partitions}")
+    else:
+        written = append_session_rows(rows, args.results)
+        print(f"{written} session rows appended to {args.results}")
+
+    if args.samples:
+        from latency_utils.sample_store import SampleStore
+
+        store = SampleStore(side_file_for(args.results, "samples.bin"))
+        for tester in testers:
+            store.append(tester.results, tester.label)
+
+    if not args.no_alerts:
+        check_session_rows(rows, *side_paths_for(args.results))
+
+    return written
+
+
+def analyze(args):
+    """
+    Print the stats of the results file, optionally narrowed down like the
+    notebook's label / URL cells.
+    """
+    from latency_analysis.data_analyzer import DataAnalyzer
+
+    if args.partitions:
+        # the time range prunes partitions before anything is read
+        analyzer = DataAnalyzer(partitions=args.partitions, start=args.start, end=args.end, workers=args.workers)
+        if args.url or args.label:
+            analyzer = analyzer.query(url=args.url, label=args.label)
+    else:
+        analyzer = DataAnalyzer(args.results, persist_stats=True)
+        if args.url or args.label or args.start or args.end:
+            analyzer = analyzer.query(url=args.url, label=args.label, start=args.start, end=args.end)
+    if analyzer is None:
+        return 1
+
+    print(analyzer)
+    return 0
+
+
+def plot(args):
+    """
+    Save every standard chart of the results file to the output folder.
+    """
+    from latency_analysis.data_analyzer import DataAnalyzer
+    from latency_analysis.plots import Plots
+
+    analyzer = DataAnalyzer(args.results, persist_stats=True)
+    if args.url or args.label:
+        analyzer = analyzer.query(url=args.url, label=args.label)
+        if analyzer is None:
+            return 1
+
+    output_dir = args.output_dir or side_file_for(args.results, "plots")
+    paths = Plots(analyzer, output_dir=output_dir, file_format=args.format).render_all()
+    for path in paths:
+        print(path)
+    return 0
+
+
+def clear(args):
+    """
+    Delete the results file and everything built from it, like the notebook's clear cell.
+    """
+    if not args.yes:
+        answer = input(f"Delete {args.results} and its samples, caches, rollups and alerts? [y/N] ")
+        if answer.strip().lower() not in ("y", "yes"):
+            print("Nothing deleted.")
+            return 1
+
+    from latency_analysis.rollups import delete_rollups
+    from latency_analysis.stats_cache import delete_stats_cache
+    from latency_monitor.anomaly import delete_anomaly_state, side_paths_for
+    from latency_utils.io_utils import delete_results_csv
+    from latency_utils.sample_store import delete_samples
+
+    delete_results_csv(args.results)
+    delete_samples(side_file_for(args.results, "samples.bin"))
+    delete_stats_cache(args.results)
+    delete_rollups(args.results)
+    delete_anomaly_state(*side_paths_for(args.results))
+    return 0
+
+
+def _save_metrics(args):
+    if args.metrics:
+        instrumentation.write_metrics(args.metrics)
+    if args.profile:
+        folder = os.path.dirname(os.path.abspath(args.metrics)) if args.metrics else side_file_for(args.results, "profiles")
+        for path in instrumentation.dump_profiles(folder):
+            print(f"profile saved to {path}")
+
+
+def build_parser():
+    # every subcommand takes --results, after the subcommand name like the rest of its options
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--results", default=results_file, help="results CSV (default results/results.csv, or $LATENCY_RESULTS_DIR/results.csv)")
+    common.add_argument("--metrics", default=None, metavar="FILE", help="save the tool's own timers (.prom or .json)")
+    common.add_argument("--profile", action="append", default=[], metavar="STAGE",
+                        help="cProfile a stage (e.g. io.read_latency_csv), saved as STAGE.prof next to --metrics")
+
+    parser = argparse.ArgumentParser(prog="latency", description="Python Latency Analyzer")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("probe", parents=[common], help="test URLs and append the sessions to the results file")
+    p.add_argument("urls", nargs="+", type=_check_url, metavar="URL")
+    p.add_argument("--label", default="Default", help="e.g. WIFI, Wired, School")
+    p.add_argument("--attempts", type=_positive_int, default=5, help="tests per URL (most, with --target-error)")
+    p.add_argument("--timeout", type=float, default=5.0)
+    p.add_argument("--target-error", type=float, default=None, help="stop a URL early once the avg is within this fraction")
+    p.add_argument("--max-in-flight", type=_positive_int, default=20, help="(per URL with --rate)")
+    p.add_argument("--per-host", type=_positive_int, default=6)
+    p.add_argument("--rate", type=float, default=None, help="open-loop: send this many requests/s per URL on a schedule")
+    p.add_argument("--arrival", choices=["constant", "poisson"], default="constant", help="open-loop schedule")
+    p.add_argument("--dns-cache", action="store_true", help="look every host up once, before the first request")
+    p.add_argument("--pin", type=_pin, action="append", default=[], metavar="HOST=IP", help="send HOST to IP (implies --dns-cache)")
+    p.add_argument("--samples", action="store_true", help="also keep every attempt in the sample store")
+    p.add_argument("--no-alerts", action="store_true", help="skip the latency change check")
+    p.add_argument("--partitions", default=None, metavar="DIR", help="append to DIR/host=<host>/date=<day>/results.csv instead")
+    p.add_argument("--host", default=None, help="prober name for --partitions (default this machine's hostname)")
+    p.set_defaults(handler=probe)
+
+    p = commands.add_parser("analyze", parents=[common], help="print overall and per-URL stats")
+    p.add_argument("--url", default=None)
+    p.add_argument("--label", default=None)
+    p.add_argument("--start", default=None, help="e.g. '2025-12-01 10:00:00'")
+    p.add_argument("--end", default=None)
+    p.add_argument("--partitions", default=None, metavar="GLOB", help="read partitioned results (a folder or a glob) instead")
+    p.add_argument("--workers", type=_positive_int, default=None, help="processes reading --partitions (default one per CPU)")
+    p.set_defaults(handler=analyze)
+
+    p = commands.add_parser("plot", parents=[common], help="save every standard chart")
+    p.add_argument("--output-dir", default=None, help="default: a plots folder next to the results file")
+    p.add_argument("--format", choices=["png", "svg"], default="png")
+    p.add_argument("--url", default=None)
+    p.add_argument("--label", default=None)
+    p.set_defaults(handler=plot)
+
+    p = commands.add_parser("clear", parents=[common], help="delete the results file and everything derived from it")
+    p.add_argument("--yes", action="store_true", help="don't ask first")
+    p.set_defaults(handler=clear)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.metrics or args.profile:
+        instrumentation.enable(profile=args.profile)
+
+    try:
+        result = args.handler(args)
+    except (FileNotFoundError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    finally:
+        _save_metrics(args)
+
+    if args.command == "probe":
+        return 0 if result else 1  # nothing recorded = every URL was unreachable
+    return result
+
+
+if __name__ == "__main__":
+    sys.exit(main())
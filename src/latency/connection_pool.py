@@ -0,0 +1,96 @@
+"""
+File: connection_pool.py
+Description: Shared keep-alive connection pool for pooled LatencyTester sessions,
+    One requests.Session is shared by every pooled tester in the process,
+    so connections are reused across attempts and across testers instead
+    of paying DNS + TCP + TLS setup on every single request.
+    Also lets a tester tell whether a request used a fresh connection or
+    reused one (cold vs. warm).
+
+Author: William TenCate
+Email: wtencate@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import threading
+from urllib.parse import urlsplit
+
+pool_connections = 100  # how many hosts get their own pool
+pool_maxsize = 10  # how many kept-alive sockets per host
+
+_shared_session = None
+_lock = threading.Lock()
+
+
+def shared_session():
+    """
+    Return the process-wide pooled requests.Session, creating it on first use.
+    """
+    global _shared_session
+
+    # imported on first use, the async engine and the instrumented probe don't need requests
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    with _lock:
+        if _shared_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=pool_connections, pool_maxsize=pool_maxsize
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _shared_session = session
+
+        return _shared_session
+
+
+def close_shared_session():
+    """
+    Close every pooled connection. The next shared_session() call starts cold.
+    """
+    global _shared_session
+
+    with _lock:
+        if _shared_session is not None:
+            _shared_session.close()
+            _shared_session = None
+
+
+def pool_for(session, url):
+    """
+    Return the urllib3 pool manager session will use for url,
+    or None if it can't be looked up (bad URL, custom adapter, etc).
+    """
+    try:
+        return session.get_adapter(url).poolmanager
+    except Exception:
+        return None
+
+
+def new_connections(pool, url=None):
+    """
+    How many connections the pool manager has opened so far to url's host
+    (all hosts if url is None).
+    If the count goes up during a request, that request used a fresh connection.
+    """
+    if pool is None:
+        return None
+
+    target = None
+    if url is not None:
+        parts = urlsplit(url)
+        default_port = 443 if parts.scheme == "https" else 80
+        target = (parts.scheme, (parts.hostname or "").lower(), parts.port or default_port)
+
+    # one urllib3 pool per host/TLS settings, add up what the target's have opened
+    # (other testers probing other hosts through the same manager don't count)
+    total = 0
+    for key in list(pool.pools.keys()):
+        if target is not None and (key.key_scheme, key.key_host.lower(), key.key_port) != target:
+            continue
+        host_pool = pool.pools.get(key)
+        if host_pool is not None:
+            total += host_pool.num_connections
+    return total
@@ -0,0 +1,73 @@
+"""
+File: convergence.py
+Description: Confidence intervals for adaptive testing sessions,
+    Works out how tight the current latency estimate is, so an adaptive
+    LatencyTester can stop probing as soon as more attempts wouldn't
+    change the answer much.
+        - mean: Student t interval from a running (Welford) mean/variance
+        - percentile: distribution-free order statistic interval, read off
+          the session's quantile sketch
+    Only uses the standard library (no scipy).
+
+Author: William TenCate
+Email: wtencate@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import math
+from statistics import NormalDist
+
+
+def t_quantile(p, dof):
+    """
+    Student t quantile. Exact for 1 and 2 degrees of freedom, a Cornish-Fisher
+    expansion around the normal quantile from 3 up (within ~1%, and within
+    0.1% from 5 up).
+    """
+    if dof < 1:
+        return math.inf
+    if dof == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if dof == 2:
+        return (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+
+    z = NormalDist().inv_cdf(p)
+    z3 = z**3
+    z5 = z**5
+    z7 = z**7
+    return (
+        z
+        + (z3 + z) / (4 * dof)
+        + (5 * z5 + 16 * z3 + 3 * z) / (96 * dof**2)
+        + (3 * z7 + 19 * z5 + 17 * z3 - 15 * z) / (384 * dof**3)
+    )
+
+
+def mean_half_width(n, m2, confidence=0.95):
+    """
+    Half width of the confidence interval of a mean, from n values whose
+    sum of squared differences from their mean is m2. None if n < 2.
+    """
+    if n < 2:
+        return None
+    std = math.sqrt(m2 / (n - 1))
+    return t_quantile((1 + confidence) / 2, n - 1) * std / math.sqrt(n)
+
+
+def quantile_half_width(sketch, q, confidence=0.95):
+    """
+    Half width of the confidence interval of the q quantile of the values
+    in sketch. The rank of the true quantile is binomial(n, q), so the
+    interval runs between the sample quantiles at q -/+ z * sqrt(q(1-q)/n).
+    None if the sketch has fewer than 2 values.
+    """
+    n = sketch.count
+    if n < 2:
+        return None
+
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    spread = z * math.sqrt(q * (1 - q) / n)
+    low = sketch.quantile(max(0.0, q - spread))
+    high = sketch.quantile(min(1.0, q + spread))
+    return (high - low) / 2
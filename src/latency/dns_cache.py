@@ -0,0 +1,312 @@
+"""
+File: dns_cache.py
+Description: Process-wide DNS cache for the probes,
+    Without it every fresh connection resolves the hostname again through
+    the system resolver, which adds the resolver's latency and variance to
+    every elapsed_ms and sends thousands of lookups its way when a big
+    target list is probed.
+        - answers are kept for their TTL (the resolver's if it gives one,
+          else a default), failed lookups for a short negative TTL
+        - bounded size, least recently used hosts are evicted first
+        - preresolve() looks up every target before a session starts
+        - pin() sends a host to fixed IPs without asking the resolver
+    The resolver is a plain function, so tests can swap in a stub and
+    never touch the network.
+    Every Result made through a cache says whether its lookups hit it
+    (Result.dns_hit).
+
+Author: William TenCate
+Email: wtencate@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import contextvars
+import ipaddress
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+# [whether the lookups of the request in progress hit the cache (None = no lookup)],
+# per thread and per asyncio task, so concurrent probes don't mix them up
+_lookup_hit = contextvars.ContextVar("dns_lookup_hit", default=None)
+# cache the requests based probes resolve through, see use_for_requests
+_active_cache = contextvars.ContextVar("dns_active_cache", default=None)
+
+
+def system_resolver(host):
+    """
+    Resolve host with the system resolver. getaddrinfo doesn't say how long
+    an answer is good for, so the TTL is None (the cache's default applies).
+    """
+    answers = socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+    return list(dict.fromkeys(address[4][0] for address in answers)), None
+
+
+def is_ip(host):
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+class DnsCache:
+    """
+    Host -> IP addresses cache, safe to share between threads.
+        max_hosts: most hosts kept, the least recently used go first
+        ttl: seconds an answer is kept when the resolver gives no TTL
+        max_ttl: longest any answer is kept, whatever the resolver says
+        negative_ttl: seconds a failed lookup is remembered
+        resolver: function(host) -> (list of IP strings, ttl seconds or None)
+        clock: monotonic seconds (tests pass a fake one)
+    """
+
+    def __init__(self, max_hosts=4096, ttl=300.0, max_ttl=3600.0, negative_ttl=5.0, resolver=None, clock=time.monotonic):
+        if max_hosts <= 0:
+            raise ValueError("max_hosts must be > 0.")
+
+        self.max_hosts = max_hosts
+        self.ttl = ttl
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self.resolver = resolver or system_resolver
+        self.clock = clock
+
+        self._entries = OrderedDict()  # host -> (ips or the lookup error, expires at)
+        self._pinned = {}  # host -> ips, never expire or get evicted
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def pin(self, host, *ips):
+        """
+        Always send host to these IPs (e.g. one backend behind a load balancer).
+        """
+        if not ips:
+            raise ValueError("pin needs at least one IP.")
+        for ip in ips:
+            if not is_ip(ip):
+                raise ValueError(f"Not an IP address: {ip}")
+        with self._lock:
+            self._pinned[host.lower()] = list(ips)
+
+    def unpin(self, host):
+        with self._lock:
+            self._pinned.pop(host.lower(), None)
+
+    def cached(self, host):
+        """
+        IPs for host if the cache has a fresh answer, else None.
+        Never asks the resolver. Raises socket.gaierror for a cached failure.
+        """
+        if is_ip(host):
+            return [host]  # nothing to look up
+
+        host = host.lower()
+        now = self.clock()
+        with self._lock:
+            ips = self._pinned.get(host)
+            if ips is None and host in self._entries:
+                answer, expires = self._entries[host]
+                if now < expires:
+                    self._entries.move_to_end(host)
+                    ips = answer
+            if ips is None:
+                return None
+            self.hits += 1
+
+        _note_lookup(True)
+        if isinstance(ips, Exception):
+            raise socket.gaierror(*ips.args)  # a fresh one, re-raising the same one grows its traceback
+        return ips
+
+    def resolve(self, host):
+        """
+        IPs for host, from the cache while the answer is fresh.
+        Raises socket.gaierror if the lookup failed (also while that's cached).
+        """
+        ips = self.cached(host)
+        if ips is not None:
+            return ips
+        _note_lookup(False)
+        return self._lookup(host.lower())
+
+    async def resolve_async(self, host):
+        """
+        resolve() for asyncio code, a miss goes to the resolver in a thread
+        so it doesn't hold up the event loop.
+        """
+        import asyncio
+
+        ips = self.cached(host)
+        if ips is not None:
+            return ips
+        _note_lookup(False)
+        return await asyncio.get_running_loop().run_in_executor(None, self._lookup, host.lower())
+
+    def _lookup(self, host):
+        # miss, ask the resolver without holding the lock (it can take a while)
+        with self._lock:
+            self.misses += 1
+        try:
+            ips, ttl = self.resolver(host)
+            if not ips:
+                raise socket.gaierror(socket.EAI_NONAME, f"No addresses for {host}")
+        except OSError as e:
+            error = e if isinstance(e, socket.gaierror) else socket.gaierror(str(e))
+            self._store(host, error, self.negative_ttl)
+            raise error
+
+        ttl = self.ttl if ttl is None else ttl
+        self._store(host, list(ips), min(ttl, self.max_ttl))
+        return list(ips)
+
+    def _store(self, host, answer, ttl):
+        if ttl <= 0:
+            return  # the resolver said not to cache it
+        with self._lock:
+            self._entries[host] = (answer, self.clock() + ttl)
+            self._entries.move_to_end(host)
+            while len(self._entries) > self.max_hosts:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def addresses(self, host, port):
+        """
+        resolve(), shaped like socket.getaddrinfo(host, port, type=SOCK_STREAM).
+        """
+        answers = []
+        for ip in self.resolve(host):
+            if ":" in ip:
+                answers.append((socket.AF_INET6, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", (ip, port, 0, 0)))
+            else:
+                answers.append((socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", (ip, port)))
+        return answers
+
+    def preresolve(self, urls, workers=16):
+        """
+        Look up the host of every URL (or bare hostname) ahead of a session,
+        a few at a time. Returns {host: IPs or the lookup error}.
+        """
+        hosts = []
+        for url in urls:
+            host = urlsplit(url).hostname if "://" in url else url
+            if host and not is_ip(host):
+                hosts.append(host.lower())
+        hosts = list(dict.fromkeys(hosts))
+
+        def lookup(host):
+            try:
+                return self.resolve(host)
+            except OSError as e:
+                return e
+
+        if len(hosts) <= 1:
+            return {host: lookup(host) for host in hosts}
+        with ThreadPoolExecutor(max_workers=min(workers, len(hosts))) as pool:
+            return dict(zip(hosts, pool.map(lookup, hosts)))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hosts": len(self._entries),
+                "pinned": len(self._pinned),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def clear(self):
+        """
+        Forget every cached answer (pins stay).
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+def _note_lookup(hit):
+    box = _lookup_hit.get()
+    if box is None:
+        return  # nobody is tracking this request
+    # a sample only counts as a hit if every lookup it made was one
+    box[0] = hit if box[0] is None else box[0] and hit
+
+
+def start_lookups():
+    """
+    Call before a request, lookup_hit() afterwards says if its lookups hit the cache.
+    """
+    # a box rather than the flag itself: asyncio.wait_for runs the request in a
+    # task with a copy of the context, the copy still points at the same box
+    _lookup_hit.set([None])
+
+
+def lookup_hit():
+    """
+    True / False if the request since start_lookups() resolved through a
+    cache (and every lookup hit it), None if it looked nothing up.
+    """
+    box = _lookup_hit.get()
+    return None if box is None else box[0]
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache():
+    """
+    Return the process-wide DnsCache, creating it on first use.
+    """
+    global _shared_cache
+
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = DnsCache()
+        return _shared_cache
+
+
+_original_create_connection = None
+
+
+def use_for_requests(cache):
+    """
+    Make requests / urllib3 connections opened by this thread resolve
+    through cache (None turns it back off). Returns the cache used before.
+    urllib3 has no resolver setting, so the first call wraps
+    urllib3.util.connection.create_connection; threads that never call
+    this keep using the system resolver.
+    """
+    global _original_create_connection
+
+    previous = _active_cache.get()
+    if cache is not None:
+        with _shared_lock:
+            if _original_create_connection is None:
+                from urllib3.util import connection
+
+                _original_create_connection = connection.create_connection
+                connection.create_connection = _create_connection
+    _active_cache.set(cache)
+    return previous
+
+
+def _create_connection(address, *args, **kwargs):
+    cache = _active_cache.get()
+    host, port = address
+    if cache is None or is_ip(host.strip("[]")):
+        return _original_create_connection(address, *args, **kwargs)
+
+    # try each address in turn, like create_connection does with getaddrinfo's list
+    error = None
+    for ip in cache.resolve(host):
+        try:
+            return _original_create_connection((ip, port), *args, **kwargs)
+        except OSError as e:
+            error = e
+    raise error
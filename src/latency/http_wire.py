@@ -0,0 +1,92 @@
+"""
+File: http_wire.py
+Description: The bits of HTTP/1.1 both raw-socket probes speak,
+    Splitting a URL into host / port / path, building the GET request,
+    and reading the status line and headers back. The instrumented probe
+    (probe.py) and the async engine (async_tester.py) only differ in how
+    they move bytes (blocking sockets vs. asyncio streams), so the parsing
+    lives here once.
+
+Author: William TenCate
+Email: wtencate@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+from urllib.parse import urljoin, urlsplit
+
+redirect_codes = (301, 302, 303, 307, 308)
+max_redirects = 5  # same idea as requests following redirects for us
+
+
+class Target:
+    """
+    Where a GET for url goes: host, port, https or not, request path.
+    Raises ValueError for anything that isn't http(s).
+    """
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {url}")
+
+        self.host = parts.hostname
+        self.netloc = parts.netloc
+        self.secure = parts.scheme == "https"
+        self.port = parts.port or (443 if self.secure else 80)
+        self.path = parts.path or "/"
+        if parts.query:
+            self.path = f"{self.path}?{parts.query}"
+
+    def request(self):
+        """
+        Bytes of a GET over a fresh connection (Connection: close).
+        """
+        return (
+            f"GET {self.path} HTTP/1.1\r\n"
+            f"Host: {self.netloc}\r\n"
+            "User-Agent: python-latency-analyzer\r\n"
+            "Accept: */*\r\n"
+            "Connection: close\r\n"
+            "\r\n"
+        ).encode("ascii")
+
+
+def next_hop(url, status, location):
+    """
+    The url to follow for a redirect response, None when there's nothing to follow.
+    """
+    if status in redirect_codes and location:
+        return urljoin(url, location)  # Location can be relative
+    return None
+
+
+def parse_status(line):
+    """
+    Status code from a status line (str or bytes) like: HTTP/1.1 200 OK
+    """
+    if isinstance(line, bytes):
+        line = line.decode("latin-1")
+    pieces = line.split()
+    if len(pieces) < 2 or not pieces[1].isdigit():
+        raise ConnectionError(f"Bad status line: {line!r}")
+    return int(pieces[1])
+
+
+def parse_headers(lines):
+    """
+    Pull what the probes need out of the header lines (no status line).
+    Returns (location or None, content_length or None).
+    """
+    location = None
+    length = None
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("latin-1")
+        name, _, value = line.partition(":")
+        name = name.strip().lower()
+        if name == "location":
+            location = value.strip()
+        elif name == "content-length" and value.strip().isdigit():
+            length = int(value.strip())
+    return location, length
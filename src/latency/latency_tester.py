@@ -9,13 +9,17 @@ Description: URL Latency testing class,
 Author: William TenCate
 Email: wtencate@stevens.edu
 Created: 12/01/25
-Last Edited: 12/01/25
+Last Edited: 10/18/26
 """
 
-import requests
 import time
 import datetime
-from latency.result import Result
+from latency.result import Result, ResultList
+from latency import connection_pool, dns_cache as dns
+from latency.convergence import mean_half_width, quantile_half_width
+from latency.probe import phase_columns, timed_get
+from latency.sketch import LatencySketch
+from latency_utils.instrumentation import count, timer
 
 
 class LatencyTester:
@@ -24,16 +28,209 @@ class LatencyTester:
     """
 
     def __init__(
-        self, url="https://www.google.com", attempts=5, timeout=5, label="Default"
+        self,
+        url="https://www.google.com",
+        attempts=5,
+        timeout=5,
+        label="Default",
+        pooled=False,
+        session=None,
+        instrumented=False,
+        ssl_context=None,
+        keep_results=True,
+        target_error=None,
+        confidence=0.95,
+        quantile=None,
+        min_attempts=None,
+        max_seconds=None,
+        rate=None,
+        arrival="constant",
+        max_in_flight=100,
+        late_after=0.01,
+        seed=None,
+        dns_cache=None,
     ):
         self.url = url
         self.attempts = attempts
         self.timeout = timeout
         self.label = label
+        # pooled mode reuses keep-alive connections (shared session unless one is passed in)
+        self.pooled = pooled or session is not None
+        self.session = session
+        # instrumented mode times DNS / connect / TLS / TTFB / body for every attempt
+        self.instrumented = instrumented
+        self.ssl_context = ssl_context  # only used by the instrumented and open-loop probes
+        # resolve through a DnsCache (True = the process-wide one) instead of
+        # asking the system resolver on every fresh connection
+        self.dns_cache = dns.shared_cache() if dns_cache is True else dns_cache
+
+        if self.instrumented and self.pooled:
+            raise ValueError(
+                "Instrumented mode opens a fresh connection per attempt, it can't be pooled."
+            )
+
+        # adaptive mode: attempts is only the budget, the session stops as soon as
+        # the confidence interval of the mean (or of quantile q) is within
+        # target_error of the estimate, e.g. 0.05 = +/- 5%
+        self.adaptive = target_error is not None
+        self.target_error = target_error
+        self.confidence = confidence
+        self.quantile = quantile
+        # at least this many samples before stopping (default 5, or all of a smaller budget)
+        self.min_attempts = min(5, attempts) if min_attempts is None else min_attempts
+        self.max_seconds = max_seconds  # time budget for the whole session
+
+        if self.adaptive:
+            if target_error <= 0:
+                raise ValueError("target_error must be > 0.")
+            if not 0 < confidence < 1:
+                raise ValueError("confidence must be between 0 and 1.")
+            if quantile is not None and not 0 < quantile < 1:
+                raise ValueError("quantile must be between 0 and 1.")
+            if attempts < 2:
+                # a confidence interval needs at least 2 samples to have a width
+                raise ValueError("target_error needs attempts >= 2 (a budget of at least 2 samples).")
+            if not 2 <= self.min_attempts <= attempts:
+                raise ValueError("min_attempts must be between 2 and attempts.")
+
+        # open-loop mode sends `rate` requests per second on a fixed schedule
+        # (constant or poisson arrivals) instead of waiting for each answer,
+        # and times every request from when it should have been sent
+        self.open_loop = rate is not None
+        self.rate = rate
+        self.arrival = arrival
+        self.max_in_flight = max_in_flight
+        self.late_after = late_after  # seconds behind schedule before a send counts as late
+        self.seed = seed  # poisson schedule seed
+
+        if self.open_loop:
+            if rate <= 0:
+                raise ValueError("rate must be > 0.")
+            if arrival not in ("constant", "poisson"):
+                raise ValueError("arrival must be 'constant' or 'poisson'.")
+            if max_in_flight <= 0:
+                raise ValueError("max_in_flight must be > 0.")
+            if self.pooled or self.instrumented or self.adaptive:
+                raise ValueError(
+                    "Open-loop mode runs a fixed schedule over fresh connections, "
+                    "it can't be pooled, instrumented or adaptive."
+                )
+
         self.run_started_at = datetime.datetime.now().strftime(
             "%Y-%m-%d %H:%M:%S"
         )  # need to format time since it's gibberish originally
-        self.results = []  # will store Result objects
+        # keep_results=False only keeps the running stats + sketch (bounded memory)
+        self.keep_results = keep_results
+        self.results = ResultList(url)  # every attempt, stored as compact arrays
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Clear the running session stats that record() keeps up to date.
+        """
+        self.recorded = 0  # attempts recorded so far (ok or not)
+        # every successful latency goes in here, it also tracks count/min/max/sum
+        self.sketch = LatencySketch()
+        self._cold = [0, 0.0]  # [count, total ms]
+        self._warm = [0, 0.0]
+        self._phase_count = 0
+        self._phase_totals = dict.fromkeys(phase_columns, 0.0)
+        # Welford running mean / sum of squared differences of successful latencies
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.converged = False
+        self._deadline = None  # set by the first done() call
+        # open-loop sends that went out behind schedule / never went out
+        self.late = 0
+        self.dropped = 0
+        self._service = [0, 0.0, 0.0]  # [count, total ms, max ms] of send -> response
+
+    def record(self, result):
+        """
+        Add one attempt's Result to the session.
+        Stats are updated as we go, so the row never has to re-scan results.
+        """
+        if self.keep_results:
+            self.results.append(result)
+
+        self.recorded += 1
+        if not result.ok:
+            return
+
+        self.sketch.add(result.elapsed_ms)
+
+        delta = result.elapsed_ms - self._mean
+        self._mean += delta / self.sketch.count
+        self._m2 += delta * (result.elapsed_ms - self._mean)
+
+        if result.reused is False:
+            self._cold[0] += 1
+            self._cold[1] += result.elapsed_ms
+        elif result.reused:
+            self._warm[0] += 1
+            self._warm[1] += result.elapsed_ms
+
+        if result.phases:
+            self._phase_count += 1
+            for name in phase_columns:
+                self._phase_totals[name] += result.phases[name]
+
+    def record_send(self, result, service_ms=None, late=False):
+        """
+        record() for an open-loop send, also counting late / dropped sends
+        and the service time (send -> response, no wait for a send slot).
+        service_ms None means the send was dropped.
+        """
+        self.record(result)
+
+        if service_ms is None:
+            self.dropped += 1
+            return
+        if late:
+            self.late += 1
+        if result.ok:
+            self._service[0] += 1
+            self._service[1] += service_ms
+            self._service[2] = max(self._service[2], service_ms)
+
+    def error_bound(self):
+        """
+        Half width (ms) of the confidence interval of the estimate adaptive mode
+        converges on: the mean, or quantile q if one was given.
+        None until there are 2 successful attempts.
+        """
+        if self.quantile is None:
+            return mean_half_width(self.sketch.count, self._m2, self.confidence)
+        return quantile_half_width(self.sketch, self.quantile, self.confidence)
+
+    def _estimate(self):
+        if self.quantile is None:
+            return self.sketch.mean()
+        return self.sketch.quantile(self.quantile)
+
+    def done(self):
+        """
+        Whether the session should stop before another attempt.
+        Fixed sessions run exactly attempts times. Adaptive sessions also stop
+        once the estimate has converged or the time budget ran out.
+        """
+        if self.recorded >= self.attempts:
+            return True
+        if not self.adaptive:
+            return False
+
+        if self.max_seconds is not None:
+            if self._deadline is None:
+                self._deadline = time.monotonic() + self.max_seconds
+            elif time.monotonic() >= self._deadline:
+                return True
+
+        if self.sketch.count < self.min_attempts:
+            return False
+
+        bound = self.error_bound()
+        self.converged = bound is not None and bound <= self.target_error * self._estimate()
+        return self.converged
 
     def run_tests(self):
         """
@@ -41,19 +238,63 @@ class LatencyTester:
             (attempts is the amount of times, url is the url being tested, etc)
         This completes the "session" of tests.
         """
+        if self.open_loop:
+            from latency.open_loop import run_open_loop  # asyncio, only for this mode
+
+            run_open_loop(self, self.ssl_context)
+            return
+
+        # look the host up before the first attempt, so no sample pays for it
+        if self.dns_cache is not None:
+            self.dns_cache.preresolve([self.url])
+
+        if self.instrumented:
+            self._run_instrumented()
+            return
+
+        previous = dns.use_for_requests(self.dns_cache)
+        try:
+            self._run_requests()
+        finally:
+            dns.use_for_requests(previous)
+
+    def _run_requests(self):
+        """
+        The session loop over requests.get (or the pooled session's get).
+        """
         attempt_number = 1
 
-        while attempt_number <= self.attempts:
+        if self.pooled:
+            session = self.session or connection_pool.shared_session()
+            get = session.get
+            pool = connection_pool.pool_for(session, self.url)
+        else:
+            import requests  # only this loop needs it, keeps the import off the CLI's startup
+
+            get = requests.get  # new connection every time, so always cold
+            pool = None
+
+        while not self.done():
+            opened_before = connection_pool.new_connections(pool, self.url)
+            dns.start_lookups()
             start = time.time()
 
             try:
-                response = requests.get(self.url, timeout=self.timeout)
+                with timer("tester.request"):
+                    response = get(self.url, timeout=self.timeout)
                 end = time.time()
                 elapsed_ms = (end - start) * 1000
 
                 # on success
                 result = Result(
-                    self.url, attempt_number, elapsed_ms, response.status_code, True
+                    self.url,
+                    attempt_number,
+                    elapsed_ms,
+                    response.status_code,
+                    True,
+                    self._was_reused(pool, opened_before),
+                    timestamp=start,
+                    dns_hit=dns.lookup_hit(),
                 )
 
             except Exception:
@@ -61,36 +302,100 @@ class LatencyTester:
                 elapsed_ms = (end - start) * 1000
 
                 # on failure
-                result = Result(self.url, attempt_number, elapsed_ms, None, False)
+                result = Result(
+                    self.url,
+                    attempt_number,
+                    elapsed_ms,
+                    None,
+                    False,
+                    self._was_reused(pool, opened_before),
+                    timestamp=start,
+                    dns_hit=dns.lookup_hit(),
+                )
+                count("tester.failures")
 
-            self.results.append(result)
+            # our own bookkeeping per attempt, next to tester.request it shows the probe overhead
+            with timer("tester.record"):
+                self.record(result)
+            attempt_number = attempt_number + 1
+
+    def _run_instrumented(self):
+        """
+        Same session loop as run_tests, but through the phase-timing probe
+        with a monotonic nanosecond clock.
+        """
+        attempt_number = 1
+
+        while not self.done():
+            dns.start_lookups()
+            sent_at = time.time()
+            start = time.perf_counter_ns()
+
+            try:
+                with timer("tester.request"):
+                    status, phases = timed_get(self.url, self.timeout, self.ssl_context, self.dns_cache)
+                elapsed_ms = (time.perf_counter_ns() - start) / 1_000_000
+
+                # on success
+                result = Result(
+                    self.url,
+                    attempt_number,
+                    elapsed_ms,
+                    status,
+                    True,
+                    False,
+                    phases,
+                    timestamp=sent_at,
+                    dns_hit=dns.lookup_hit(),
+                )
+
+            except Exception:
+                elapsed_ms = (time.perf_counter_ns() - start) / 1_000_000
+
+                # on failure
+                result = Result(
+                    self.url,
+                    attempt_number,
+                    elapsed_ms,
+                    None,
+                    False,
+                    False,
+                    timestamp=sent_at,
+                    dns_hit=dns.lookup_hit(),
+                )
+                count("tester.failures")
+
+            with timer("tester.record"):
+                self.record(result)
             attempt_number = attempt_number + 1
 
+    def _was_reused(self, pool, opened_before):
+        """
+        Whether the last request went over a kept-alive connection.
+        """
+        if not self.pooled:
+            return False
+        if pool is None:
+            return None  # can't tell for this url
+        return connection_pool.new_connections(pool, self.url) <= opened_before
+
+    def _average(self, count, total):
+        return round(total / count, 2) if count else None
+
     def create_session_row(self):
         """
         Return dictionary summarizing the entire testing session.
         Note: does not return individual tests, it's a summary of the
             whole "session" of "attempts"
         """
-        # list comprehension requirement
-        times = [r.elapsed_ms for r in self.results if r.ok]
-
-        successes = len(times)
-        failures = len(self.results) - successes
+        # running stats from record(), no need to loop over every result again
+        successes = self.sketch.count
+        failures = self.recorded - successes
 
         if successes > 0:
-            minimum = min(times)
-            maximum = max(times)
-
-            total = 0
-            for t in times:
-                total = total + t
-
-            average = total / successes
-
-            minimum = round(minimum, 2)
-            maximum = round(maximum, 2)
-            average = round(average, 2)
+            minimum = round(self.sketch.min, 2)
+            maximum = round(self.sketch.max, 2)
+            average = round(self.sketch.total / successes, 2)
         else:
             minimum = None
             maximum = None
@@ -101,14 +406,45 @@ class LatencyTester:
             "run_started_at": self.run_started_at,
             "label": self.label,
             "url": self.url,
-            "attempts": self.attempts,
+            # adaptive sessions report the attempts actually made
+            "attempts": self.recorded if self.adaptive else self.attempts,
             "successes": successes,
             "failures": failures,
             "min_ms": minimum,
             "max_ms": maximum,
             "avg_ms": average,
+            # quantile sketch of this session, merged per URL/label by DataAnalyzer
+            "sketch": self.sketch.to_string(),
         }
 
+        # pooled sessions report handshake (cold) and steady state (warm) latency apart
+        if self.pooled:
+            row["cold_avg_ms"] = self._average(*self._cold)
+            row["warm_avg_ms"] = self._average(*self._warm)
+
+        # instrumented sessions also get the average of each phase
+        if self.instrumented:
+            for name in phase_columns:
+                row[name] = self._average(self._phase_count, self._phase_totals[name])
+
+        # adaptive sessions say how many samples it took and how tight the result is
+        if self.adaptive:
+            bound = self.error_bound()
+            row["samples_used"] = self.recorded
+            row["error_ms"] = round(bound, 2) if bound is not None else None
+            row["converged"] = self.converged
+
+        # open-loop sessions: min/max/avg count from the intended send times,
+        # service_* is the uncorrected send -> response time
+        if self.open_loop:
+            count, total, longest = self._service
+            row["rate_per_s"] = self.rate
+            row["arrival"] = self.arrival
+            row["late"] = self.late
+            row["dropped"] = self.dropped
+            row["service_avg_ms"] = self._average(count, total)
+            row["service_max_ms"] = round(longest, 2) if count else None
+
         return row
 
     def __str__(self):
@@ -130,4 +466,35 @@ class LatencyTester:
             f"Avg (ms): {session['avg_ms']}"
         )
 
+        if self.pooled:
+            text += (
+                f"\nCold avg (ms): {session['cold_avg_ms']}"
+                f"\nWarm avg (ms): {session['warm_avg_ms']}"
+            )
+
+        if self.instrumented:
+            text += (
+                f"\nDNS (ms): {session['dns_ms']}"
+                f"\nConnect (ms): {session['connect_ms']}"
+                f"\nTLS (ms): {session['tls_ms']}"
+                f"\nTTFB (ms): {session['ttfb_ms']}"
+                f"\nBody (ms): {session['body_ms']}"
+            )
+
+        if self.adaptive:
+            text += (
+                f"\nSamples used: {session['samples_used']} of {self.attempts}"
+                f"\nError bound (ms): +/- {session['error_ms']}"
+                f"\nConverged: {session['converged']}"
+            )
+
+        if self.open_loop:
+            text += (
+                f"\nRate (req/s): {session['rate_per_s']} ({session['arrival']})"
+                f"\nLate sends: {session['late']}"
+                f"\nDropped sends: {session['dropped']}"
+                f"\nService avg (ms): {session['service_avg_ms']}"
+                f"\nService max (ms): {session['service_max_ms']}"
+            )
+
         return text
@@ -0,0 +1,147 @@
+"""
+File: open_loop.py
+Description: Open-loop load generation for LatencyTester sessions,
+    run_tests and AsyncProbeEngine are closed-loop: a session's next request
+    only goes out once the last one came back. When a server stalls the
+    prober stalls with it, takes one slow sample instead of every request
+    users would have sent meanwhile, and max_ms / avg_ms come out far too
+    low (coordinated omission).
+    Open-loop sessions send on a fixed schedule (constant rate or Poisson
+    arrivals) however slow the answers are, with up to max_in_flight
+    requests outstanding, and every latency is measured from the time the
+    request was supposed to go out:
+        - late: sent more than late_after seconds after its intended time
+          (every slot was busy, or the event loop fell behind)
+        - dropped: no slot freed up within timeout of its intended time,
+          never sent and counted as a failure
+    Rows have the usual columns plus the rate, late / dropped counts and the
+    uncorrected service time (send -> response) to compare against.
+
+Author: William TenCate
+Email: wtencate@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import asyncio
+import random
+import time
+
+from latency import dns_cache as dns
+from latency.async_tester import fetch_status
+from latency.result import Result
+
+arrivals = ("constant", "poisson")
+
+
+def arrival_offsets(rate, count, arrival="constant", seed=None):
+    """
+    Seconds after the start at which each of count requests should be sent.
+        constant: evenly spaced, 1 / rate apart
+        poisson: exponential gaps averaging 1 / rate (same seed, same schedule)
+    """
+    if arrival == "constant":
+        return [i / rate for i in range(count)]
+    if arrival != "poisson":
+        raise ValueError(f"arrival must be one of {arrivals}.")
+
+    rng = random.Random(seed)
+    offsets = []
+    at = 0.0
+    for _ in range(count):
+        offsets.append(at)
+        at += rng.expovariate(rate)
+    return offsets
+
+
+async def run_open_loop_async(tester, ssl_context=None):
+    """
+    Send tester.attempts requests on the tester's arrival schedule and record
+    them on it (in attempt order), so create_session_row works as usual.
+    """
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(tester.max_in_flight)  # has to be made inside the running loop
+
+    tester.results.clear()
+    tester.reset_stats()
+
+    if tester.dns_cache is not None:
+        await asyncio.to_thread(tester.dns_cache.preresolve, [tester.url])
+
+    offsets = arrival_offsets(tester.rate, tester.attempts, tester.arrival, tester.seed)
+    start = loop.time()
+    wall_start = time.time()
+
+    tasks = []
+    for attempt, offset in enumerate(offsets, 1):
+        intended = start + offset
+        wait = intended - loop.time()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        # behind schedule = no sleep, the backlog goes out right away
+        tasks.append(
+            asyncio.create_task(
+                _send(tester, attempt, intended, wall_start + offset, slots, ssl_context)
+            )
+        )
+
+    for result, service_ms, late in await asyncio.gather(*tasks):
+        tester.record_send(result, service_ms, late)
+
+
+def run_open_loop(tester, ssl_context=None):
+    """
+    Blocking wrapper around run_open_loop_async. Returns the tester.
+    """
+    asyncio.run(run_open_loop_async(tester, ssl_context))
+    return tester
+
+
+async def _send(tester, attempt, intended, intended_at, slots, ssl_context):
+    """
+    One scheduled request. Returns (Result, service ms or None if dropped, late).
+    Result.elapsed_ms counts from the intended send time, the wait for a
+    slot included.
+    """
+    loop = asyncio.get_running_loop()
+
+    # wait for a slot however long it takes (an in-flight request always ends
+    # within its timeout), then give up on the send if it's too late to matter
+    await slots.acquire()
+    sent = loop.time()
+
+    if sent - intended > tester.timeout:
+        slots.release()
+        result = Result(
+            tester.url,
+            attempt,
+            (sent - intended) * 1000,
+            None,
+            False,
+            reused=False,
+            timestamp=intended_at,
+        )
+        return result, None, False
+
+    dns.start_lookups()
+    try:
+        status = await fetch_status(tester.url, tester.timeout, ssl_context, tester.dns_cache)
+        ok = True
+    except Exception:
+        status = None
+        ok = False
+    finally:
+        slots.release()
+    done = loop.time()
+
+    result = Result(
+        tester.url,
+        attempt,
+        (done - intended) * 1000,
+        status,
+        ok,
+        reused=False,  # fetch_status opens a fresh connection every time
+        timestamp=intended_at,
+        dns_hit=dns.lookup_hit(),
+    )
+    return result, (done - sent) * 1000, sent - intended > tester.late_after
@@ -0,0 +1,143 @@
+"""
+File: probe.py
+Description: Instrumented HTTP probe that times every phase of a request,
+    DNS resolution, TCP connect, TLS handshake, time to first byte (TTFB)
+    and body transfer, each measured with time.perf_counter_ns.
+    requests.get only gives us one number for the whole thing, which
+    can't tell us why a URL got slower.
+
+Author: William TenCate
+Email: wtencate@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import socket
+import ssl
+import time
+
+from latency.http_wire import Target, max_redirects, next_hop, parse_headers, parse_status
+
+# per-phase columns added to the session row / results file
+phase_columns = ["dns_ms", "connect_ms", "tls_ms", "ttfb_ms", "body_ms"]
+
+
+def timed_get(url, timeout=5, ssl_context=None, dns_cache=None):
+    """
+    GET url (following redirects) and time each phase.
+    Returns (status_code, phases) where phases maps each name in
+    phase_columns to milliseconds, summed over every redirect hop.
+    Raises on DNS / connection errors and timeouts like requests.get.
+    dns_cache: a DnsCache to resolve through (dns_ms is then the cache lookup)
+    """
+    phases = dict.fromkeys(phase_columns, 0.0)
+
+    for _ in range(max_redirects + 1):
+        status, location, hop = _timed_get_once(url, timeout, ssl_context, dns_cache)
+
+        for name in phase_columns:
+            phases[name] += hop[name]
+
+        following = next_hop(url, status, location)
+        if following:
+            url = following
+            continue
+
+        break
+
+    return status, phases
+
+
+def _ms(start_ns, end_ns):
+    return (end_ns - start_ns) / 1_000_000
+
+
+def _timed_get_once(url, timeout, ssl_context, dns_cache=None):
+    target = Target(url)
+    host, port = target.host, target.port
+
+    hop = {}
+
+    # DNS
+    t0 = time.perf_counter_ns()
+    if dns_cache is not None:
+        addresses = dns_cache.addresses(host, port)
+    else:
+        addresses = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    t1 = time.perf_counter_ns()
+    hop["dns_ms"] = _ms(t0, t1)
+
+    # TCP connect (try each address like socket.create_connection does)
+    sock = None
+    error = None
+    for family, socktype, proto, _, address in addresses:
+        sock = socket.socket(family, socktype, proto)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(address)
+            break
+        except OSError as e:
+            error = e
+            sock.close()
+            sock = None
+    if sock is None:
+        raise error or OSError(f"Could not connect to {host}")
+    t2 = time.perf_counter_ns()
+    hop["connect_ms"] = _ms(t1, t2)
+
+    try:
+        # TLS handshake (plain http has none, so it stays 0)
+        t3 = t2
+        if target.secure:
+            context = ssl_context or ssl.create_default_context()
+            sock = context.wrap_socket(
+                sock, server_hostname=host, do_handshake_on_connect=False
+            )
+            sock.do_handshake()
+            t3 = time.perf_counter_ns()
+        hop["tls_ms"] = _ms(t2, t3)
+
+        sock.sendall(target.request())
+
+        # TTFB: request sent -> first byte of the response back
+        data = sock.recv(65536)
+        t4 = time.perf_counter_ns()
+        hop["ttfb_ms"] = _ms(t3, t4)
+        if not data:
+            raise ConnectionError(f"{host} closed the connection without answering")
+
+        status, location, length, body_start = _read_head(sock, data)
+
+        # body transfer
+        received = len(data) - body_start
+        while length is None or received < length:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break  # server closed, body is done
+            received += len(chunk)
+        t5 = time.perf_counter_ns()
+        hop["body_ms"] = _ms(t4, t5)
+
+        return status, location, hop
+
+    finally:
+        sock.close()
+
+
+def _read_head(sock, data):
+    """
+    Read until the end of the response headers.
+    Returns (status, location, content_length or None, offset of body in data).
+    """
+    while b"\r\n\r\n" not in data:
+        chunk = sock.recv(65536)
+        if not chunk:
+            raise ConnectionError("Connection closed in the middle of the headers")
+        data += chunk
+
+    head, _, _ = data.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = parse_status(lines[0])
+    location, length = parse_headers(lines[1:])
+
+    return status, location, length, len(head) + 4
@@ -1,27 +1,203 @@
 """
 File: result.py
 Description: Result class for an individual test (every "attempt") in a testing session inside of the LatencyTester class.
+    ResultList stores a whole session's results as flat arrays instead of objects.
 Author: William TenCate
 Email: wtencate@stevens.edu
 Created: 12/01/25
-Last Edited: 12/01/25
+Last Edited: 10/18/26
 """
 
+import math
+import time
+from array import array
+
+from latency.probe import phase_columns
+
 
 class Result:
     """
     Container like class to hold individual testing attemptes per session
     """
 
-    def __init__(self, url, attempt, elapsed_ms, status_code, ok):
+    # no per-instance __dict__, a Result is about a third of the size
+    __slots__ = ("url", "attempt", "elapsed_ms", "status_code", "ok", "reused", "phases", "timestamp", "dns_hit")
+
+    def __init__(
+        self,
+        url,
+        attempt,
+        elapsed_ms,
+        status_code,
+        ok,
+        reused=None,
+        phases=None,
+        timestamp=None,
+        dns_hit=None,
+    ):
         self.url = url
         self.attempt = attempt
         self.elapsed_ms = elapsed_ms
         self.status_code = status_code
         self.ok = ok
+        # True if the request went over an already open (warm) connection,
+        # False if it had to open a fresh (cold) one, None if unknown
+        self.reused = reused
+        # per-phase timings in ms (dns_ms, connect_ms, tls_ms, ttfb_ms, body_ms),
+        # only filled in by the instrumented probe
+        self.phases = phases
+        # unix time the request was sent, used by the raw sample store
+        self.timestamp = timestamp if timestamp is not None else time.time()
+        # True if the hostname came from the DNS cache, False if the resolver
+        # had to be asked, None if no cache was used (or nothing was looked up)
+        self.dns_hit = dns_hit
 
     def __str__(self):  # str formatting for debug purposes, probably unused
         if self.ok:
             return f"{self.url} attempt {self.attempt}: {self.elapsed_ms:.2f} ms (status {self.status_code})"
         else:
             return f"{self.url} attempt {self.attempt}: ERROR after {self.elapsed_ms:.2f} ms"
+
+
+class ResultList:
+    """
+    Compact list of one session's Results, stored column by column:
+        elapsed_ms / timestamp: array('d')
+        attempt: array('I'), status_code: array('H') (0 = no response)
+        ok: bitset, reused / dns_hit: array('b') (-1 = unknown)
+        phases: array('d'), 5 per attempt, only once an attempt has phases
+    About 30 bytes per attempt instead of a few hundred for a Result object.
+    Indexing or iterating builds Result objects on the fly, so code written
+    for a list of Results keeps working.
+    """
+
+    def __init__(self, url=None):
+        self.url = url
+        self.clear()
+
+    def clear(self):
+        self._attempt = array("I")
+        self._elapsed = array("d")
+        self._status = array("H")
+        self._ok = bytearray()
+        self._reused = array("b")
+        self._dns_hit = array("b")
+        self._timestamp = array("d")
+        self._phases = None  # created on the first attempt that has phases
+
+    def __len__(self):
+        return len(self._elapsed)
+
+    def append(self, result):
+        n = len(self._elapsed)
+        if self.url is None:
+            self.url = result.url
+        elif result.url != self.url:
+            raise ValueError(f"ResultList is for {self.url}, got a result for {result.url}")
+
+        self._attempt.append(result.attempt)
+        self._elapsed.append(result.elapsed_ms)
+        self._status.append(result.status_code or 0)
+        self._reused.append(-1 if result.reused is None else int(result.reused))
+        self._dns_hit.append(-1 if result.dns_hit is None else int(result.dns_hit))
+        self._timestamp.append(result.timestamp)
+
+        if n % 8 == 0:
+            self._ok.append(0)
+        if result.ok:
+            self._ok[n >> 3] |= 1 << (n & 7)
+
+        if result.phases is not None and self._phases is None:
+            self._phases = array("d", [math.nan]) * (n * len(phase_columns))  # back fill
+        if self._phases is not None:
+            phases = result.phases or {}
+            self._phases.extend(phases.get(name, math.nan) for name in phase_columns)
+
+    def extend(self, results):
+        for result in results:
+            self.append(result)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("ResultList index out of range")
+
+        phases = None
+        if self._phases is not None:
+            values = self._phases[i * len(phase_columns):(i + 1) * len(phase_columns)]
+            if not math.isnan(values[0]):
+                phases = dict(zip(phase_columns, values))
+
+        reused = self._reused[i]
+        dns_hit = self._dns_hit[i]
+        return Result(
+            self.url,
+            self._attempt[i],
+            self._elapsed[i],
+            self._status[i] or None,
+            bool(self._ok[i >> 3] >> (i & 7) & 1),
+            None if reused < 0 else bool(reused),
+            phases,
+            self._timestamp[i],
+            None if dns_hit < 0 else bool(dns_hit),
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def _ok_mask(self):
+        import numpy as np
+
+        bits = np.frombuffer(bytes(self._ok), dtype=np.uint8)
+        return np.unpackbits(bits, bitorder="little")[:len(self)].astype(bool)
+
+    def columns(self):
+        """
+        The stored columns as numpy arrays (ok is unpacked from the bitset).
+        Copies, so the session can keep appending while they're in use.
+        """
+        import numpy as np
+
+        def column(values, dtype):
+            return np.frombuffer(values, dtype=dtype).copy()
+
+        return {
+            "attempt": column(self._attempt, np.uint32),
+            "elapsed_ms": column(self._elapsed, np.float64),
+            "status_code": column(self._status, np.uint16),
+            "ok": self._ok_mask(),
+            "timestamp": column(self._timestamp, np.float64),
+        }
+
+    def summary(self):
+        """
+        count / min / max / mean of the successful latencies, vectorized.
+        min/max/mean are None if nothing succeeded.
+        """
+        import numpy as np
+
+        ok_ms = np.frombuffer(self._elapsed, dtype=np.float64)[self._ok_mask()]  # mask makes a copy
+        if len(ok_ms) == 0:
+            return {"count": 0, "min": None, "max": None, "mean": None}
+        return {
+            "count": int(len(ok_ms)),
+            "min": float(ok_ms.min()),
+            "max": float(ok_ms.max()),
+            "mean": float(ok_ms.mean()),
+        }
+
+    def nbytes(self):
+        """
+        Bytes used by the stored columns.
+        """
+        size = len(self._ok)
+        for column in (self._attempt, self._elapsed, self._status, self._reused, self._dns_hit, self._timestamp, self._phases):
+            if column is not None:
+                size += column.itemsize * len(column)
+        return size
@@ -0,0 +1,156 @@
+"""
+File: sketch.py
+Description: Mergeable streaming quantile sketch for latency values (DDSketch style),
+    Every value goes into a logarithmic bucket, so any quantile can be read
+    back within a fixed relative error (1% by default) while only storing
+    bucket counts, never the samples themselves.
+    Memory is capped by max_bins no matter how many values are added, and
+    two sketches merge by adding their bucket counts, which is how
+    per-session sketches from the results file get combined per URL.
+
+Author: William TenCate
+Email: wtencate@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import math
+
+sketch_version = "1"
+
+
+class LatencySketch:
+    """
+    Quantile sketch with relative accuracy alpha.
+        alpha: relative error of any quantile (0.01 = within 1%)
+        max_bins: most buckets kept, the lowest ones get folded together past this
+    """
+
+    def __init__(self, alpha=0.01, max_bins=2048):
+        if not 0 < alpha < 1:
+            raise ValueError("alpha must be between 0 and 1.")
+        if max_bins <= 0:
+            raise ValueError("max_bins must be > 0.")
+
+        self.alpha = alpha
+        self.max_bins = max_bins
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+
+        self.bins = {}  # bucket index -> count
+        self.zero_count = 0  # values <= 0 (can't take a log of them)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        """
+        Add one latency value (ms).
+        """
+        if value <= 0:
+            self.zero_count += 1
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[index] = self.bins.get(index, 0) + 1
+            if len(self.bins) > self.max_bins:
+                self._collapse()
+
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        """
+        Fold another sketch (same alpha) into this one.
+        """
+        if other.count == 0:
+            return self
+        if not math.isclose(other.alpha, self.alpha):
+            raise ValueError("Can't merge sketches with different alpha.")
+
+        for index, n in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + n
+        while len(self.bins) > self.max_bins:
+            self._collapse()
+
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def _collapse(self):
+        # fold the two lowest buckets together: only low quantiles lose accuracy,
+        # the tail (what we get paged on) stays exact to alpha
+        lowest, second = sorted(self.bins)[:2]
+        self.bins[second] += self.bins.pop(lowest)
+
+    def quantile(self, q):
+        """
+        Value at quantile q (0.5 = median, 0.99 = p99), or None if empty.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1.")
+        if self.count == 0:
+            return None
+
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return max(self.min, 0.0)
+
+        seen = self.zero_count
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if seen > rank:
+                # middle of the bucket, which is within alpha of every value in it
+                value = 2 * self.gamma**index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def to_string(self):
+        """
+        Compact text form for the results file, e.g.
+            1|0.01|0|3|12.5|30.1|61.2|125:1 126:1 170:1
+        (version|alpha|zeros|count|min|max|sum|bucket:count ...)
+        No commas, so it sits in one CSV cell without quoting.
+        """
+        buckets = " ".join(f"{i}:{n}" for i, n in sorted(self.bins.items()))
+        return "|".join(
+            [
+                sketch_version,
+                repr(self.alpha),
+                str(self.zero_count),
+                str(self.count),
+                repr(self.min) if self.min is not None else "",
+                repr(self.max) if self.max is not None else "",
+                repr(self.total),
+                buckets,
+            ]
+        )
+
+    @classmethod
+    def from_string(cls, text, max_bins=2048):
+        """
+        Rebuild a sketch written by to_string.
+        """
+        parts = text.split("|")
+        if len(parts) != 8 or parts[0] != sketch_version:
+            raise ValueError(f"Not a latency sketch: {text[:40]!r}")
+
+        sketch = cls(alpha=float(parts[1]), max_bins=max_bins)
+        sketch.zero_count = int(parts[2])
+        sketch.count = int(parts[3])
+        sketch.min = float(parts[4]) if parts[4] else None
+        sketch.max = float(parts[5]) if parts[5] else None
+        sketch.total = float(parts[6])
+        for pair in parts[7].split():
+            index, n = pair.split(":")
+            sketch.bins[int(index)] = int(n)
+        return sketch
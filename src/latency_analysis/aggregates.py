@@ -0,0 +1,198 @@
+"""
+File: aggregates.py
+Description: Mergeable running aggregates over session rows,
+    Keeps sums, counts, min/max and a Welford mean/variance of avg_ms
+    for one URL (or for everything), so statistics can be updated with
+    only the new rows instead of regrouping the whole results file.
+    Two aggregates merge with Chan's parallel variance formula, so
+    partial aggregates from different chunks/files combine exactly.
+Author: Johnathan Vu
+Email: jvu2@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import math
+
+from latency.probe import phase_columns
+from latency.sketch import LatencySketch
+from latency_utils.io_utils import read_latency_csv
+
+
+class LatencyAggregate:
+    """
+    Running summary of session rows (the same numbers per_url_statistics needs).
+    """
+
+    def __init__(self):
+        self.sessions = 0
+        self.attempts = 0
+        self.successes = 0
+        self.failures = 0
+        self.min_ms = math.nan
+        self.max_ms = math.nan
+        # Welford running mean / sum of squared differences of avg_ms
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        # per-phase averages from instrumented sessions
+        self.phase_sums = dict.fromkeys(phase_columns, 0.0)
+        self.phase_counts = dict.fromkeys(phase_columns, 0)
+        self.sketch = None  # merged session sketches, if rows have them
+
+    @property
+    def avg_ms(self):
+        return self.mean if self.n else math.nan
+
+    @property
+    def std_ms(self):
+        # sample standard deviation (ddof=1) like pandas .std()
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else math.nan
+
+    def phase_avg(self, phase):
+        count = self.phase_counts[phase]
+        return self.phase_sums[phase] / count if count else math.nan
+
+    def merge(self, other):
+        """
+        Fold another aggregate into this one (exact, order doesn't matter).
+        """
+        self.sessions += other.sessions
+        self.attempts += other.attempts
+        self.successes += other.successes
+        self.failures += other.failures
+        self.min_ms = _nan_min(self.min_ms, other.min_ms)
+        self.max_ms = _nan_max(self.max_ms, other.max_ms)
+
+        # Chan et al. parallel combination of two (n, mean, M2) summaries
+        if other.n:
+            total = self.n + other.n
+            delta = other.mean - self.mean
+            self.mean += delta * other.n / total
+            self.m2 += other.m2 + delta * delta * self.n * other.n / total
+            self.n = total
+
+        for phase in phase_columns:
+            self.phase_sums[phase] += other.phase_sums[phase]
+            self.phase_counts[phase] += other.phase_counts[phase]
+
+        if other.sketch is not None:
+            if self.sketch is None:
+                self.sketch = LatencySketch(alpha=other.sketch.alpha)
+            self.sketch.merge(other.sketch)
+
+        return self
+
+
+def _nan_min(a, b):
+    if math.isnan(a):
+        return b
+    if math.isnan(b):
+        return a
+    return min(a, b)
+
+
+def _nan_max(a, b):
+    if math.isnan(a):
+        return b
+    if math.isnan(b):
+        return a
+    return max(a, b)
+
+
+def aggregate_frame(df, by="url"):
+    """
+    Build one LatencyAggregate per value of column by from a DataFrame of
+    session rows. The heavy lifting is a single vectorized groupby.
+    Returns a dict of key -> LatencyAggregate.
+    """
+    if df.empty:
+        return {}
+
+    grouped = df.groupby(by, observed=True, sort=False)
+    table = grouped.agg(
+        sessions=("attempts", "size"),
+        attempts=("attempts", "sum"),
+        successes=("successes", "sum"),
+        failures=("failures", "sum"),
+        min_ms=("min_ms", "min"),
+        max_ms=("max_ms", "max"),
+        n=("avg_ms", "count"),
+        mean=("avg_ms", "mean"),
+        var=("avg_ms", "var"),
+    )
+
+    phases = [p for p in phase_columns if p in df.columns]
+    if phases:
+        phase_sums = grouped[phases].sum().reindex(table.index)
+        phase_counts = grouped[phases].count().reindex(table.index)
+        phase_values = [
+            (phase, phase_sums[phase].tolist(), phase_counts[phase].tolist()) for phase in phases
+        ]
+
+    # plain python lists, one per column: indexing a row Series per URL
+    # (iterrows) costs more than the whole groupby on wide URL sets
+    columns = zip(
+        table.index,
+        table["sessions"].tolist(), table["attempts"].tolist(),
+        table["successes"].tolist(), table["failures"].tolist(),
+        table["min_ms"].tolist(), table["max_ms"].tolist(),
+        table["n"].tolist(), table["mean"].tolist(), table["var"].tolist(),
+    )
+
+    aggregates = {}
+    for i, (key, sessions, attempts, successes, failures, min_ms, max_ms, n, mean, var) in enumerate(columns):
+        agg = LatencyAggregate()
+        agg.sessions = int(sessions)
+        agg.attempts = int(attempts)
+        agg.successes = int(successes)
+        agg.failures = int(failures)
+        agg.min_ms = float(min_ms)
+        agg.max_ms = float(max_ms)
+        agg.n = int(n)
+        if agg.n:
+            agg.mean = float(mean)
+        if agg.n > 1:
+            agg.m2 = float(var) * (agg.n - 1)  # pandas var is ddof=1
+        if phases:
+            for phase, sums, counts in phase_values:
+                agg.phase_sums[phase] = float(sums[i])
+                agg.phase_counts[phase] = int(counts[i])
+        aggregates[key] = agg
+
+    # sketches are strings, so they have to be parsed one row at a time
+    if "sketch" in df.columns:
+        rows = df[[by, "sketch"]].dropna()
+        for key, text in zip(rows[by], rows["sketch"]):
+            sketch = LatencySketch.from_string(text)
+            agg = aggregates[key]
+            if agg.sketch is None:
+                agg.sketch = sketch
+            else:
+                agg.sketch.merge(sketch)
+
+    return aggregates
+
+
+def merge_aggregates(target, new):
+    """
+    Merge dict new (key -> LatencyAggregate) into dict target in place.
+    """
+    for key, agg in new.items():
+        if key in target:
+            target[key].merge(agg)
+        else:
+            target[key] = agg
+    return target
+
+
+def aggregate_csv(csv_file_path=None, chunksize=1_000_000, by="url"):
+    """
+    Aggregate a results file chunk by chunk, for files bigger than memory.
+    Only one chunk is ever loaded at a time.
+    Returns a dict of key -> LatencyAggregate.
+    """
+    aggregates = {}
+    for chunk in read_latency_csv(csv_file_path, chunksize=chunksize):
+        merge_aggregates(aggregates, aggregate_frame(chunk, by))
+    return aggregates
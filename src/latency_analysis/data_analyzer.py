@@ -0,0 +1,675 @@
+# DataAnalyzer class. Take in CSV from the data folder and then use pandas to do sstuff to it. 
+"""
+File: data_analyzer.py
+Description: Data analysis class,
+    Generate meaningful statistics from collected latency data.
+Author: Johnathan Vu
+Email: jvu2@stevens.edu
+Created: 12/01/25
+Last Edited: 10/18/26
+"""
+
+import math
+import os
+import numpy as np
+import pandas as pd
+from latency_utils.instrumentation import timed
+from latency_utils.io_utils import concat_results, open_backend, read_appended_rows
+from latency_utils.sample_store import SampleStore
+from latency.probe import phase_columns
+from latency.sketch import LatencySketch
+from .aggregates import LatencyAggregate, aggregate_frame, merge_aggregates
+from .stats_cache import StatsCache, cache_path_for
+from .partitions import PartitionSet
+from .rollups import RollupStore, raw_rows_between, rollup_aggregates
+
+# quantiles reported from the merged session sketches
+sketch_quantiles = {"p50_ms": 0.5, "p90_ms": 0.9, "p99_ms": 0.99, "p999_ms": 0.999}
+
+class DataAnalyzer:
+    def __init__(self, csv_file_path=None, data_analyzer=None, dataframe=None, incremental=False,
+                 persist_stats=False, rollups=None, partitions=None, start=None, end=None, workers=None):
+        """
+        Initializes DataAnalyzer either from:
+            - latency data from a csv file
+            - partitioned results files (partitions= glob or folder, see latency_analysis.partitions)
+            - a SQLite results database (.db / .sqlite path, or any ResultsBackend,
+              see latency_utils.io_utils.open_backend)
+            - a dataframe
+            - DataAnalyzer instance
+
+        With a SQLite database the rows are only read when something needs them:
+        per_url_statistics and overall_statistics run as SQL aggregates, and
+        query() filters in the database using its indexes.
+
+        incremental=True (csv file only) keeps running per-URL aggregates and
+        remembers how far into the file it has read, so refresh() only has
+        to parse the rows appended since the last load.
+
+        Derived statistics are cached until the data changes. persist_stats=True
+        (csv file only) also saves them next to the csv file, so the next load
+        of an unchanged file skips the recompute.
+
+        rollups=True (csv file only, or pass a RollupStore) lets range_statistics
+        answer time ranges from the 1 min / 1 h / 1 day rollup tables.
+
+        partitions="results/partitions" (or a glob like ".../host=*/date=2026-10-*/*.csv")
+        reads every partition with run_started_at in [start, end]. Partitions outside
+        the range are skipped from their metadata, the rest are aggregated in parallel
+        by up to workers processes and merged. per_url_statistics and overall_statistics
+        come from the merged aggregates, the rows are only read when something needs them.
+        """
+        self._data = None
+        self._pending = []  # incremental mode: chunks read by refresh(), concatenated on first use of .data
+        self._lazy = False  # rows still in the backend, read on first use of .data
+        self.backend = None
+        self.csv_file_path = None
+        self.incremental = False
+        self.aggregates = None  # url -> LatencyAggregate, only in incremental / partitioned mode
+        self._indexes = None  # lookup indexes for query(), built on first use
+        self.stats_cache = StatsCache()
+        self.rollups = None
+
+        if dataframe is not None:
+            self.data = dataframe
+            return
+
+        if data_analyzer is not None:
+            self.data = data_analyzer.data
+            return
+
+        if partitions is not None:
+            if csv_file_path is not None or incremental or rollups or persist_stats:
+                raise ValueError("partitions can't be combined with a results file, incremental, rollups or persist_stats")
+            self.backend = PartitionSet(partitions, start, end, workers)
+            self.csv_file_path = partitions
+            if not self.backend.partitions:
+                raise ValueError(f"No results partitions in that time range: {partitions}")
+            self.aggregates = self.backend.aggregate()
+            if not self.aggregates:
+                raise ValueError(f"No sessions in that time range: {partitions}")
+            self._lazy = True
+            return
+        if start is not None or end is not None:
+            raise ValueError("start and end are for partitions, use query() to slice a results file")
+
+        if csv_file_path is None:
+            csv_file_path = "../results/results.csv"
+
+        self.backend = open_backend(csv_file_path)
+        csv_file_path = self.csv_file_path = self.backend.path
+        if self.backend.kind != "csv" and (incremental or rollups):
+            raise ValueError("incremental and rollups need a csv results file")
+
+        if rollups is True:
+            rollups = RollupStore(csv_file_path)
+        self.rollups = rollups
+
+        if incremental:
+            if persist_stats:
+                raise ValueError("persist_stats needs a full load, not incremental=True")
+            self.incremental = True
+            self._reset_incremental()
+            self.refresh()
+            return
+
+        # fingerprint before reading, so a cache is never tied to rows we didn't see
+        fingerprint = self.backend.fingerprint()
+
+        if self.backend.supports_aggregates:
+            if fingerprint is None:
+                self.backend.read_frame()  # missing or empty: raises like the csv does
+            self._lazy = True
+        else:
+            # use helper function to read csv file and handle any errors
+            self.data = self.backend.read_frame()
+
+        if persist_stats:
+            self.stats_cache = StatsCache(cache_path_for(csv_file_path), fingerprint)
+
+    @property
+    def data(self):
+        """
+        The results rows as a DataFrame. A SQLite backend only reads them on first use.
+        In incremental mode the chunks refresh() read are joined here, not on every
+        refresh, so a refresh costs as much as the new rows however long the history is.
+        """
+        if self._lazy:
+            self._lazy = False
+            self._data = self.backend.read_frame()
+        if self._pending:
+            frames = self._pending if self._data is None else [self._data] + self._pending
+            self._pending = []
+            self._data = frames[0] if len(frames) == 1 else concat_results(frames)
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._pending = []
+        self._data = value
+
+    @property
+    def data_version(self):
+        """
+        Goes up by one every time the data changes (new rows ingested).
+        """
+        return self.stats_cache.version
+
+    def _data_changed(self):
+        # everything derived from the old rows is stale now
+        self._indexes = None
+        self.stats_cache.invalidate()
+
+    def _reset_incremental(self):
+        self.data = None
+        self.aggregates = {}
+        self._offset = 0  # bytes of the file already ingested
+        self._header = None
+        self._file_id = None
+
+    def refresh(self):
+        """
+        Incremental mode: ingest only the rows appended to the csv file since
+        the last load and fold them into the running aggregates.
+        Starts over if the file was replaced, cleared or had its header widened.
+        Returns the number of new rows.
+        """
+        if not self.incremental:
+            raise ValueError("refresh() needs DataAnalyzer(..., incremental=True)")
+
+        # Check if file exists
+        if not os.path.exists(self.csv_file_path):
+            raise FileNotFoundError(f"CSV file not found: {self.csv_file_path}")
+
+        info = os.stat(self.csv_file_path)
+        file_id = (info.st_dev, info.st_ino)
+        if file_id != self._file_id or info.st_size < self._offset:
+            if self._file_id is not None:
+                self._data_changed()
+            self._reset_incremental()
+        self._file_id = file_id
+
+        if info.st_size == self._offset and self._header is not None:
+            return 0  # nothing new
+
+        new_rows, self._offset = read_appended_rows(
+            self.csv_file_path, self._offset, self._header
+        )
+        if self._header is None:
+            self._header = list(new_rows.columns)
+
+        merge_aggregates(self.aggregates, aggregate_frame(new_rows))
+
+        # the first (maybe empty) chunk gives .data its columns, later ones only if they have rows
+        if (self._data is None and not self._pending) or not new_rows.empty:
+            self._pending.append(new_rows)
+        if not new_rows.empty:
+            self._data_changed()
+
+        return len(new_rows)
+
+    def per_url_statistics(self):
+        """
+        Generate meaningful statistics for each URL tested.
+        Returns a pandas DataFrame with statistics per URL.
+            - Total Attempts
+            - Total Successes
+            - Total Failures
+            - Success Rate (%)
+            - Failure Rate (%)
+            - Minimum Latency (ms)
+            - Maximum Latency (ms)
+            - Average Latency (ms)
+            - Average DNS / Connect / TLS / TTFB / Body time (ms), if the
+              results file has instrumented sessions in it
+            - p50 / p90 / p99 / p99.9 Latency (ms), merged from session sketches
+
+        Computes additional statistics:
+            - Latency range: tells us the spread of latency values. Lower is better.
+            - Maximum deviation from average latency: tells us worst-case scenario compared to average. Higher is worse.
+            - Coefficient of Variation for latency: shows how consistent the latency is. Lower is better.
+            - Performance score: score is based on avg latency and success rate. Higher is better.
+
+        Cached until the data changes.
+        """
+        return self.stats_cache.get("per_url", self._compute_per_url_statistics)
+
+    @timed("analysis.per_url_statistics")  # cache misses only, hits cost nothing worth timing
+    def _compute_per_url_statistics(self):
+        try:
+            if self.aggregates is not None:
+                # incremental / partitioned mode: the aggregates already have everything
+                per_url = self._per_url_from_aggregates()
+            elif self._lazy:
+                # rows not loaded yet, let the database do the grouping
+                per_url = self._per_url_from_backend()
+            else:
+                if self.data is None:
+                    raise ValueError("self.data is empty.")
+                per_url = self._per_url_from_data()
+
+            return self._add_derived_columns(per_url)
+
+        except Exception as e:
+            raise RuntimeError(f"per_url_statistics() failed: {e}")
+
+    def _add_derived_columns(self, per_url):
+        """
+        Columns computed from the base per-URL columns.
+        """
+        # Latency Range: max_latency_ms - min_latency_ms
+        per_url["latency_range_ms"] = per_url["max_latency_ms"] - per_url["min_latency_ms"]
+        # Maximum Deviation from Average Latency: max_latency_ms - avg_latency_ms
+        per_url["max_dev_from_avg"] = per_url["max_latency_ms"] - per_url["avg_latency_ms"]
+        # Coefficient of Variation for Latency: (stddev_latency_ms / avg_latency_ms) * 100
+        per_url["cv_latency"] = (per_url["stddev_latency_ms"] / per_url["avg_latency_ms"]) * 100
+        per_url["cv_latency"] = per_url["cv_latency"].fillna(0).replace([float("inf"), -float("inf")], 0)
+        # Performance Score: (1000 / avg_latency_ms) * (successes_total / attempts_total)
+        per_url["performance_score"] = (1000 / per_url["avg_latency_ms"]) * (per_url["successes_total"] / per_url["attempts_total"])
+
+        return per_url
+
+    def _per_url_from_data(self):
+        """
+        Base per-URL columns computed by grouping self.data.
+        """
+        stats = self.data
+
+        # Group data by URL and calculate stats, only built-in (cython) aggregations
+        grouped = stats.groupby("url", observed=True)
+        per_url = grouped.agg(
+            attempts_total = ("attempts", "sum"),
+            successes_total = ("successes", "sum"),
+            failures_total = ("failures", "sum"),
+            min_latency_ms = ("min_ms", "min"),
+            max_latency_ms = ("max_ms", "max"),
+            avg_latency_ms = ("avg_ms", "mean"),
+            stddev_latency_ms = ("avg_ms", "std")
+        )
+
+        # success/failure rates from the summed columns: one vectorized division
+        # for every URL instead of a python callback + index lookup per group
+        per_url.insert(3, "success_rate", per_url["successes_total"] / per_url["attempts_total"] * 100)
+        per_url.insert(4, "failure_rate", per_url["failures_total"] / per_url["attempts_total"] * 100)
+
+        # Per-phase averages from instrumented sessions (e.g. dns_ms -> avg_dns_ms)
+        phases = [phase for phase in phase_columns if phase in stats.columns]
+        if phases:
+            per_url = per_url.join(grouped[phases].mean().add_prefix("avg_"))
+
+        # categorical url column -> plain string index, easier to look up / plot
+        if isinstance(per_url.index, pd.CategoricalIndex):
+            per_url.index = per_url.index.astype(str)
+
+        # Tail latency from the per-session quantile sketches
+        if "sketch" in stats.columns:
+            per_url = per_url.join(self.percentile_statistics(by="url"))
+
+        return per_url
+
+    def _per_url_from_backend(self):
+        """
+        Same base per-URL columns as _per_url_from_data, computed by the backend in SQL.
+        """
+        per_url = self.backend.per_url_aggregates()
+        per_url.insert(3, "success_rate", per_url["successes_total"] / per_url["attempts_total"] * 100)
+        per_url.insert(4, "failure_rate", per_url["failures_total"] / per_url["attempts_total"] * 100)
+
+        if "sketch" in self.backend.columns():
+            per_url = per_url.join(self.percentile_statistics(by="url"))
+
+        return per_url
+
+    def _per_url_from_aggregates(self, aggregates=None, columns=None):
+        """
+        Same base per-URL columns as _per_url_from_data, read straight off the
+        running aggregates (time depends on the number of URLs, not rows).
+        """
+        aggregates = self.aggregates if aggregates is None else aggregates
+        if columns is None:
+            if self._lazy:
+                columns = self.backend.columns()
+            elif self.incremental:
+                columns = self._header  # no need to join the pending chunks for the names
+            else:
+                columns = self.data.columns
+        rows = {}
+        for url, agg in aggregates.items():
+            row = {
+                "attempts_total": agg.attempts,
+                "successes_total": agg.successes,
+                "failures_total": agg.failures,
+                "success_rate": agg.successes / agg.attempts * 100 if agg.attempts else math.nan,
+                "failure_rate": agg.failures / agg.attempts * 100 if agg.attempts else math.nan,
+                "min_latency_ms": agg.min_ms,
+                "max_latency_ms": agg.max_ms,
+                "avg_latency_ms": agg.avg_ms,
+                "stddev_latency_ms": agg.std_ms,
+            }
+            for phase in phase_columns:
+                if phase in columns:
+                    row[f"avg_{phase}"] = agg.phase_avg(phase)
+            if "sketch" in columns:
+                for name, q in sketch_quantiles.items():
+                    value = agg.sketch.quantile(q) if agg.sketch is not None else None
+                    row[name] = math.nan if value is None else value
+            rows[url] = row
+
+        per_url = pd.DataFrame.from_dict(rows, orient="index").sort_index()
+        per_url.index.name = "url"
+        return per_url
+
+    def range_statistics(self, start=None, end=None):
+        """
+        per_url_statistics for sessions started in [start, end) (either can be None).
+        With rollups it answers from the coarsest rollup table whose buckets line
+        up with start and end (e.g. whole days -> the 1 day table), otherwise
+        from the raw rows. If retention already dropped those raw rows, the finest
+        table left is used, so the range gets rounded out to whole buckets.
+        Which one was used is in result.attrs["resolution"].
+        Rollup tables don't keep phase timings, so there are no avg_*_ms columns then.
+        """
+        if self.rollups is not None:
+            self.rollups.update()
+            resolution = self.rollups.pick_resolution(start, end)
+            if resolution is None and not self.rollups.covers("raw", start):
+                # raw rows for the range are gone, use whole buckets around it
+                resolution = self.rollups.finest_covering(start)
+            if resolution is not None:
+                table = self.rollups.load(resolution, start, end)
+                if table.empty:
+                    raise ValueError("No sessions in that time range.")
+                columns = list(table.columns)
+                if table["sketch"].isna().all():
+                    columns.remove("sketch")  # no percentile columns without sketches
+                per_url = self._per_url_from_aggregates(rollup_aggregates(table), columns)
+                per_url = self._add_derived_columns(per_url)
+                per_url.attrs["resolution"] = resolution
+                return per_url
+
+        subset = raw_rows_between(self.data, start, end)
+        if subset.empty:
+            raise ValueError("No sessions in that time range.")
+        per_url = DataAnalyzer(dataframe=subset).per_url_statistics()
+        per_url.attrs["resolution"] = "raw"
+        return per_url
+
+    def percentile_statistics(self, by="url"):
+        """
+        Merge the quantile sketch of every session per URL (or per label with by="label").
+        Returns a pandas DataFrame with p50_ms, p90_ms, p99_ms and p999_ms.
+        Rows from before sketches were recorded are skipped.
+        """
+        return self.stats_cache.get(("percentiles", by), lambda: self._compute_percentiles(by))
+
+    def _compute_percentiles(self, by):
+        if by not in ("url", "label"):
+            raise ValueError("by must be 'url' or 'label'")
+        columns = self.backend.columns() if self._lazy else self.data.columns
+        if "sketch" not in columns:
+            raise ValueError("Results data has no sketch column.")
+
+        merged = {}
+        if self._lazy:
+            rows = self.backend.read_frame(columns=[by, "sketch"]).dropna()  # just the two columns
+        else:
+            rows = self.data[[by, "sketch"]].dropna()
+        for key, text in zip(rows[by], rows["sketch"]):
+            sketch = LatencySketch.from_string(text)
+            if key in merged:
+                merged[key].merge(sketch)
+            else:
+                merged[key] = sketch
+
+        table = pd.DataFrame(
+            {
+                name: {key: sketch.quantile(q) for key, sketch in merged.items()}
+                for name, q in sketch_quantiles.items()
+            },
+            dtype=float,
+        )
+        table.index.name = by
+        return table
+
+    def sample_statistics(self, samples_path=None, by="url"):
+        """
+        Statistics from the raw per-attempt sample store instead of session averages.
+        Returns a pandas DataFrame per URL (or per label with by="label").
+            - Samples, Successes, Success Rate (%)
+            - Minimum / Maximum / Average Latency (ms)
+            - Standard Deviation of every sample (not of session averages)
+            - Real p50 / p90 / p99 Latency (ms)
+        """
+        if by not in ("url", "label"):
+            raise ValueError("by must be 'url' or 'label'")
+
+        try:
+            samples = SampleStore(samples_path).to_dataframe()
+            if samples.empty:
+                raise ValueError("sample store is empty.")
+
+            counts = samples.groupby(by, observed=True).agg(
+                samples=("ok", "size"),
+                successes=("ok", "sum"),
+            )
+            counts["success_rate"] = counts["successes"] / counts["samples"] * 100
+
+            # latency stats only count attempts that got a response
+            ok = samples[samples["ok"]].groupby(by, observed=True)["elapsed_ms"]
+            latency = ok.agg(["min", "max", "mean", "std"]).rename(
+                columns={
+                    "min": "min_latency_ms",
+                    "max": "max_latency_ms",
+                    "mean": "avg_latency_ms",
+                    "std": "stddev_latency_ms",
+                }
+            )
+            percentiles = ok.quantile([0.5, 0.9, 0.99]).unstack()
+            percentiles.columns = ["p50_ms", "p90_ms", "p99_ms"]
+
+            return counts.join(latency).join(percentiles).astype(float)
+
+        except FileNotFoundError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"sample_statistics() failed: {e}")
+
+    def overall_statistics(self):
+        """
+        Generate overall statistics across all URLs tested.
+        Returns a pandas Series with overall statistics.
+            - Total Attempts
+            - Total Successes
+            - Total Failures
+            - Overall Success Rate (%)
+            - Overall Average Latency (ms)
+            - Overall StdDev Latency (ms)
+            - Minimum Latency (ms)
+            - Maximum Latency (ms)
+
+        Cached until the data changes.
+        """
+        return self.stats_cache.get("overall", self._compute_overall_statistics)
+
+    @timed("analysis.overall_statistics")
+    def _compute_overall_statistics(self):
+        if self.aggregates is not None:
+            return self._overall_from_aggregates()
+        if self._lazy:
+            return self._overall_from_backend()
+
+        try:
+            return pd.Series({
+                "total_attempts": self.data["attempts"].sum(),
+                "total_successes": self.data["successes"].sum(),
+                "total_failures": self.data["failures"].sum(),
+                "overall_success_rate": self.data["successes"].sum() / self.data["attempts"].sum() * 100,
+                "overall_avg_latency_ms": self.data["avg_ms"].mean(),
+                "overall_stddev_latency_ms": self.data["avg_ms"].std(),
+                "min_latency_ms": self.data["min_ms"].min(),
+                "max_latency_ms": self.data["max_ms"].max()
+            })
+        
+        except Exception as e:
+            # Catches any underlying errors (missing columns, empty DF, bad values, divide-by-zero)
+            raise RuntimeError(f"overall_statistics() failed: {e}")
+        
+    def _overall_from_aggregates(self):
+        """
+        overall_statistics for incremental / partitioned mode, merged from the per-URL aggregates.
+        """
+        total = LatencyAggregate()
+        for agg in self.aggregates.values():
+            total.merge(agg)
+
+        if total.attempts == 0:
+            raise RuntimeError("overall_statistics() failed: no rows ingested yet")
+
+        return pd.Series({
+            "total_attempts": total.attempts,
+            "total_successes": total.successes,
+            "total_failures": total.failures,
+            "overall_success_rate": total.successes / total.attempts * 100,
+            "overall_avg_latency_ms": total.avg_ms,
+            "overall_stddev_latency_ms": total.std_ms,
+            "min_latency_ms": total.min_ms,
+            "max_latency_ms": total.max_ms
+        })
+
+    def _overall_from_backend(self):
+        """
+        overall_statistics with the sums, mean and stddev computed by the backend in SQL.
+        """
+        total = self.backend.overall_aggregates()
+        return pd.Series({
+            "total_attempts": total["total_attempts"],
+            "total_successes": total["total_successes"],
+            "total_failures": total["total_failures"],
+            "overall_success_rate": total["total_successes"] / total["total_attempts"] * 100,
+            "overall_avg_latency_ms": total["overall_avg_latency_ms"],
+            "overall_stddev_latency_ms": total["overall_stddev_latency_ms"],
+            "min_latency_ms": total["min_latency_ms"],
+            "max_latency_ms": total["max_latency_ms"]
+        })
+
+    def filter_by_value(self, column: str, value: str):
+        """
+        Return a filtered copy of the dataset where column == value.
+        url and label lookups go through the prebuilt indexes instead of scanning every row.
+        """
+        # Clean the value
+        value = str(value).strip()
+
+        # Column doesn't exist
+        if column not in self.data.columns:
+            print(f"\nColumn '{column}' does not exist in the dataset.")
+            return None
+
+        # Filter the data
+        if column in ("url", "label"):
+            filtered = self.data.iloc[self._positions(column, value)]
+        else:
+            filtered = self.data[self.data[column] == value].copy()
+
+        # No match
+        if filtered.empty:
+            print(f"\nNo rows found where {column} == '{value}'.")
+            return None
+
+        return filtered
+
+    def build_indexes(self):
+        """
+        Build the lookup indexes used by query() and filter_by_value:
+            - url -> row positions
+            - label -> row positions
+            - row positions sorted by run_started_at, for time windows
+        One pass over the data, then every lookup is a dict hit or binary search.
+        """
+        indexes = {}
+        for column in ("url", "label"):
+            if column in self.data.columns:
+                groups = self.data.groupby(column, observed=True).indices
+                indexes[column] = {str(key): rows for key, rows in groups.items()}
+
+        if "run_started_at" in self.data.columns:
+            times = pd.to_datetime(self.data["run_started_at"], errors="coerce").to_numpy()
+            order = np.argsort(times, kind="stable")  # NaT sorts to the end
+            indexes["time_order"] = order
+            indexes["sorted_times"] = times[order]
+
+        self._indexes = indexes
+        return indexes
+
+    def _positions(self, column, value):
+        indexes = self._indexes if self._indexes is not None else self.build_indexes()
+        if column not in indexes:
+            raise ValueError(f"Column '{column}' does not exist in the dataset.")
+        return indexes[column].get(value, np.empty(0, dtype=np.intp))
+
+    def _time_positions(self, start, end):
+        indexes = self._indexes if self._indexes is not None else self.build_indexes()
+        if "time_order" not in indexes:
+            raise ValueError("Column 'run_started_at' does not exist in the dataset.")
+
+        sorted_times = indexes["sorted_times"]
+        lo = 0
+        hi = np.searchsorted(sorted_times, np.datetime64("NaT"))  # skip unparsed times
+        if start is not None:
+            lo = np.searchsorted(sorted_times[:hi], np.datetime64(pd.Timestamp(start)), side="left")
+        if end is not None:
+            hi = np.searchsorted(sorted_times[:hi], np.datetime64(pd.Timestamp(end)), side="right")
+        return np.sort(indexes["time_order"][lo:hi])
+
+    def query(self, url=None, label=None, start=None, end=None):
+        """
+        Slice the dataset with any mix of filters (they are ANDed together):
+            url: exact URL
+            label: exact label
+            start / end: run_started_at window, inclusive (string or datetime)
+        Returns a new DataAnalyzer over just the matching rows, or None if nothing matches.
+        Uses the prebuilt indexes, so repeated slicing never rescans the whole table.
+        With a SQLite backend whose rows aren't loaded, the filters run in the database.
+        """
+        if self._lazy and any(value is not None for value in (url, label, start, end)):
+            subset = self.backend.read_frame(url=url, label=label, start=start, end=end)
+            if subset.empty:
+                print("\nNo rows found for that query.")
+                return None
+            return DataAnalyzer(dataframe=subset)
+
+        matches = None
+        for column, value in (("url", url), ("label", label)):
+            if value is not None:
+                rows = self._positions(column, str(value).strip())
+                matches = rows if matches is None else np.intersect1d(matches, rows, assume_unique=True)
+
+        if start is not None or end is not None:
+            rows = self._time_positions(start, end)
+            matches = rows if matches is None else np.intersect1d(matches, rows, assume_unique=True)
+
+        if matches is None:
+            return DataAnalyzer(dataframe=self.data)
+
+        if len(matches) == 0:
+            print("\nNo rows found for that query.")
+            return None
+
+        # a contiguous run of rows (e.g. a time window of an append-only file)
+        # is a cheap slice, anything else only gathers the matched rows
+        if matches[-1] - matches[0] + 1 == len(matches):
+            subset = self.data.iloc[matches[0]:matches[-1] + 1]
+        else:
+            subset = self.data.take(matches)
+
+        return DataAnalyzer(dataframe=subset)
+
+    def __str__(self):
+        """
+        String representation to show per URL stats and overall stats from results data
+        (both come from the statistics cache, so printing is cheap after the first time)
+        """
+        stats = self.per_url_statistics()
+        overall = self.overall_statistics()
+        text = f"Data from {self.csv_file_path}\n\nOverall Stats:\n{overall.to_string()}\n\nPer-URL Stats:\n{stats.to_string(line_width=200)}"
+        return text
\ No newline at end of file
@@ -0,0 +1,267 @@
+"""
+File: partitions.py
+Description: Partitioned results (one file per prober host and day),
+    Each probe host appends to its own partition instead of one shared
+    results.csv, so nobody has to concatenate the history by hand:
+        results/partitions/host=<prober>/date=YYYY-MM-DD/results.csv
+    Next to every partition a small results.csv.meta.json keeps its row
+    count and first / last run_started_at.
+    PartitionSet finds partitions with a glob, skips the ones outside the
+    requested time range from the metadata alone (or the date= folder when
+    there's no metadata file), and aggregates the rest in parallel in a
+    process pool. Each worker returns one LatencyAggregate per URL and the
+    partials merge exactly (sums, counts, min/max, Chan's variance), so
+    DataAnalyzer(partitions=...) gets the same per-URL statistics as a
+    single file holding every row.
+Author: Johnathan Vu
+Email: jvu2@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import glob
+import json
+import os
+import socket
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from latency_utils.io_utils import ResultsBackend, _file_lock, append_session_rows, concat_results, read_header, read_latency_csv, write_atomic
+from .aggregates import aggregate_frame, merge_aggregates
+
+partition_file = "results.csv"
+meta_suffix = ".meta.json"
+default_pattern = os.path.join("**", "*.csv")  # under a partitions folder
+
+
+def partition_path(root, date, host=None):
+    """
+    root/host=<host>/date=YYYY-MM-DD/results.csv (no host folder if host is None).
+    """
+    folders = [root]
+    if host is not None:
+        folders.append(f"host={host}")
+    folders.append(f"date={pd.Timestamp(date):%Y-%m-%d}")
+    return os.path.join(*folders, partition_file)
+
+
+def append_partitioned_rows(rows, root, host=None):
+    """
+    append_session_rows into the partition of each row's run_started_at day.
+    host: prober host name, default this machine's (False = no host folder).
+    Keeps every partition's metadata file up to date. Returns rows written.
+    """
+    if host is None:
+        host = socket.gethostname()
+
+    by_path = {}
+    for row in rows:
+        day = pd.Timestamp(row["run_started_at"])
+        by_path.setdefault(partition_path(root, day, host or None), []).append(row)
+
+    written = 0
+    for path, batch in by_path.items():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        added = append_session_rows(batch, path)
+        if added:
+            times = [pd.Timestamp(row["run_started_at"]) for row in batch if row.get("successes", 0) != 0]
+            _update_meta(path, added, min(times), max(times))
+        written += added
+    return written
+
+
+def _update_meta(path, rows, first, last):
+    # read -> widen -> replace under the partition's lock, two writers can't lose an update
+    with _file_lock(path):  # the results.csv.lock appends use, no extra lock file
+        meta = read_meta(path)
+        if meta is not None:
+            rows += meta["rows"]
+            first = min(first, meta["start"])
+            last = max(last, meta["end"])
+        text = json.dumps({"rows": rows, "start": str(first), "end": str(last)}) + "\n"
+        with write_atomic(path + meta_suffix) as f:
+            f.write(text)
+
+
+def read_meta(path):
+    """
+    A partition's metadata ({"rows", "start", "end"} with Timestamps), None if it has none.
+    """
+    try:
+        with open(path + meta_suffix) as f:
+            meta = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    return {"rows": meta["rows"], "start": pd.Timestamp(meta["start"]), "end": pd.Timestamp(meta["end"])}
+
+
+class Partition:
+    """
+    One results file of a partitioned layout.
+        keys: the key=value folders in its path, e.g. {"host": "probe-1", "date": "2026-10-18"}
+        start / end: first and last run_started_at it can hold (None = unknown),
+            from the metadata file, else the whole date= day
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.keys = {}
+        for part in os.path.normpath(path).split(os.sep)[:-1]:
+            key, sep, value = part.partition("=")
+            if sep:
+                self.keys[key] = value
+
+        self.rows = None
+        self.start = self.end = None
+        meta = read_meta(path)
+        if meta is not None:
+            self.rows, self.start, self.end = meta["rows"], meta["start"], meta["end"]
+        elif "date" in self.keys:
+            try:
+                day = pd.Timestamp(self.keys["date"])
+            except ValueError:
+                return  # not a date after all, has to be opened
+            self.start = day
+            self.end = day + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+
+    @property
+    def host(self):
+        return self.keys.get("host")
+
+    def overlaps(self, start=None, end=None):
+        """
+        Whether it can hold rows with run_started_at in [start, end].
+        A partition with unknown bounds always might.
+        """
+        if start is not None and self.end is not None and self.end < pd.Timestamp(start):
+            return False
+        if end is not None and self.start is not None and self.start > pd.Timestamp(end):
+            return False
+        return True
+
+    def __repr__(self):
+        return f"Partition({self.path!r})"
+
+
+def discover_partitions(pattern):
+    """
+    Every results file matching a glob (** matches any number of folders),
+    or every csv file under a folder. Sorted by path.
+    """
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, default_pattern)
+    paths = sorted(glob.glob(pattern, recursive=True))
+    return [Partition(path) for path in paths if path.endswith(".csv") and os.path.isfile(path)]
+
+
+def _aggregate_partition(path, start, end):
+    """
+    One pool task: read a partition, keep [start, end], aggregate it per URL.
+    Returns (column names, url -> LatencyAggregate).
+    """
+    df = read_latency_csv(path)
+    if start is not None or end is not None:
+        df = df[_between(df, start, end)]
+    return list(df.columns), aggregate_frame(df)
+
+
+def _between(df, start, end):
+    return df["run_started_at"].between(
+        pd.Timestamp(start) if start is not None else pd.Timestamp.min,
+        pd.Timestamp(end) if end is not None else pd.Timestamp.max,
+    )
+
+
+def _narrower(a, b, pick):
+    if a is None or b is None:
+        return b if a is None else a
+    return pick(pd.Timestamp(a), pd.Timestamp(b))
+
+
+class PartitionSet(ResultsBackend):
+    """
+    The partitions matching a glob, limited to run_started_at in [start, end],
+    read like one results backend. Partitions the metadata puts outside the
+    range are never opened.
+        workers: processes aggregate() uses (default one per CPU, 1 = no pool)
+    """
+
+    kind = "partitions"
+
+    def __init__(self, pattern, start=None, end=None, workers=None):
+        super().__init__(pattern)
+        self.start = start
+        self.end = end
+        self.workers = workers
+        self.found = discover_partitions(pattern)
+        if not self.found:
+            raise FileNotFoundError(f"No results partitions found: {pattern}")
+        self.partitions = self.prune(start, end)
+        self._columns = None
+
+    def prune(self, start=None, end=None):
+        """
+        The partitions that can hold rows in [start, end].
+        """
+        return [p for p in self.found if p.overlaps(start, end)]
+
+    def aggregate(self):
+        """
+        Aggregate every partition in range, in parallel, and merge the partials.
+        Returns url -> LatencyAggregate.
+        """
+        paths = [p.path for p in self.partitions]
+        workers = min(self.workers or os.cpu_count() or 1, len(paths))
+
+        if workers <= 1:
+            partials = [_aggregate_partition(path, self.start, self.end) for path in paths]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # map keeps the path order, so the merge (and its rounding) is the same every run
+                partials = list(pool.map(
+                    _aggregate_partition, paths, [self.start] * len(paths), [self.end] * len(paths)
+                ))
+
+        aggregates = {}
+        columns = {}
+        for names, partial in partials:
+            columns.update(dict.fromkeys(names))
+            merge_aggregates(aggregates, partial)
+        self._columns = list(columns)
+        return aggregates
+
+    def read_frame(self, url=None, label=None, start=None, end=None, columns=None):
+        start = _narrower(self.start, start, max)
+        end = _narrower(self.end, end, min)
+        frames = []
+        for partition in self.prune(start, end):
+            df = read_latency_csv(partition.path)
+            mask = _between(df, start, end) if start is not None or end is not None else None
+            for column, value in (("url", url), ("label", label)):
+                if value is not None:
+                    matched = df[column] == str(value).strip()
+                    mask = matched if mask is None else mask & matched
+            frames.append(df if mask is None else df[mask])
+
+        if not frames:
+            raise ValueError(f"No results partitions in that time range: {self.path}")
+        df = concat_results(frames)
+        return df if columns is None else df[[c for c in columns if c in df.columns]]
+
+    def columns(self):
+        if self._columns is None:
+            columns = {}
+            for partition in self.partitions:
+                columns.update(dict.fromkeys(read_header(partition.path) or []))
+            self._columns = list(columns)
+        return self._columns
+
+    def fingerprint(self):
+        return None  # many files, nothing cached against them
+
+    def append_rows(self, rows):
+        raise ValueError("Write partitions with append_partitioned_rows")
+
+    def delete(self):
+        raise ValueError("Delete partitions one at a time")
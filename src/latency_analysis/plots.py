@@ -0,0 +1,278 @@
+# Matplotlib helpers here. take in the dataframe from pandas.
+"""
+File: plots.py
+Description: Matplotlib helper for data analysis,
+    Take in pandas dataframe and plot graphs of latency data.
+    Composition Relationship with DataAnalyzer class.
+    Plots has a DataAnalyzer.
+    Big URL sets are drawn as the top/bottom N bars or a binned scatter,
+    and output_dir renders headless (Agg) straight to PNG/SVG files.
+Author: Johnathan Vu
+Email: jvu2@stevens.edu
+Created: 12/01/25
+Last Edited: 10/18/26
+"""
+import os
+import pandas as pd
+from matplotlib.figure import Figure
+from latency_utils.instrumentation import timed
+from .data_analyzer import DataAnalyzer
+
+class Plots:
+    def __init__(self, data_analyzer: DataAnalyzer, max_bars=40, max_points=2000, max_labels=25,
+                 output_dir=None, file_format="png"):
+        """
+        Initializes Plots class with DataAnalyzer instance
+            max_bars: bar charts with more URLs than this show only the lowest
+                and highest max_bars / 2
+            max_points: scatter plots with more URLs than this are binned (hexbin)
+            max_labels: most URL names written on a scatter plot
+            output_dir: save every chart there (headless, no plt.show) instead of showing it
+            file_format: "png" or "svg" for saved charts
+        """
+        if file_format not in ("png", "svg"):
+            raise ValueError("file_format must be 'png' or 'svg'")
+
+        self.data_analyzer = data_analyzer
+        self.max_bars = max_bars
+        self.max_points = max_points
+        self.max_labels = max_labels
+        self.output_dir = output_dir
+        self.file_format = file_format
+        # per_url and overall stats, cached on the analyzer so every Plots
+        # built from the same analyzer shares one computation
+        self.per_url_stats = self.data_analyzer.per_url_statistics()
+        self.overall_stats = self.data_analyzer.overall_statistics()
+
+    def _new_figure(self, figsize):
+        """
+        Figure + axes for one chart. Saved charts use a plain Figure (Agg canvas,
+        never registered with pyplot), so rendering hundreds of them doesn't
+        pile up open windows or block. pyplot (and its GUI backend) is only
+        imported when a chart is actually shown.
+        """
+        if self.output_dir is not None:
+            fig = Figure(figsize=figsize)
+        else:
+            import matplotlib.pyplot as plt
+
+            fig = plt.figure(figsize=figsize)
+        return fig, fig.add_subplot()
+
+    @timed("plots.render")
+    def _finish(self, fig, name):
+        """
+        Show the chart, or save it as output_dir/name.png (or .svg) and return the path.
+        """
+        fig.tight_layout()
+        if self.output_dir is None:
+            import matplotlib.pyplot as plt
+
+            plt.show()
+            return None
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{name}.{self.file_format}")
+        fig.savefig(path)
+        return path
+
+    def bar_frame(self, column: str):
+        """
+        Rows a bar chart of column shows, sorted ascending. Past max_bars URLs
+        only the lowest and highest max_bars / 2 are kept.
+        """
+        df = self.per_url_stats
+
+        # check if column is actually there
+        if column not in df.columns:
+            raise ValueError(f"Column '{column}' not found in per_url_stats")
+
+        df = df.sort_values(column, ascending=True)
+        if len(df) > self.max_bars:
+            half = self.max_bars // 2
+            df = pd.concat([df.head(half), df.tail(self.max_bars - half)])
+        return df
+
+    def plot_stat(self, column: str, ylabel: str, title: str, color: str = None):
+        """
+        Generic bar chart for per-URL statistic.
+            column: The column in per_url_stats to plot.
+            ylabel: Y-axis label.
+            title: Plot title.
+            color: Bar color. If None, Matplotlib chooses.
+        """
+        # sorted by the column, capped at max_bars URLs
+        df = self.bar_frame(column)
+        values = df[column].values
+        urls = df.index.astype(str)
+
+        hidden = len(self.per_url_stats) - len(df)
+        if hidden:
+            title = f"{title} (lowest and highest {len(df)}, {hidden} URLs not shown)"
+
+        # create the bar chart
+        fig, ax = self._new_figure((12, max(4, len(df) * 0.5)))
+        bars = ax.barh(urls, values, color=color)
+        ax.set_xlabel(ylabel)
+        ax.set_title(title)
+
+        # add the numeric value at the end of each bar, one call for every bar
+        ax.bar_label(bars, labels=[f" {v:.2f}" for v in values], fontsize=9)
+
+        ax.grid(axis='x', linestyle='--', alpha=0.5)
+        ax.invert_yaxis()
+        return self._finish(fig, column)
+
+    def plot_performance_vs_latency(self):
+        """
+        Scatter plot comparing performance score to average latency.
+            X-axis: Average Latency (ms)
+            Y-axis: Performance Score
+
+        High-latency, low-score URLs stand out immediately.
+        Helps identify URLs that perform well despite high latency (or the opposite).
+        Past max_points URLs it's a hexbin density plot instead of single points.
+        """
+        df = self.per_url_stats
+
+        fig, ax = self._new_figure((10, 6))
+        if len(df) > self.max_points:
+            hexes = ax.hexbin(df["avg_latency_ms"], df["performance_score"], gridsize=60,
+                              bins="log", mincnt=1, cmap="viridis")
+            fig.colorbar(hexes, ax=ax, label="URLs")
+        else:
+            # create scatter plot, one collection for every point
+            ax.scatter(df["avg_latency_ms"], df["performance_score"])
+
+        ax.set_xlabel("Average Latency (ms)")
+        ax.set_ylabel("Performance Score")
+        ax.set_title("Performance Score vs Average Latency")
+
+        # label points to know which URL is which, only the best and worst if there are many
+        labeled = df
+        if len(df) > self.max_labels:
+            ranked = df.sort_values("performance_score")
+            half = self.max_labels // 2
+            labeled = pd.concat([ranked.head(half), ranked.tail(self.max_labels - half)])
+        for url, x, y in zip(labeled.index, labeled["avg_latency_ms"], labeled["performance_score"]):
+            ax.annotate(url, (x, y), textcoords="offset points", xytext=(5, 3), fontsize=8)
+
+        return self._finish(fig, "performance_vs_latency")
+
+    def plot_domain_vs_others(self, domain: str, metric: str):
+        """
+        Compare one domain's metric to the rest of the dataset.
+            domain: the domain/url string to compare
+            metric: which numeric metric to analyze (e.g., 'cv_latency', 'avg_latency_ms')
+        """
+        df = self.per_url_stats
+
+        # check metric exists
+        if metric not in df.columns:
+            raise ValueError(f"Metric '{metric}' not found in dataset.")
+
+        # Filter for the target domain
+        target = df.loc[[domain]] if domain in df.index else pd.DataFrame()
+        if target.empty:
+            raise ValueError(f"No data found for domain '{domain}'")
+
+        # Compute averages
+        target_avg = target[metric].mean()
+        others_avg = df.loc[df.index != domain, metric].mean()
+
+        # Prepare bar chart data
+        labels = [domain, "All Other Domains"]
+        values = [target_avg, others_avg]
+
+        # Plot
+        fig, ax = self._new_figure((8, 5))
+        bars = ax.bar(labels, values, color=["#2c7bb6", "#d7191c"])
+        ax.set_ylabel(metric.replace("_", " ").title())
+        ax.set_title(f"{metric.replace('_', ' ').title()} Comparison")
+
+        # Add numeric labels on top of bars
+        ax.bar_label(bars, labels=[f"{v:.2f}" for v in values])
+
+        return self._finish(fig, f"{metric}_vs_others")
+
+    @timed("plots.render_all")
+    def render_all(self, output_dir=None, file_format=None):
+        """
+        Render every standard chart in one pass (same cached stats, same figure
+        pipeline). With an output_dir (here or in the constructor) they're saved
+        headless and the list of file paths is returned.
+        """
+        saved = (self.output_dir, self.file_format)
+        if output_dir is not None:
+            self.output_dir = output_dir
+        if file_format is not None:
+            self.file_format = file_format
+
+        try:
+            paths = [
+                self.plot_success_rate(),
+                self.plot_avg_latency(),
+                self.plot_latency_range(),
+                self.plot_cv_latency(),
+                self.plot_performance_score(),
+                self.plot_performance_vs_latency(),
+            ]
+        finally:
+            self.output_dir, self.file_format = saved
+
+        return [path for path in paths if path is not None]
+
+    def plot_success_rate(self):
+        """
+        Bar chart of success rate per URL
+        """
+        return self.plot_stat(
+            column="success_rate",
+            ylabel="Success Rate (%)",
+            title="Success Rate per URL",
+            color="#006400"
+        )
+
+    def plot_avg_latency(self):
+        """
+        Bar chart of average latency per URL
+        """
+        return self.plot_stat(
+            column="avg_latency_ms",
+            ylabel="Average Latency (ms)",
+            title="Average Latency per URL",
+            color="#8B0000"
+        )
+
+    def plot_latency_range(self):
+        """
+        Bar chart of latency range per URL
+        """
+        return self.plot_stat(
+            column="latency_range_ms",
+            ylabel="Latency Range (ms)",
+            title="Latency Range per URL",
+            color="#4B0082"
+        )
+
+    def plot_cv_latency(self):
+        """
+        Bar chart of latency consistency per URL
+        """
+        return self.plot_stat(
+            column="cv_latency",
+            ylabel="Coefficient of Variation (%)",
+            title="Latency Consistency per URL",
+            color="#00008B"
+        )
+
+    def plot_performance_score(self):
+        """
+        Bar chart of performance score per URL
+        """
+        return self.plot_stat(
+            column="performance_score",
+            ylabel="Performance Score",
+            title="Performance Score per URL",
+            color="#FF8C00"
+        )
\ No newline at end of file
@@ -0,0 +1,410 @@
+"""
+File: rollups.py
+Description: Rollup tables for long-horizon history,
+    Keeps per URL / per label aggregates of the results file at 1 minute,
+    1 hour and 1 day resolution, in results/rollups/ next to results.csv.
+    Every bucket stores mergeable numbers (sums, min/max, count/mean/M2 of
+    avg_ms and a merged quantile sketch), so buckets combine exactly into
+    coarser buckets or into per-URL statistics for any time range.
+    Retention drops old fine buckets (and optionally old raw rows) once the
+    coarser tables hold them, which keeps storage bounded over months.
+    DataAnalyzer.range_statistics picks the coarsest table that can answer
+    a time range exactly.
+Author: Johnathan Vu
+Email: jvu2@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from latency.sketch import LatencySketch
+from latency_utils.io_utils import _file_lock, read_appended_rows, results_file, results_lock, trim_rows_before, write_atomic
+from .aggregates import LatencyAggregate
+
+# finest to coarsest, name -> pandas frequency
+resolutions = {"1min": "min", "1h": "h", "1d": "D"}
+
+# how long each table is kept (None = forever), "raw" is the results file itself
+default_retention = {
+    "raw": None,
+    "1min": pd.Timedelta(days=7),
+    "1h": pd.Timedelta(days=90),
+    "1d": None,
+}
+
+key_columns = ["bucket", "url", "label"]
+rollup_columns = key_columns + [
+    "sessions", "attempts", "successes", "failures",
+    "min_ms", "max_ms", "n", "mean", "m2", "sketch",
+]
+
+
+def session_rows_to_rollup(df):
+    """
+    Raw session rows -> rollup shaped rows (one session each, not bucketed yet).
+    """
+    has_avg = df["avg_ms"].notna()
+    return pd.DataFrame(
+        {
+            "bucket": df["run_started_at"],
+            "url": df["url"],
+            "label": df["label"],
+            "sessions": 1,
+            "attempts": df["attempts"],
+            "successes": df["successes"],
+            "failures": df["failures"],
+            "min_ms": df["min_ms"],
+            "max_ms": df["max_ms"],
+            "n": has_avg.astype("int64"),
+            "mean": df["avg_ms"],
+            "m2": 0.0,
+            "sketch": df["sketch"] if "sketch" in df.columns else None,
+        }
+    ).dropna(subset=["bucket"])
+
+
+def combine(rows, keys, freq=None):
+    """
+    Merge rollup rows that share keys, optionally flooring bucket to freq
+    first (e.g. 1 minute rows -> 1 hour rows). Exact: means and M2 combine
+    with the parallel variance formula, sketches merge bucket counts.
+    """
+    if rows.empty:
+        return pd.DataFrame(columns=keys + rollup_columns[3:])
+
+    rows = rows.copy()
+    if freq is not None:
+        rows["bucket"] = rows["bucket"].dt.floor(freq)
+    rows["weighted"] = (rows["n"] * rows["mean"]).fillna(0.0)
+
+    grouped = rows.groupby(keys, observed=True, sort=True)
+    out = grouped.agg(
+        sessions=("sessions", "sum"),
+        attempts=("attempts", "sum"),
+        successes=("successes", "sum"),
+        failures=("failures", "sum"),
+        min_ms=("min_ms", "min"),
+        max_ms=("max_ms", "max"),
+        n=("n", "sum"),
+        weighted=("weighted", "sum"),
+    )
+    out["mean"] = (out["weighted"] / out["n"]).where(out["n"] > 0)
+
+    # M2 of the union = sum of each part's M2 + n_i * (mean_i - mean)^2
+    group_mean = rows.join(out["mean"].rename("group_mean"), on=keys)["group_mean"]
+    spread = rows["n"] * (rows["mean"] - group_mean) ** 2
+    rows["m2_part"] = rows["m2"].fillna(0.0) + spread.fillna(0.0)
+    out["m2"] = rows.groupby(keys, observed=True, sort=True)["m2_part"].sum()
+
+    out["sketch"] = _combine_sketches(rows, keys)
+    return out.drop(columns="weighted").reset_index()
+
+
+def _combine_sketches(rows, keys):
+    sketches = rows[keys + ["sketch"]].dropna(subset=["sketch"])
+    if sketches.empty:
+        return None
+
+    # most fine buckets hold a single session, only parse where there's something to merge
+    repeated = sketches.duplicated(keys, keep=False)
+    single = sketches[~repeated].set_index(keys)["sketch"]
+    merged = sketches[repeated].groupby(keys, observed=True)["sketch"].agg(_merge_sketch_strings)
+    return pd.concat([single, merged])
+
+
+def _merge_sketch_strings(texts):
+    merged = None
+    for text in texts:
+        sketch = LatencySketch.from_string(text)
+        merged = sketch if merged is None else merged.merge(sketch)
+    return merged.to_string()
+
+
+def rollup_aggregates(table, by="url"):
+    """
+    Collapse rollup rows (any resolution) into one LatencyAggregate per
+    value of by, the same thing aggregate_frame builds from raw rows.
+    """
+    aggregates = {}
+    for row in combine(table, [by]).itertuples(index=False):
+        agg = LatencyAggregate()
+        agg.sessions = int(row.sessions)
+        agg.attempts = int(row.attempts)
+        agg.successes = int(row.successes)
+        agg.failures = int(row.failures)
+        agg.min_ms = float(row.min_ms)
+        agg.max_ms = float(row.max_ms)
+        agg.n = int(row.n)
+        if agg.n:
+            agg.mean = float(row.mean)
+            agg.m2 = float(row.m2)
+        if isinstance(row.sketch, str):
+            agg.sketch = LatencySketch.from_string(row.sketch)
+        aggregates[str(getattr(row, by))] = agg
+    return aggregates
+
+
+class RollupStore:
+    """
+    Rollup tables for one results file.
+        csv_file_path: results file (None = default results file)
+        folder: where the tables live (default: a rollups folder next to the results file)
+        retention: dict of "raw"/"1min"/"1h"/"1d" -> pd.Timedelta or None,
+            missing keys use default_retention
+
+    Tables are append-only CSV files between compactions: update() appends
+    partial buckets for the new raw rows, load() merges rows of the same
+    bucket on read, and compact() rewrites each table merged and trimmed.
+    """
+
+    def __init__(self, csv_file_path=None, folder=None, retention=None):
+        self.csv_file_path = csv_file_path or results_file
+        self.folder = folder or os.path.join(os.path.dirname(os.path.abspath(self.csv_file_path)), "rollups")
+        self.retention = dict(default_retention)
+        self.retention.update(retention or {})
+        self.state_path = os.path.join(self.folder, "state.json")
+        os.makedirs(self.folder, exist_ok=True)
+
+    def table_path(self, resolution):
+        return os.path.join(self.folder, f"{resolution}.csv")
+
+    def _load_state(self):
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            # trimmed_before: oldest time each table (and raw) is still complete from
+            # last_row: key of the last row rolled up, to recognize the same rows in a copy
+            # tail: the bytes just before offset, to tell a file from another one on the same inode
+            return {"file_id": None, "offset": 0, "rows": 0, "header": None, "last_row": None, "tail": None,
+                    "trimmed_before": {}}
+
+    def _save_state(self, state):
+        with write_atomic(self.state_path) as f:
+            json.dump(state, f)
+
+    def update(self):
+        """
+        Roll up the rows appended to the results file since the last update.
+        Returns how many raw rows were added.
+        """
+        with _file_lock(self.state_path):  # one updater at a time
+            state = self._load_state()
+            added = self._ingest(state)
+            self._save_state(state)
+        return added
+
+    def _ingest(self, state):
+        if not os.path.exists(self.csv_file_path):
+            return 0
+
+        info = os.stat(self.csv_file_path)
+        file_id = [info.st_dev, info.st_ino]
+        replaced = state["file_id"] is not None and file_id != state["file_id"]
+        # deleted and written again can land on the same inode: the bytes we
+        # stopped at have to still be there too
+        if not replaced and state.get("tail") is not None and info.st_size >= state["offset"]:
+            replaced = _tail(self.csv_file_path, state["offset"]) != state["tail"]
+
+        if replaced or info.st_size < state["offset"]:
+            # widen_header swaps in a copy with the same rows in the same order,
+            # so skip the ones we already have. Anything else (cleared, deleted
+            # and written again, another file moved in) is all new, even if it
+            # has grown past the row count by now.
+            df, state["offset"] = read_appended_rows(self.csv_file_path, 0)
+            if replaced and self._same_rows(state, df):
+                df = df.iloc[state["rows"]:]
+            else:
+                state["rows"] = 0
+            state["header"] = None
+        elif info.st_size == state["offset"]:
+            return 0
+        else:
+            df, state["offset"] = read_appended_rows(self.csv_file_path, state["offset"], state["header"])
+
+        state["file_id"] = file_id
+        state["tail"] = _tail(self.csv_file_path, state["offset"])
+        if state["header"] is None:
+            state["header"] = list(df.columns)
+        if df.empty:
+            return 0
+
+        rows = session_rows_to_rollup(df)
+        for resolution, freq in resolutions.items():
+            path = self.table_path(resolution)
+            table = combine(rows, key_columns, freq)[rollup_columns]
+            table.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+
+        state["rows"] += len(df)
+        state["last_row"] = _row_key(df, len(df) - 1)
+        return len(df)
+
+    @staticmethod
+    def _same_rows(state, df):
+        # a widened copy keeps every old column and the rows we rolled up, in order
+        if state["rows"] == 0:
+            return True
+        if len(df) < state["rows"] or not set(state["header"] or []) <= set(df.columns):
+            return False
+        last_row = state.get("last_row")  # None: state saved before it was kept
+        return last_row is None or last_row == _row_key(df, state["rows"] - 1)
+
+    def load(self, resolution, start=None, end=None):
+        """
+        Rollup table at resolution, one row per (bucket, url, label),
+        with the buckets that overlap [start, end) if given.
+        """
+        if resolution not in resolutions:
+            raise ValueError(f"resolution must be one of {list(resolutions)}")
+
+        path = self.table_path(resolution)
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=rollup_columns)
+
+        table = pd.read_csv(
+            path,
+            dtype={"url": "category", "label": "category", "sketch": "object"},
+            parse_dates=["bucket"],
+        )
+        if start is not None:
+            # a bucket counts if any of it is in the range
+            table = table[table["bucket"] >= pd.Timestamp(start).floor(resolutions[resolution])]
+        if end is not None:
+            table = table[table["bucket"] < pd.Timestamp(end)]
+        return combine(table, key_columns)[rollup_columns]
+
+    def covers(self, resolution, start):
+        """
+        Whether resolution still has every bucket from start on
+        (retention may have dropped older ones). "raw" checks the results file.
+        """
+        trimmed = self._load_state()["trimmed_before"].get(resolution)
+        if trimmed is None:
+            return True
+        return start is not None and pd.Timestamp(start) >= pd.Timestamp(trimmed)
+
+    def pick_resolution(self, start=None, end=None):
+        """
+        Coarsest table that answers [start, end) exactly: both ends fall on
+        its bucket boundaries and none of the range was dropped by retention.
+        Returns "1d", "1h", "1min", or None if only the raw rows can answer it.
+        """
+        for resolution in reversed(list(resolutions)):
+            freq = resolutions[resolution]
+            aligned = all(
+                t is None or pd.Timestamp(t) == pd.Timestamp(t).floor(freq) for t in (start, end)
+            )
+            if aligned and self.covers(resolution, start):
+                return resolution
+        return None
+
+    def finest_covering(self, start=None):
+        """
+        Finest table that still has everything from start on, for ranges that
+        don't line up with any bucket size once the raw rows are gone.
+        """
+        for resolution in resolutions:
+            if self.covers(resolution, start):
+                return resolution
+        return None
+
+    def compact(self, now=None):
+        """
+        Apply the retention policy:
+            - every table is rewritten with one row per bucket
+            - buckets older than the table's retention are dropped
+            - raw rows older than the "raw" retention are dropped from the results
+              file (they're rolled up first, under the writers' lock)
+        Returns dict of table -> rows dropped.
+        """
+        now = pd.Timestamp(now) if now is not None else pd.Timestamp.now()
+        dropped = {}
+
+        with _file_lock(self.state_path):
+            state = self._load_state()
+
+            raw_keep = self.retention.get("raw")
+            if raw_keep is not None and os.path.exists(self.csv_file_path):
+                cutoff = (now - raw_keep).floor("s")
+                with results_lock(self.csv_file_path):
+                    self._ingest(state)  # nothing may be trimmed before it's rolled up
+                    dropped["raw"] = trim_rows_before(self.csv_file_path, cutoff.to_pydatetime())
+                    # everything left was already rolled up
+                    info = os.stat(self.csv_file_path)
+                    state.update(
+                        file_id=[info.st_dev, info.st_ino],
+                        offset=info.st_size,
+                        rows=state["rows"] - dropped["raw"],
+                        tail=_tail(self.csv_file_path, info.st_size),
+                    )
+                if dropped["raw"]:
+                    state["trimmed_before"]["raw"] = str(cutoff)
+            else:
+                self._ingest(state)
+
+            for resolution, freq in resolutions.items():
+                table = self.load(resolution)
+                before = len(table)
+                keep = self.retention.get(resolution)
+                if keep is not None:
+                    cutoff = (now - keep).floor(freq)
+                    table = table[table["bucket"] >= cutoff]
+                    if len(table) < before:
+                        state["trimmed_before"][resolution] = str(cutoff)
+                dropped[resolution] = before - len(table)
+
+                with write_atomic(self.table_path(resolution), newline="") as f:
+                    table.to_csv(f, index=False)
+
+            self._save_state(state)
+
+        return dropped
+
+    def storage_bytes(self):
+        """
+        Bytes used by the rollup tables.
+        """
+        return sum(
+            os.path.getsize(self.table_path(r)) for r in resolutions if os.path.exists(self.table_path(r))
+        )
+
+
+def _tail(path, offset, size=256):
+    # the last bytes read so far, as text so it survives the state json
+    with open(path, "rb") as f:
+        f.seek(max(0, offset - size))
+        return f.read(offset - max(0, offset - size)).decode("latin-1")
+
+
+def _row_key(df, i):
+    # the columns every results row has, as text so it survives the state json
+    return [str(df[col].iloc[i]) for col in ("run_started_at", "url", "label", "attempts", "avg_ms") if col in df.columns]
+
+
+def delete_rollups(csv_file_path=None):
+    """
+    Deletes the rollup tables (and their state) of a results file
+    """
+    store = RollupStore(csv_file_path)
+    for path in [store.table_path(r) for r in resolutions] + [store.state_path]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def raw_rows_between(df, start=None, end=None):
+    """
+    Raw session rows with run_started_at in [start, end).
+    """
+    mask = np.ones(len(df), dtype=bool)
+    if start is not None:
+        mask &= (df["run_started_at"] >= pd.Timestamp(start)).to_numpy()
+    if end is not None:
+        mask &= (df["run_started_at"] < pd.Timestamp(end)).to_numpy()
+    return df[mask]
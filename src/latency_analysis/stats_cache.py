@@ -0,0 +1,116 @@
+"""
+File: stats_cache.py
+Description: Memoized statistics for DataAnalyzer,
+    Derived frames (per-URL stats, overall stats, percentiles) are computed
+    once per version of the data and handed out again on every later call,
+    so Plots, __str__ and the notebook cells stop regrouping the same rows.
+    The version moves on whenever new rows are ingested, which drops
+    everything cached for the old data.
+    Optionally the cache is pickled next to the results file together with
+    a fingerprint of the file, so a fresh kernel can reuse it as long as
+    the file hasn't changed since.
+Author: Johnathan Vu
+Email: jvu2@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import os
+import pandas as pd
+
+from latency_utils.io_utils import write_atomic
+
+cache_format = 1  # bump when the cached frames change shape
+
+
+def cache_path_for(csv_file_path):
+    """
+    results/results.csv -> results/results_stats.pkl
+    """
+    base, _ = os.path.splitext(csv_file_path)
+    return base + "_stats.pkl"
+
+
+class StatsCache:
+    """
+    Memo of derived statistics for one version of the data.
+        path: pickle file to persist to (None = memory only)
+        fingerprint: fingerprint of the file the data came from,
+            a persisted cache is only reused if it matches
+    """
+
+    def __init__(self, path=None, fingerprint=None):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+
+        if self.path is not None and self.fingerprint is not None:
+            self.load()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, compute):
+        """
+        Cached value for key, calling compute() to build it on a miss.
+        Returns a copy, so callers can't modify what's cached.
+        """
+        if key in self._entries:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._entries[key] = compute()
+            self.save()
+        return self._entries[key].copy()
+
+    def invalidate(self, fingerprint=None):
+        """
+        The data changed: forget everything and move to the next version.
+        """
+        self.version += 1
+        self.fingerprint = fingerprint
+        self._entries = {}
+
+    def load(self):
+        """
+        Pick up a persisted cache if it was written for the same file contents.
+        A missing, stale or unreadable cache file is just ignored.
+        """
+        try:
+            saved = pd.read_pickle(self.path)
+        except Exception:
+            return False
+
+        if not isinstance(saved, dict):
+            return False
+        if saved.get("format") != cache_format or saved.get("fingerprint") != self.fingerprint:
+            return False
+
+        self._entries = saved["entries"]
+        return True
+
+    def save(self):
+        if self.path is None or self.fingerprint is None:
+            return
+
+        try:
+            with write_atomic(self.path, "wb") as f:
+                pd.to_pickle(
+                    {"format": cache_format, "fingerprint": self.fingerprint, "entries": self._entries},
+                    f,
+                )
+        except OSError as e:
+            print(f"Could not save statistics cache to {self.path}: {e}")
+
+
+def delete_stats_cache(csv_file_path):
+    """
+    Deletes the persisted statistics cache of a results file, if there is one
+    """
+    try:
+        os.remove(cache_path_for(csv_file_path))
+    except FileNotFoundError:
+        pass
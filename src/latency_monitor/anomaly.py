@@ -0,0 +1,284 @@
+"""
+File: anomaly.py
+Description: Online latency regression / anomaly detection on new session rows,
+    Every URL + label pair keeps a tiny baseline (EWMA of avg_ms with an
+    EWMA of the absolute deviation as a robust spread) and a two sided
+    CUSUM of the standardized (clipped) residuals. Checking a new session is O(1):
+    nothing re-reads the results file or goes through DataAnalyzer.
+    When a CUSUM crosses its threshold an alert (url, label, direction,
+    magnitude, start time) is appended to results/alerts.jsonl, and the
+    baseline moves to the new level so one step change gives one alert.
+    Baselines live in results/anomaly_state.json between runs.
+
+Author: William TenCate
+Email: wtencate@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import json
+import math
+import os
+
+from latency_utils.io_utils import _file_lock, ensure_folder_for, results_folder, side_file_for, write_atomic
+
+state_file = os.path.join(results_folder, "anomaly_state.json")
+alerts_file = os.path.join(results_folder, "alerts.jsonl")
+
+
+def side_paths_for(csv_file_path=None):
+    """
+    (state path, alerts path) next to a results file, so every dataset keeps its
+    own baselines: data/results.csv -> data/anomaly_state.json, data/alerts.jsonl
+    """
+    if csv_file_path is None:
+        return state_file, alerts_file
+    return side_file_for(csv_file_path, "anomaly_state.json"), side_file_for(csv_file_path, "alerts.jsonl")
+
+
+class LatencyBaseline:
+    """
+    Baseline + change detector for one URL / label.
+        alpha: EWMA weight of a new session (0.1 ~ the last 10-20 sessions)
+        k: CUSUM slack in standard deviations (shifts smaller than ~2k are ignored)
+        h: CUSUM threshold in standard deviations
+        clip: most one session can move a CUSUM, in standard deviations
+        warmup: sessions used to learn the baseline before anything can alert
+        min_change: smallest relative change worth an alert (0.1 = 10%),
+            so very steady endpoints don't alert on a 1 ms wobble
+    """
+
+    def __init__(self, alpha=0.1, k=0.5, h=5.0, clip=3.0, warmup=10, min_change=0.1):
+        self.alpha = alpha
+        self.k = k
+        self.h = h
+        self.clip = clip
+        self.warmup = warmup
+        self.min_change = min_change
+
+        self.count = 0
+        self.mean = 0.0
+        self.spread = 0.0  # EWMA of |x - mean|, ~0.8 standard deviations for normal noise
+        self.up = 0.0  # CUSUM of upward shifts
+        self.down = 0.0
+        # sessions since each CUSUM last sat at 0 (where a change started)
+        self.up_run = [0, 0.0, None]  # [count, sum of x, start time]
+        self.down_run = [0, 0.0, None]
+
+    def scale(self):
+        # MAD style spread -> standard deviation, with a floor so a perfectly
+        # flat baseline doesn't turn every tiny change into a huge z
+        return max(self.spread * 1.25, abs(self.mean) * 0.01, 1e-6)
+
+    def observe(self, value, when=None):
+        """
+        Add one session average. Returns an alert dict if this session
+        confirmed a change, else None.
+        """
+        self.count += 1
+
+        if self.count <= self.warmup:
+            # plain running mean / mean absolute deviation while learning
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self.spread += (abs(value - self.mean) - self.spread) / self.count
+            return None
+
+        z = (value - self.mean) / self.scale()
+
+        # clip what one session can add, so a single spike can't cross h
+        # on its own but a real shift still gets there in a few sessions
+        step = max(-self.clip, min(self.clip, z))
+        self.up = max(0.0, self.up + step - self.k)
+        self.down = max(0.0, self.down - step - self.k)
+        _track_run(self.up_run, self.up, value, when)
+        _track_run(self.down_run, self.down, value, when)
+
+        alert = None
+        for direction, cusum, run in (("up", self.up, self.up_run), ("down", self.down, self.down_run)):
+            if cusum <= self.h or alert is not None:
+                continue
+            level = run[1] / run[0]
+            change = level - self.mean
+            if abs(change) < self.min_change * abs(self.mean):
+                continue
+            alert = {
+                "direction": direction,
+                "baseline_ms": round(self.mean, 2),
+                "level_ms": round(level, 2),
+                "magnitude_ms": round(change, 2),
+                "magnitude_pct": round(change / self.mean * 100, 1) if self.mean else None,
+                "start": run[2],
+                "detected": when,
+                "sessions": run[0],
+            }
+
+        if alert is not None:
+            # the new level is the baseline from here on
+            self.mean = alert["level_ms"]
+            self.up = self.down = 0.0
+            self.up_run = [0, 0.0, None]
+            self.down_run = [0, 0.0, None]
+            return alert
+
+        # only learn from sessions that look normal: no spikes, and not while a
+        # change is building up (that would drag the baseline along with it)
+        if abs(z) < 3 and max(self.up, self.down) < self.h / 2:
+            self.mean += self.alpha * (value - self.mean)
+            self.spread += self.alpha * (abs(value - self.mean) - self.spread)
+        return None
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "spread": self.spread,
+            "up": self.up,
+            "down": self.down,
+            "up_run": self.up_run,
+            "down_run": self.down_run,
+        }
+
+    @classmethod
+    def from_dict(cls, state, **settings):
+        baseline = cls(**settings)
+        for name, value in state.items():
+            setattr(baseline, name, value)
+        return baseline
+
+
+def _track_run(run, cusum, value, when):
+    # a CUSUM back at 0 means nothing is building up, start counting again
+    if cusum == 0:
+        run[:] = [0, 0.0, None]
+        return
+    if run[0] == 0:
+        run[2] = when
+    run[0] += 1
+    run[1] += value
+
+
+class AnomalyDetector:
+    """
+    Keeps a LatencyBaseline per URL + label and writes alerts.
+        state_path: JSON file the baselines are kept in between runs
+        alerts_path: JSON lines file every alert is appended to
+        other keyword arguments go to LatencyBaseline (alpha, k, h, clip, warmup, min_change)
+
+    Hook it up to a ResultWriter so it sees every batch that gets written:
+        writer = ResultWriter(listeners=[detector.observe_rows])
+    """
+
+    def __init__(self, state_path=None, alerts_path=None, **settings):
+        self.state_path = state_path or state_file
+        self.alerts_path = alerts_path or alerts_file
+        self.settings = settings
+        self.baselines = {}
+        self._changed = set()  # keys observed since the last save
+        self._load()
+
+    def _load(self):
+        # baselines this detector changed and hasn't saved yet win over the file
+        try:
+            with open(self.state_path) as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return
+        for key, state in saved.items():
+            if key not in self._changed:
+                self.baselines[key] = LatencyBaseline.from_dict(state, **self.settings)
+
+    def _write(self):
+        with write_atomic(self.state_path) as f:
+            json.dump({key: b.to_dict() for key, b in self.baselines.items()}, f)
+        self._changed.clear()
+
+    def save(self):
+        """
+        Write the baselines.
+        Safe with other processes sharing the state file (the daemon and
+        `latency probe --alerts`): under an anomaly_state.json.lock file lock
+        the file is read again and only the baselines this detector changed
+        replace what's there.
+        """
+        with _file_lock(self.state_path):
+            self._load()
+            self._write()
+
+    def observe(self, row):
+        """
+        Check one session row. Returns the alert dict (also with url and label)
+        or None. Rows with no average (nothing succeeded) are skipped.
+        Doesn't save, see observe_rows.
+        """
+        value = row.get("avg_ms")
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return None
+
+        url = row["url"]
+        label = row.get("label", "Default")
+        key = f"{label}|{url}"
+        if key not in self.baselines:
+            self.baselines[key] = LatencyBaseline(**self.settings)
+
+        self._changed.add(key)
+        alert = self.baselines[key].observe(float(value), row.get("run_started_at"))
+        if alert is None:
+            return None
+        return {"url": url, "label": label, **alert}
+
+    def observe_rows(self, rows):
+        """
+        Check a batch of session rows, append any alerts to the alerts file
+        (one write) and save the baselines. Returns the list of alerts.
+        The whole batch runs under the state file lock, starting from the
+        baselines on disk, so another process's sessions aren't lost.
+        """
+        with _file_lock(self.state_path):
+            self._load()
+            alerts = [alert for alert in map(self.observe, rows) if alert is not None]
+
+            if alerts:
+                ensure_folder_for(self.alerts_path)
+                with open(self.alerts_path, "a") as f:
+                    f.write("".join(json.dumps(alert) + "\n" for alert in alerts))
+            self._write()
+
+        return alerts
+
+
+def read_alerts(alerts_path=None):
+    """
+    Every alert written so far, oldest first.
+    """
+    try:
+        with open(alerts_path or alerts_file) as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def check_session_rows(rows, state_path=None, alerts_path=None):
+    """
+    Run rows through the detector with the saved baselines and print any alerts
+    (for the notebook, after append_session_row). Returns the alerts.
+    """
+    alerts = AnomalyDetector(state_path, alerts_path).observe_rows(rows)
+    for alert in alerts:
+        print(
+            f"\nALERT: {alert['url']} ({alert['label']}) latency went {alert['direction']} "
+            f"{alert['baseline_ms']} -> {alert['level_ms']} ms ({alert['magnitude_pct']}%) "
+            f"since {alert['start']}"
+        )
+    return alerts
+
+
+def delete_anomaly_state(state_path=None, alerts_path=None):
+    """
+    Deletes the saved baselines and the alerts file, if they exist
+    """
+    for path in (state_path or state_file, alerts_path or alerts_file):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
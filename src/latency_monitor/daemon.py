@@ -0,0 +1,316 @@
+"""
+File: daemon.py
+Description: Headless monitoring daemon that keeps probing a list of targets,
+    Reads a target list CSV (url, label, interval, attempts, timeout),
+    runs sessions when they come due on the jittered heap scheduler,
+    each on its own so a slow target only delays itself, and hands the
+    session rows to a ResultWriter that flushes them to the results file
+    in batches. SIGTERM / Ctrl+C stops it cleanly
+    after flushing whatever is still buffered.
+
+    Run from the src folder:
+        python -m latency_monitor.daemon targets.csv
+
+Author: William TenCate
+Email: wtencate@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import argparse
+import csv
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from latency.async_tester import AsyncProbeEngine
+from latency.latency_tester import LatencyTester
+from latency_monitor.anomaly import AnomalyDetector, side_paths_for
+from latency_monitor.scheduler import ProbeScheduler, ProbeTarget
+from latency_utils.io_utils import ResultWriter
+
+max_sleep = 1.0  # longest single sleep, so a stop request is noticed quickly
+
+
+def load_targets(path):
+    """
+    Read the target list CSV. Only url is required, e.g.
+        url,label,interval,attempts,timeout,target_error
+        https://google.com,WIFI,60,5,5,
+        https://example.com,WIFI,60,50,5,0.05
+    A target_error makes that target's sessions adaptive, with attempts as the budget.
+    Returns a list of ProbeTarget.
+    """
+    targets = []
+
+    with open(path, newline="") as f:
+        # line 1 is the header, so data starts on line 2
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            try:
+                url = (row.get("url") or "").strip()
+                if not url:
+                    raise ValueError("url is missing")
+                targets.append(
+                    ProbeTarget(
+                        url,
+                        label=(row.get("label") or "").strip() or "Default",
+                        interval=float(row.get("interval") or 60),
+                        attempts=int(row.get("attempts") or 5),
+                        timeout=float(row.get("timeout") or 5),
+                        target_error=float(row["target_error"]) if row.get("target_error") else None,
+                    )
+                )
+            except ValueError as e:
+                raise ValueError(f"Bad target on line {line} of {path}: {e}")
+
+    if not targets:
+        raise ValueError(f"No targets found in {path}")
+
+    return targets
+
+
+class MonitorDaemon:
+    """
+    Long running probe loop.
+        targets: list of ProbeTarget
+        csv_file_path: results file (None = default results file)
+        samples_path: also keep raw samples in this sample store (None = off)
+        batch_size: flush once this many session rows are buffered
+        flush_interval: flush at least this often (seconds)
+        max_sessions: most sessions running at once, each target's session runs
+            on its own and the target is rescheduled when it finishes
+        max_in_flight / per_host: limits of the async engine within one session
+            (like the farm's per worker limits)
+        clock / sleep: time source, swap in a fake one for tests
+        probe: function(list of LatencyTester) that runs them, called with one
+            tester per session from a worker thread, defaults to the asyncio engine
+        rollups: RollupStore to keep up to date (None = off), it's compacted
+            (rolled up + retention applied) every rollup_interval seconds
+        detector: AnomalyDetector that checks every written row (None = off)
+    """
+
+    def __init__(
+        self,
+        targets,
+        csv_file_path=None,
+        samples_path=None,
+        batch_size=50,
+        flush_interval=30.0,
+        jitter=0.1,
+        max_sessions=16,
+        max_in_flight=50,
+        per_host=6,
+        clock=time.monotonic,
+        sleep=time.sleep,
+        probe=None,
+        rng=None,
+        rollups=None,
+        rollup_interval=3600.0,
+        detector=None,
+    ):
+        self.detector = detector
+        self.writer = ResultWriter(
+            csv_file_path,
+            max_rows=batch_size,
+            max_age=flush_interval,
+            clock=clock,
+            listeners=[detector.observe_rows] if detector is not None else None,
+        )
+        self.sample_store = None
+        if samples_path:
+            from latency_utils.sample_store import SampleStore  # numpy, only when samples are kept
+
+            self.sample_store = SampleStore(samples_path)
+        self.clock = clock
+        self.sleep = sleep
+
+        if probe is None:
+            engine = AsyncProbeEngine(max_in_flight=max_in_flight, per_host=per_host)
+            probe = engine.run
+        self.probe = probe
+
+        self.scheduler = ProbeScheduler(jitter=jitter, rng=rng)
+        now = self.clock()
+        for target in targets:
+            self.scheduler.add(target, now)
+
+        self.rollups = rollups
+        self.rollup_interval = rollup_interval
+        self._next_rollup = now + rollup_interval
+
+        if max_sessions <= 0:
+            raise ValueError("max_sessions must be > 0.")
+        self._pool = ThreadPoolExecutor(max_workers=max_sessions, thread_name_prefix="probe")
+        self._running = {}  # future -> target, sessions still in flight
+
+        self.samples = []  # (results, label) waiting to be flushed
+        self.stopping = False
+        self.sessions_run = 0
+
+    @property
+    def rows_written(self):
+        return self.writer.rows_written
+
+    def stop(self, *_):
+        """
+        Ask the loop to finish (also the SIGTERM / SIGINT handler).
+        """
+        self.stopping = True
+
+    def install_signal_handlers(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+    def run_due(self):
+        """
+        Start every session that is due right now, each in its own task.
+        A target isn't rescheduled until its own session finishes (see collect),
+        so a slow one never holds up the others.
+        Returns how many sessions were started.
+        """
+        due = self.scheduler.pop_due(self.clock())
+        for target in due:
+            self._running[self._pool.submit(self._session, target)] = target
+        return len(due)
+
+    def _session(self, target):
+        # runs on a worker thread: probe only, rows are written by the loop
+        tester = LatencyTester(
+            target.url,
+            attempts=target.attempts,
+            timeout=target.timeout,
+            label=target.label,
+            target_error=target.target_error,
+            keep_results=self.sample_store is not None,
+        )
+        self.probe([tester])
+        return tester, self.clock()
+
+    def collect(self, timeout=0):
+        """
+        Buffer the rows of every finished session and reschedule their targets,
+        waiting up to timeout seconds for one to finish (None = until one does).
+        Returns how many sessions were collected.
+        """
+        if not self._running:
+            return 0
+        done, _ = wait(list(self._running), timeout=timeout, return_when=FIRST_COMPLETED)
+
+        for future in done:
+            target = self._running.pop(future)
+            # a probe that blew up is a bug, not a failed attempt: let it out
+            tester, finished = future.result()
+            self.writer.write(tester.create_session_row())
+            if self.sample_store is not None:
+                self.samples.append((tester.results, tester.label))
+            # schedule the next run from when this one finished
+            self.scheduler.reschedule(target, finished)
+
+        self.sessions_run += len(done)
+        return len(done)
+
+    def flush(self):
+        """
+        Write everything buffered in one batch.
+        """
+        self.writer.flush()
+        self._flush_samples()
+
+    def _flush_samples(self):
+        for results, label in self.samples:
+            self.sample_store.append(results, label)
+        self.samples = []
+
+    def _flush_if_needed(self):
+        # the writer flushes itself once batch_size rows are waiting
+        self.writer.flush_if_due()
+        if len(self.writer) == 0:
+            self._flush_samples()  # raw samples go out with their rows
+
+    def _rollup_if_due(self):
+        if self.rollups is None or self.clock() < self._next_rollup:
+            return
+        self.rollups.compact()
+        self._next_rollup = self.clock() + self.rollup_interval
+
+    def run(self, until=None):
+        """
+        Probe until stop() is called (or the clock passes until, if given).
+        Always flushes before returning.
+        """
+        try:
+            while not self.stopping:
+                if until is not None and self.clock() >= until:
+                    break
+
+                self.run_due()
+                self.collect()
+                self._flush_if_needed()
+                self._rollup_if_due()
+
+                # sleep until the next target or flush is due,
+                # a session that finishes first wakes the loop up early
+                now = self.clock()
+                wake = now + max_sleep
+                for when in (self.scheduler.next_due(), self.writer.flush_due_at(), until):
+                    if when is not None:
+                        wake = min(wake, when)
+                if self._running:
+                    if self.collect(timeout=max(0.0, wake - now)):
+                        continue
+                    now = self.clock()
+                if wake > now:
+                    self.sleep(wake - now)
+        finally:
+            # sessions already started still get their rows written
+            while self._running:
+                self.collect(timeout=None)
+            self._pool.shutdown()
+            self.flush()
+            if self.rollups is not None:
+                self.rollups.update()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Continuously probe a list of URLs.")
+    parser.add_argument("targets", help="target list CSV (url,label,interval,attempts,timeout)")
+    parser.add_argument("--results", default=None, help="results CSV (default results/results.csv, or $LATENCY_RESULTS_DIR/results.csv)")
+    parser.add_argument("--samples", default=None, help="also store raw samples in this .bin file")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--flush-interval", type=float, default=30.0)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--max-sessions", type=int, default=16, help="sessions running at once")
+    parser.add_argument("--max-in-flight", type=int, default=50)
+    parser.add_argument("--per-host", type=int, default=6)
+    parser.add_argument("--rollups", action="store_true", help="keep the 1 min / 1 h / 1 day rollup tables up to date")
+    parser.add_argument("--alerts", action="store_true", help="detect latency changes, alerts go to alerts.jsonl next to the results file")
+    args = parser.parse_args(argv)
+
+    rollups = None
+    if args.rollups:
+        from latency_analysis.rollups import RollupStore  # pulls in pandas, only when asked for
+
+        rollups = RollupStore(args.results)
+
+    daemon = MonitorDaemon(
+        load_targets(args.targets),
+        csv_file_path=args.results,
+        samples_path=args.samples,
+        batch_size=args.batch_size,
+        flush_interval=args.flush_interval,
+        jitter=args.jitter,
+        max_in_flight=args.max_in_flight,
+        per_host=args.per_host,
+        max_sessions=args.max_sessions,
+        rollups=rollups,
+        detector=AnomalyDetector(*side_paths_for(args.results)) if args.alerts else None,
+    )
+    daemon.install_signal_handlers()
+
+    print(f"Monitoring {len(daemon.scheduler)} targets, stop with Ctrl+C or SIGTERM.")
+    daemon.run()
+    print(f"Stopped after {daemon.sessions_run} sessions ({daemon.rows_written} rows written).")
+
+
+if __name__ == "__main__":
+    main()
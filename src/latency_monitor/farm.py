@@ -0,0 +1,246 @@
+"""
+File: farm.py
+Description: Multi-process probe farm for running many sessions across cores,
+    One interpreter tops out at one core (TLS handshakes, parsing and
+    Result objects all hold the GIL), so the farm shards the target list
+    across worker processes. Each worker runs its share on its own asyncio
+    probe engine and streams compact batches of session rows back over a
+    pipe. The parent is the only writer: it checks every batch against a
+    per-worker sequence number and the worker's final row count, and hands
+    the rows to one ResultWriter, so no row is written twice or lost
+    without an error.
+
+    Run from the src folder (every target gets one session):
+        python -m latency_monitor.farm targets.csv --workers 4
+
+Author: William TenCate
+Email: wtencate@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import argparse
+import multiprocessing
+import traceback
+from multiprocessing.connection import wait
+
+from latency.async_tester import AsyncProbeEngine
+from latency.latency_tester import LatencyTester
+from latency_monitor.daemon import load_targets
+from latency_utils.io_utils import ResultWriter
+
+
+def shard_targets(targets, workers):
+    """
+    Split targets into workers lists, round robin so every worker gets
+    about the same number of sessions. Empty shards are dropped.
+    """
+    shards = [targets[i::workers] for i in range(workers)]
+    return [shard for shard in shards if shard]
+
+
+def pack_rows(rows):
+    """
+    Session row dicts -> (columns, list of value tuples).
+    Column names go over the pipe once per batch instead of once per row.
+    """
+    columns = []
+    for row in rows:
+        for col in row:
+            if col not in columns:
+                columns.append(col)
+    return columns, [tuple(row.get(col) for col in columns) for row in rows]
+
+
+def unpack_rows(columns, values):
+    return [dict(zip(columns, row)) for row in values]
+
+
+def _farm_worker(worker_id, targets, conn, batch_size, max_in_flight, per_host):
+    """
+    Worker process: run the sessions for one shard, batch_size at a time,
+    and send each batch of rows up the pipe as
+        ("rows", worker_id, sequence number, columns, values)
+    followed by ("done", worker_id, batches sent, rows sent),
+    or ("error", worker_id, traceback text) if something blew up.
+    """
+    sent_batches = 0
+    sent_rows = 0
+
+    try:
+        engine = AsyncProbeEngine(max_in_flight=max_in_flight, per_host=per_host)
+
+        for start in range(0, len(targets), batch_size):
+            testers = [
+                LatencyTester(
+                    t.url,
+                    attempts=t.attempts,
+                    timeout=t.timeout,
+                    label=t.label,
+                    target_error=t.target_error,
+                    keep_results=False,  # only the row goes back, skip the Result list
+                )
+                for t in targets[start:start + batch_size]
+            ]
+            engine.run(testers)
+
+            columns, values = pack_rows([t.create_session_row() for t in testers])
+            conn.send(("rows", worker_id, sent_batches, columns, values))
+            sent_batches += 1
+            sent_rows += len(values)
+
+        conn.send(("done", worker_id, sent_batches, sent_rows))
+
+    except Exception:
+        conn.send(("error", worker_id, traceback.format_exc()))
+
+    finally:
+        conn.close()
+
+
+class ProbeFarm:
+    """
+    Runs one session per target, spread over worker processes.
+        workers: number of worker processes
+        csv_file_path: results file (None = default results file)
+        batch_size: sessions a worker runs before sending its rows back
+        max_in_flight / per_host: limits of each worker's async engine
+            (so per_host is per worker, the whole farm can have workers x per_host)
+        flush_rows: the writer flushes once this many rows are waiting
+        mp_context: multiprocessing context (None = the platform default)
+    """
+
+    def __init__(
+        self,
+        workers=None,
+        csv_file_path=None,
+        batch_size=25,
+        max_in_flight=50,
+        per_host=6,
+        flush_rows=500,
+        mp_context=None,
+    ):
+        self.workers = workers or multiprocessing.cpu_count()
+        if self.workers <= 0 or batch_size <= 0:
+            raise ValueError("workers and batch_size must be > 0.")
+
+        self.csv_file_path = csv_file_path
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self.per_host = per_host
+        self.flush_rows = flush_rows
+        self.context = mp_context or multiprocessing.get_context()
+
+        self.rows_received = 0
+        self.rows_written = 0
+
+    def run(self, targets):
+        """
+        Probe every target once and write the rows.
+        Returns how many rows came back from the workers.
+        Raises RuntimeError if a worker failed or its rows don't add up
+        (everything that did arrive is still written first).
+        """
+        processes = {}
+        readers = {}
+        for worker_id, shard in enumerate(shard_targets(list(targets), self.workers)):
+            reader, writer_end = self.context.Pipe(duplex=False)
+            process = self.context.Process(
+                target=_farm_worker,
+                args=(
+                    worker_id,
+                    shard,
+                    writer_end,
+                    self.batch_size,
+                    self.max_in_flight,
+                    self.per_host,
+                ),
+                daemon=True,
+            )
+            process.start()
+            writer_end.close()  # parent only reads, so EOF shows up if the worker dies
+            processes[worker_id] = process
+            readers[reader] = worker_id
+
+        expected_batch = dict.fromkeys(processes, 0)
+        received = dict.fromkeys(processes, 0)
+        problems = []
+
+        with ResultWriter(self.csv_file_path, max_rows=self.flush_rows, max_age=float("inf")) as writer:
+            while readers:
+                for reader in wait(list(readers)):
+                    worker_id = readers[reader]
+                    try:
+                        message = reader.recv()
+                    except EOFError:
+                        problems.append(f"worker {worker_id} exited without finishing")
+                        del readers[reader]
+                        reader.close()
+                        continue
+
+                    kind = message[0]
+                    if kind == "rows":
+                        _, _, sequence, columns, values = message
+                        if sequence != expected_batch[worker_id]:
+                            problems.append(
+                                f"worker {worker_id} sent batch {sequence}, "
+                                f"expected {expected_batch[worker_id]}"
+                            )
+                            continue  # never write a batch twice
+                        expected_batch[worker_id] += 1
+                        received[worker_id] += len(values)
+                        writer.write_many(unpack_rows(columns, values))
+
+                    elif kind == "done":
+                        _, _, batches, rows = message
+                        if batches != expected_batch[worker_id] or rows != received[worker_id]:
+                            problems.append(
+                                f"worker {worker_id} sent {rows} rows in {batches} batches, "
+                                f"got {received[worker_id]} in {expected_batch[worker_id]}"
+                            )
+                        del readers[reader]
+                        reader.close()
+
+                    else:
+                        problems.append(f"worker {worker_id} failed:\n{message[2]}")
+                        del readers[reader]
+                        reader.close()
+
+        for process in processes.values():
+            process.join()
+
+        self.rows_received = sum(received.values())
+        self.rows_written = writer.rows_written
+
+        if problems:
+            raise RuntimeError("Probe farm problems:\n" + "\n".join(problems))
+
+        return self.rows_received
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run one session per target across worker processes.")
+    parser.add_argument("targets", help="target list CSV (url,label,interval,attempts,timeout)")
+    parser.add_argument("--results", default=None, help="results CSV (default results/results.csv, or $LATENCY_RESULTS_DIR/results.csv)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--batch-size", type=int, default=25)
+    parser.add_argument("--max-in-flight", type=int, default=50)
+    parser.add_argument("--per-host", type=int, default=6)
+    args = parser.parse_args(argv)
+
+    farm = ProbeFarm(
+        workers=args.workers,
+        csv_file_path=args.results,
+        batch_size=args.batch_size,
+        max_in_flight=args.max_in_flight,
+        per_host=args.per_host,
+    )
+    targets = load_targets(args.targets)
+
+    print(f"Probing {len(targets)} targets on {farm.workers} workers...")
+    farm.run(targets)
+    print(f"Done, {farm.rows_received} sessions ({farm.rows_written} rows written).")
+
+
+if __name__ == "__main__":
+    main()
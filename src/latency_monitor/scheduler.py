@@ -0,0 +1,100 @@
+"""
+File: scheduler.py
+Description: Heap based probe scheduler with jitter for the monitoring daemon,
+    Holds every probe target in a min-heap keyed by when it's next due,
+    so finding what to run is O(log n) no matter how many targets there are.
+    Start times are spread over each target's interval and every
+    reschedule gets random jitter, so thousands of targets with the same
+    interval don't all fire in lockstep.
+
+Author: William TenCate
+Email: wtencate@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import heapq
+import itertools
+import random
+
+
+class ProbeTarget:
+    """
+    One URL to keep probing.
+        url: URL to test
+        label: label written with every session (e.g. WIFI, Wired)
+        interval: seconds between sessions
+        attempts: attempts per session
+        timeout: request timeout in seconds
+        target_error: run adaptive sessions that stop once the mean is within
+            this fraction (None = always run every attempt)
+    """
+
+    def __init__(self, url, label="Default", interval=60, attempts=5, timeout=5, target_error=None):
+        if not str(url).startswith(("http://", "https://")):
+            raise ValueError(f"URL must start with http:// or https://: {url}")
+        if interval <= 0 or attempts <= 0 or timeout <= 0:
+            raise ValueError(f"interval, attempts and timeout must be > 0 for {url}")
+        if target_error is not None and (target_error <= 0 or attempts < 2):
+            raise ValueError(f"target_error must be > 0, with at least 2 attempts, for {url}")
+
+        self.url = url
+        self.label = label
+        self.interval = interval
+        self.attempts = attempts
+        self.timeout = timeout
+        self.target_error = target_error
+
+    def __repr__(self):
+        return f"ProbeTarget({self.url!r}, label={self.label!r}, interval={self.interval})"
+
+
+class ProbeScheduler:
+    """
+    Min-heap of (due time, sequence, target).
+        jitter: fraction of the interval to randomly add or take off each time
+            (0.1 -> a 60s target runs every 54-66s)
+        rng: random.Random to use, pass a seeded one for repeatable tests
+    """
+
+    def __init__(self, jitter=0.1, rng=None):
+        if not 0 <= jitter < 1:
+            raise ValueError("jitter must be between 0 and 1.")
+
+        self.jitter = jitter
+        self.rng = rng or random.Random()
+        self._heap = []
+        self._sequence = itertools.count()  # tie breaker, targets aren't comparable
+
+    def __len__(self):
+        return len(self._heap)
+
+    def add(self, target, now):
+        """
+        Add a new target, first run at a random point inside its first interval.
+        """
+        due = now + self.rng.uniform(0, target.interval)
+        heapq.heappush(self._heap, (due, next(self._sequence), target))
+
+    def reschedule(self, target, now):
+        """
+        Put a target back after it ran, one jittered interval from now.
+        """
+        spread = self.rng.uniform(-self.jitter, self.jitter)
+        due = now + target.interval * (1 + spread)
+        heapq.heappush(self._heap, (due, next(self._sequence), target))
+
+    def next_due(self):
+        """
+        When the next target is due, or None if there are no targets.
+        """
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now):
+        """
+        Remove and return every target due at or before now.
+        """
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[2])
+        return due
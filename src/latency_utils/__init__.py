@@ -0,0 +1 @@
+# Without this file, Python won't recognize this directory as a package.
@@ -0,0 +1,286 @@
+"""
+File: instrumentation.py
+Description: Timers, counters and profiling hooks for the tool's own hot paths,
+    so the time spent inside the tool (probe loop bookkeeping, csv writes
+    and parsing, aggregation, chart rendering) can be told apart from the
+    network latency it measures, and slowdowns in the tool get noticed.
+        - timed(name) decorates a function, timer(name) wraps a block,
+          count(name) bumps a counter
+        - off by default: a disabled timer is one global check (~0.1 us),
+          nothing is recorded and no clock is read
+        - enable(profile=[...]) also runs those stages under cProfile
+          (or any profiler with enable() / disable())
+        - snapshot() / write_json() / write_prometheus() export the metrics,
+          the .prom file is in the text format node_exporter's textfile
+          collector reads
+    Stage names used across the tool:
+        tester.request / tester.record   one probe attempt: the request, our bookkeeping
+        engine.request                   one async engine attempt
+        io.append_session_rows / io.read_latency_csv
+        analysis.per_url_statistics / analysis.overall_statistics
+        plots.render / plots.render_all
+
+Author: William TenCate
+Email: wtencate@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+
+_enabled = False
+_lock = threading.Lock()
+_timers = {}  # name -> [count, total seconds, min, max]
+_counters = {}  # name -> total
+
+_profile_stages = set()
+_profiler_factory = None
+_profilers = {}  # stage -> profiler, kept across calls so a stage's runs add up
+_profiling = threading.local()  # only one profiler can be active per thread
+
+
+def enable(profile=None, profiler=None):
+    """
+    Start recording timers and counters.
+        profile: stage names to also run under a profiler
+        profiler: factory for the profiler (default cProfile.Profile); a
+            sampling profiler works too if it has enable() / disable()
+    """
+    global _enabled, _profile_stages, _profiler_factory
+
+    if profile:
+        if profiler is None:
+            import cProfile
+
+            profiler = cProfile.Profile
+        _profiler_factory = profiler
+    _profile_stages = set(profile or ())
+    _enabled = True
+
+
+def disable():
+    """
+    Stop recording (what was recorded so far is kept until reset()).
+    """
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """
+    Forget every timer, counter and profile.
+    """
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+        _profilers.clear()
+
+
+def _record(name, seconds):
+    with _lock:
+        stats = _timers.get(name)
+        if stats is None:
+            _timers[name] = [1, seconds, seconds, seconds]
+            return
+        stats[0] += 1
+        stats[1] += seconds
+        if seconds < stats[2]:
+            stats[2] = seconds
+        if seconds > stats[3]:
+            stats[3] = seconds
+
+
+def count(name, amount=1):
+    """
+    Add amount to counter name (only while enabled).
+    """
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+class _Timer:
+    __slots__ = ("name", "start", "profiler")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.profiler = None
+        if self.name in _profile_stages and not getattr(_profiling, "active", False):
+            with _lock:
+                if self.name not in _profilers:
+                    _profilers[self.name] = _profiler_factory()
+                self.profiler = _profilers[self.name]
+            _profiling.active = True
+            self.profiler.enable()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        if self.profiler is not None:
+            self.profiler.disable()
+            _profiling.active = False
+        _record(self.name, elapsed)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_null_timer = _NullTimer()
+
+
+def timer(name):
+    """
+    Time a block: with timer("tester.request"): ...
+    Does nothing while disabled.
+    """
+    if not _enabled:
+        return _null_timer
+    return _Timer(name)
+
+
+def timed(name):
+    """
+    Decorator, times every call of the function under name.
+    """
+
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with _Timer(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def snapshot():
+    """
+    Every timer (count, total_s, mean_ms, min_ms, max_ms) and counter so far.
+    """
+    with _lock:
+        timers = {name: list(stats) for name, stats in _timers.items()}
+        counters = dict(_counters)
+
+    return {
+        "timers": {
+            name: {
+                "count": n,
+                "total_s": total,
+                "mean_ms": total / n * 1000,
+                "min_ms": low * 1000,
+                "max_ms": high * 1000,
+            }
+            for name, (n, total, low, high) in sorted(timers.items())
+        },
+        "counters": dict(sorted(counters.items())),
+    }
+
+
+def _write_atomic(path, text):
+    # a collector never reads half a file
+    from latency_utils.io_utils import write_atomic  # io_utils imports this module
+
+    with write_atomic(path) as f:
+        f.write(text)
+
+
+def write_json(path):
+    """
+    Save snapshot() as JSON, with the unix time it was taken.
+    """
+    data = {"time": time.time(), **snapshot()}
+    _write_atomic(path, json.dumps(data, indent=2) + "\n")
+    return path
+
+
+def prometheus_text(prefix="latency_tool"):
+    """
+    snapshot() in the Prometheus text exposition format.
+    """
+    data = snapshot()
+    lines = [
+        f"# HELP {prefix}_stage_seconds Time spent in each instrumented stage of the tool.",
+        f"# TYPE {prefix}_stage_seconds summary",
+    ]
+    for name, stats in data["timers"].items():
+        lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {stats["total_s"]:.9f}')
+        lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {stats["count"]}')
+
+    lines.append(f"# HELP {prefix}_stage_max_seconds Slowest single run of each stage.")
+    lines.append(f"# TYPE {prefix}_stage_max_seconds gauge")
+    for name, stats in data["timers"].items():
+        lines.append(f'{prefix}_stage_max_seconds{{stage="{name}"}} {stats["max_ms"] / 1000:.9f}')
+
+    lines.append(f"# HELP {prefix}_events_total Counters of the tool.")
+    lines.append(f"# TYPE {prefix}_events_total counter")
+    for name, total in data["counters"].items():
+        lines.append(f'{prefix}_events_total{{name="{name}"}} {total}')
+
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path, prefix="latency_tool"):
+    """
+    Save the metrics as a .prom file (e.g. into node_exporter's textfile directory).
+    """
+    _write_atomic(path, prometheus_text(prefix))
+    return path
+
+
+def write_metrics(path):
+    """
+    write_prometheus for .prom paths, write_json for anything else.
+    """
+    if path.endswith(".prom"):
+        return write_prometheus(path)
+    return write_json(path)
+
+
+def profile_stats(stage):
+    """
+    pstats.Stats of everything profiled under stage, or None.
+    """
+    profiler = _profilers.get(stage)
+    if profiler is None:
+        return None
+
+    import pstats
+
+    return pstats.Stats(profiler)
+
+
+def dump_profiles(folder):
+    """
+    Write each profiled stage to folder/<stage>.prof (open with pstats or
+    snakeviz). Returns the paths.
+    """
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    for stage, profiler in list(_profilers.items()):
+        path = os.path.join(folder, f"{stage}.prof")
+        profiler.dump_stats(path)
+        paths.append(path)
+    return paths
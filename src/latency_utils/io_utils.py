@@ -0,0 +1,879 @@
+"""
+File: io_utils.py
+Description: Handle appending and creating the results data file.
+    Writes are serialized with a lock (threads) and a lock file (processes),
+    and each batch goes out as one write, so concurrent probers can't
+    interleave partial lines or both write a header.
+Author: William TenCate
+Email: wtencate@stevens.edu
+Created: 12/01/25
+Last Edited: 10/18/26
+"""
+
+## todo: add the delete ones and clearing one?
+
+import csv
+import io
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from latency_utils.instrumentation import count, timed, timer
+
+# pandas is imported inside the reading functions only: probing and
+# appending rows never need it, and it's most of the startup time
+
+try:
+    import fcntl  # file locks between processes (not on Windows)
+except ImportError:
+    fcntl = None
+
+here = os.path.dirname(os.path.abspath(__file__))  # cd to current directory
+project_root = os.path.join(
+    here, "..", ".."
+)  # cd .. and then cd .. again (go up two directories from current one)
+
+
+def _default_results_folder():
+    """
+    Where results go when no path is given:
+        - $LATENCY_RESULTS_DIR if it's set
+        - project_root/results when running from the repo (notebook, tests, pip install -e)
+        - ./results under the current directory for an installed package, whose
+          project_root would be somewhere inside site-packages' parent
+    """
+    folder = os.environ.get("LATENCY_RESULTS_DIR")
+    if folder:
+        return os.path.abspath(os.path.expanduser(folder))
+    if os.path.exists(os.path.join(project_root, "pyproject.toml")):
+        return os.path.join(project_root, "results")
+    return os.path.join(os.getcwd(), "results")
+
+
+results_folder = _default_results_folder()
+results_file = os.path.join(
+    results_folder, "results.csv"
+)  # results file is results_folder/results.csv
+
+
+def ensure_folder_for(path):
+    """
+    Create the folder a file is about to be written into (the default results
+    folder doesn't exist until the first write).
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+
+class write_atomic:
+    """
+    Write a file through a temp file that replaces it (os.replace) at the end,
+    so a crash never leaves half a file and readers see the old one or the new one:
+        with write_atomic(path) as f:
+            json.dump(state, f)
+    If the block raises, the temp file is removed and path is left alone.
+    mode / newline are passed to open ("wb" for pickles, newline="" for csv).
+    """
+
+    def __init__(self, path, mode="w", newline=None):
+        self.path = path
+        self.temp_path = path + ".tmp"
+        self.mode = mode
+        self.newline = newline
+        self.f = None
+
+    def __enter__(self):
+        ensure_folder_for(self.path)
+        self.f = open(self.temp_path, self.mode, newline=self.newline)
+        return self.f
+
+    def __exit__(self, exc_type, exc, tb):
+        self.f.close()
+        if exc_type is None:
+            os.replace(self.temp_path, self.path)
+        else:
+            try:
+                os.remove(self.temp_path)
+            except FileNotFoundError:
+                pass
+
+
+def side_file_for(csv_file_path, name):
+    """
+    Path of a file that belongs to a results file (samples, anomaly state,
+    plots...), kept next to it: data/results.csv -> data/<name>
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(csv_file_path)), name)
+
+
+_write_lock = threading.Lock()  # one writer thread at a time in this process
+
+
+def append_session_row(row, csv_file_path=None):
+    """
+    Append session row to results file and creates if missing.
+    If csv_file_path is None, defaults to results_file.
+    """
+    if row.get("successes", 0) == 0:
+        print("\nURL was unreachable: the site may be down or the URL was invalid.")
+        print("It has not been recorded in the results file.")
+        return  # do not write the row
+
+    append_session_rows([row], csv_file_path)
+    print("\nSession summary properly appended to the results file")
+
+
+@timed("io.append_session_rows")
+def append_session_rows(rows, csv_file_path=None):
+    """
+    Append a batch of session rows with a single write to the results file.
+    Rows with no successes are skipped like in append_session_row.
+    csv_file_path can also be a SQLite database (.db / .sqlite) or a
+    ResultsBackend, see open_backend.
+    Returns how many rows were written.
+    """
+    rows = [row for row in rows if row.get("successes", 0) != 0]
+    if not rows:
+        return 0
+
+    count("io.rows_appended", len(rows))
+    return open_backend(csv_file_path).append_rows(rows)
+
+
+def _append_csv_rows(rows, csv_file_path):
+    """
+    Append rows to a results csv in one write, widening the header if needed.
+    """
+    # only one writer (thread or process) touches the file at a time
+    with results_lock(csv_file_path):
+        repair_torn_row(csv_file_path)
+
+        # header of the file if it already exists (None if it's new or empty)
+        fieldnames = read_header(csv_file_path)
+        write_header = fieldnames is None
+        if write_header:
+            fieldnames = []
+
+        # some modes add extra columns (e.g. pooled cold/warm), widen the file first
+        new_columns = []
+        for row in rows:
+            for col in row.keys():
+                if col not in fieldnames and col not in new_columns:
+                    new_columns.append(col)
+        fieldnames = fieldnames + new_columns
+        if new_columns and not write_header:
+            widen_header(csv_file_path, fieldnames)
+
+        # build the whole batch in memory first, columns a row doesn't have are left blank
+        text = io.StringIO()
+        writer = csv.DictWriter(text, fieldnames=fieldnames)
+
+        # if the file didn't exist yet, it wont have the header.
+        if write_header:
+            writer.writeheader()
+
+        # else just simple row writes
+        writer.writerows(rows)
+
+        _append_atomic(csv_file_path, text.getvalue().encode("utf-8"))
+
+    return len(rows)
+
+
+class ResultsBackend(ABC):
+    """
+    Where session rows are stored. DataAnalyzer, ResultWriter and
+    append_session_rows only talk to a backend, so the results can be a csv
+    file (CsvBackend) or a SQLite database (latency_utils.sqlite_backend.SqliteBackend).
+        kind: "csv" or "sqlite"
+        path: the file the results are in
+        supports_aggregates: per_url_aggregates / overall_aggregates are computed
+            by the store itself, without loading the rows into pandas
+    A subclass has to implement every abstract method, or it can't be created.
+    """
+
+    kind = None
+    supports_aggregates = False
+
+    def __init__(self, path):
+        self.path = path
+
+    @abstractmethod
+    def append_rows(self, rows):
+        """
+        Write a batch of session rows (no filtering). Returns how many were written.
+        """
+
+    @abstractmethod
+    def read_frame(self, url=None, label=None, start=None, end=None, columns=None):
+        """
+        The results as a typed DataFrame (see read_latency_csv), optionally only
+        the rows of one url / label and run_started_at in [start, end].
+        columns: only these columns
+        """
+
+    @abstractmethod
+    def columns(self):
+        """
+        Column names of the stored results, None if there are none yet.
+        """
+
+    def per_url_aggregates(self):
+        """
+        Base per-URL columns (attempts_total ... stddev_latency_ms, avg_*_ms phases)
+        from the store, or None if this backend can't compute them itself.
+        """
+        return None
+
+    def overall_aggregates(self):
+        """
+        Totals for overall_statistics from the store, or None (like per_url_aggregates).
+        """
+        return None
+
+    @abstractmethod
+    def fingerprint(self):
+        """
+        Changes whenever the stored rows change, None if nothing is stored.
+        """
+
+    @abstractmethod
+    def delete(self):
+        """
+        Delete everything stored. Returns False if there was nothing to delete.
+        """
+
+
+class CsvBackend(ResultsBackend):
+    """
+    The results csv file (the default backend).
+    """
+
+    kind = "csv"
+
+    def append_rows(self, rows):
+        return _append_csv_rows(rows, self.path)
+
+    def read_frame(self, url=None, label=None, start=None, end=None, columns=None):
+        import pandas as pd
+
+        df = read_latency_csv(self.path, usecols=columns)
+        mask = None
+        for column, value in (("url", url), ("label", label)):
+            if value is not None:
+                matched = df[column] == str(value).strip()
+                mask = matched if mask is None else mask & matched
+        if start is not None or end is not None:
+            matched = df["run_started_at"].between(
+                pd.Timestamp(start) if start is not None else pd.Timestamp.min,
+                pd.Timestamp(end) if end is not None else pd.Timestamp.max,
+            )
+            mask = matched if mask is None else mask & matched
+        if mask is not None:
+            df = df[mask]
+        return df if columns is None else df[columns]
+
+    def columns(self):
+        return read_header(self.path)
+
+    def fingerprint(self):
+        return file_fingerprint(self.path)
+
+    def delete(self):
+        try:
+            os.remove(self.path)
+            return True
+        except FileNotFoundError:
+            return False
+
+
+sqlite_suffixes = (".db", ".sqlite", ".sqlite3")
+
+
+def open_backend(path=None):
+    """
+    Backend for a results path: .db / .sqlite / .sqlite3 files are SQLite
+    databases, anything else is a csv file. None = default results file.
+    A ResultsBackend passed in is returned as is.
+    """
+    if isinstance(path, ResultsBackend):
+        return path
+
+    path = path or results_file
+    if str(path).lower().endswith(sqlite_suffixes):
+        from latency_utils.sqlite_backend import SqliteBackend
+
+        return SqliteBackend.shared(path)
+    return CsvBackend(path)
+
+
+def file_fingerprint(path):
+    """
+    (device, inode, size, mtime) of a file, or None if it doesn't exist.
+    Any append, rewrite or replace of the file changes it.
+    """
+    try:
+        info = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (info.st_dev, info.st_ino, info.st_size, info.st_mtime_ns)
+
+
+class _file_lock:
+    """
+    Exclusive lock on a sidecar results.csv.lock file so probers in other
+    processes wait their turn. The lock isn't on the csv itself because
+    widen_header swaps the csv out for a new file.
+    Does nothing where fcntl doesn't exist (Windows).
+    """
+
+    def __init__(self, csv_file_path):
+        self.lock_path = csv_file_path + ".lock"
+        self.f = None
+
+    def __enter__(self):
+        # every write of a results / samples / partition file starts here
+        ensure_folder_for(self.lock_path)
+        if fcntl is not None:
+            self.f = open(self.lock_path, "a")
+            fcntl.flock(self.f.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.f is not None:
+            fcntl.flock(self.f.fileno(), fcntl.LOCK_UN)
+            self.f.close()
+
+
+class results_lock:
+    """
+    Hold everything a writer of the results file holds (the thread lock
+    and the file lock), e.g. to rewrite the file without racing appends:
+        with results_lock(path):
+            ...
+    """
+
+    def __init__(self, csv_file_path):
+        self.file_lock = _file_lock(csv_file_path)
+
+    def __enter__(self):
+        _write_lock.acquire()
+        try:
+            self.file_lock.__enter__()
+        except BaseException:
+            _write_lock.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.file_lock.__exit__(exc_type, exc, tb)
+        finally:
+            _write_lock.release()
+
+
+def _append_atomic(csv_file_path, data):
+    """
+    Append data with one write() on an O_APPEND file and fsync it.
+    """
+    fd = os.open(csv_file_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        written = 0
+        while written < len(data):  # os.write can be short on some filesystems
+            written += os.write(fd, data[written:])
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def repair_torn_row(csv_file_path):
+    """
+    If a crash left a torn last row (no newline at the end of the file),
+    cut that partial row off so it can't break read_latency_csv.
+    Returns True if something was cut.
+    """
+    try:
+        f = open(csv_file_path, "r+b")
+    except FileNotFoundError:
+        return False
+
+    with f:
+        size = f.seek(0, os.SEEK_END)
+        end = _complete_length(f, size)
+        if end == size:
+            return False
+        f.truncate(end)  # 0 if not even the header made it
+        return True
+
+
+def _complete_length(f, size):
+    """
+    Bytes of the binary file f up to and including its last newline
+    (size if it ends in one, 0 if it has none).
+    """
+    if size == 0:
+        return 0
+    f.seek(size - 1)
+    if f.read(1) == b"\n":
+        return size
+
+    # walk back to the last complete line
+    end = size
+    while end > 0:
+        start = max(0, end - 65536)
+        f.seek(start)
+        newline = f.read(end - start).rfind(b"\n")
+        if newline != -1:
+            return start + newline + 1
+        end = start
+    return 0
+
+
+class _complete_lines:
+    """
+    Read-only view of a results file that stops after its last complete line,
+    so a row another process is still writing (or a crash tore) isn't parsed
+    as a session with half its columns missing. The file itself is left alone.
+    """
+
+    def __init__(self, csv_file_path):
+        self.f = open(csv_file_path, "rb")
+        size = self.f.seek(0, os.SEEK_END)
+        self.left = _complete_length(self.f, size)
+        if self.left == 0:
+            self.left = size  # no newline at all: a lone header, let pandas see it
+        self.f.seek(0)
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self.left:
+            size = self.left
+        data = self.f.read(size)
+        self.left -= len(data)
+        return data
+
+    def __iter__(self):
+        return iter(self.read().splitlines(keepends=True))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.f.close()
+
+
+class ResultWriter:
+    """
+    Buffered writer for session rows, safe to share between threads.
+    Rows are held in memory and written in one batch once max_rows are
+    waiting or the oldest one is max_age seconds old.
+        csv_file_path: results file (None = default results file), or a
+            .db / .sqlite file / ResultsBackend, see open_backend
+        max_rows: flush once this many rows are buffered
+        max_age: flush once the oldest buffered row is this old (seconds)
+        clock: time source, swap in a fake one for tests
+        listeners: functions called with every batch of rows after it's written
+            (e.g. AnomalyDetector.observe_rows)
+
+    Use as a context manager so close() flushes the last batch:
+        with ResultWriter() as writer:
+            writer.write(tester.create_session_row())
+    """
+
+    def __init__(self, csv_file_path=None, max_rows=100, max_age=5.0, clock=time.monotonic, listeners=None):
+        if max_rows <= 0 or max_age < 0:
+            raise ValueError("max_rows must be > 0 and max_age must be >= 0.")
+
+        self.csv_file_path = csv_file_path or results_file
+        self.backend = open_backend(self.csv_file_path)
+        self.max_rows = max_rows
+        self.max_age = max_age
+        self.clock = clock
+        self.listeners = list(listeners or [])
+
+        self._lock = threading.Lock()
+        self._rows = []
+        self._oldest = None  # when the first buffered row came in
+        self.rows_written = 0
+        self.flushes = 0
+
+    def __len__(self):
+        return len(self._rows)
+
+    def write(self, row):
+        """
+        Buffer one session row, flushing if a threshold was hit.
+        """
+        with self._lock:
+            if not self._rows:
+                self._oldest = self.clock()
+            self._rows.append(row)
+            full = len(self._rows) >= self.max_rows
+
+        if full:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def write_many(self, rows):
+        for row in rows:
+            self.write(row)
+
+    def flush_if_due(self):
+        """
+        Flush if the oldest buffered row is older than max_age.
+        Call this from idle loops so rows don't sit forever when traffic is low.
+        """
+        with self._lock:
+            due = self._rows and self.clock() - self._oldest >= self.max_age
+        if due:
+            self.flush()
+
+    def flush_due_at(self):
+        """
+        Clock time the buffered rows will be due for a flush, or None if empty.
+        """
+        with self._lock:
+            return self._oldest + self.max_age if self._rows else None
+
+    def flush(self):
+        """
+        Write every buffered row in one batch. Returns how many were written.
+        """
+        # swap the buffer out so producers aren't blocked during the write
+        with self._lock:
+            rows = self._rows
+            oldest = self._oldest
+            self._rows = []
+            self._oldest = None
+
+        if not rows:
+            return 0
+
+        try:
+            written = append_session_rows(rows, self.backend)
+        except BaseException:
+            # put the batch back in front of anything buffered meanwhile, so the
+            # next flush retries it instead of the rows being lost
+            with self._lock:
+                self._rows = rows + self._rows
+                self._oldest = oldest
+            raise
+        with self._lock:
+            self.rows_written += written
+            self.flushes += 1
+
+        # the rows are safely on disk, a listener failing can't lose them
+        for listener in self.listeners:
+            try:
+                listener(rows)
+            except Exception as e:
+                print(f"Result listener {getattr(listener, '__name__', listener)} failed: {e}")
+        return written
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_header(csv_file_path):
+    """
+    Return the list of column names in the results file,
+    or None if the file doesn't exist or is empty.
+    """
+    try:
+        with open(csv_file_path, newline="") as f:
+            header = next(csv.reader(f), None)
+    except FileNotFoundError:
+        return None
+
+    return header or None
+
+
+def widen_header(csv_file_path, fieldnames):
+    """
+    Rewrite the results file with a wider header (old rows get blanks for new columns).
+    Written to a temp file and swapped in so a crash can't lose the old data.
+    """
+    with open(csv_file_path, newline="") as src, write_atomic(csv_file_path, newline="") as dst:
+        writer = csv.DictWriter(dst, fieldnames=fieldnames)
+        writer.writeheader()
+        for old_row in csv.DictReader(src):
+            writer.writerow(old_row)
+
+
+# ensure all columns match required ones
+required_columns = [
+    "url",
+    "attempts",
+    "successes",
+    "failures",
+    "min_ms",
+    "max_ms",
+    "avg_ms",
+]
+
+# column types for the results file, so pandas doesn't guess (object strings, int64)
+category_columns = ["url", "label"]
+integer_columns = ["attempts", "successes", "failures"]
+time_format = "%Y-%m-%d %H:%M:%S"  # how LatencyTester writes run_started_at
+
+
+def read_latency_csv(csv_file_path=None, usecols=None, chunksize=None, verbose=False):
+    """
+    Helper function for data analyzer class to read csv file and convert into pandas dataframe.
+    If csv_file_path is None, defaults to results_file.
+    Returns a pandas DataFrame with compact types:
+        - url / label as categoricals (each distinct string stored once)
+        - run_started_at parsed to datetimes
+        - attempts / successes / failures downcast to the smallest int type
+        - latency columns stay float64 so averages don't lose precision
+    usecols: only load these columns (the required ones are always loaded)
+    chunksize: return an iterator of DataFrames of this many rows instead,
+        for files too big to load at once
+    verbose: print how many rows were loaded and how much memory they take
+    A last row with no newline yet (still being written, or torn by a crash)
+    is left out, like read_appended_rows does.
+    """
+    csv_file_path = csv_file_path or results_file
+
+    # Check if file exists
+    if not os.path.exists(csv_file_path):
+        raise FileNotFoundError(f"CSV file not found: {csv_file_path}")
+
+    options = _read_options(usecols)
+
+    if chunksize is not None:
+        # timed chunk by chunk as it's consumed, timing this call would only
+        # measure making the generator
+        return _iter_latency_csv(csv_file_path, chunksize, options, verbose)
+
+    return _read_latency_frame(csv_file_path, options, verbose)
+
+
+@timed("io.read_latency_csv")
+def _read_latency_frame(csv_file_path, options, verbose):
+    import pandas as pd
+
+    # try to read the CSV (complete lines only, see _complete_lines)
+    try:
+        with _complete_lines(csv_file_path) as f:
+            df = pd.read_csv(f, **options)
+    # handle error if file is empty
+    except pd.errors.EmptyDataError:
+        raise ValueError(f"CSV file is empty: {csv_file_path}")
+    # handle error if file can't be parsed
+    except pd.errors.ParserError as e:
+        raise ValueError(f"CSV file could not be parsed: {csv_file_path}\n{e}")
+
+    check_required_columns(df, csv_file_path)
+    df = optimize_dtypes(df)
+    count("io.rows_read", len(df))
+
+    if verbose:
+        print(f"Loaded {len(df)} rows using {memory_footprint(df) / 1e6:.2f} MB")
+    # return the dataframe
+    return df
+
+
+def _read_options(usecols=None):
+    """
+    Keyword arguments for pd.read_csv on a results file.
+    """
+    options = {"dtype": {col: "category" for col in category_columns}}
+
+    if usecols is not None:
+        # always keep the columns the analysis needs, skip ones the file doesn't have
+        wanted = set(usecols) | set(required_columns) | {"label", "run_started_at"}
+        options["usecols"] = lambda col: col in wanted
+
+    return options
+
+
+def _iter_latency_csv(csv_file_path, chunksize, options, verbose):
+    import pandas as pd
+
+    rows = 0
+    try:
+        with _complete_lines(csv_file_path) as f, pd.read_csv(f, chunksize=chunksize, **options) as reader:
+            while True:
+                # only the parsing counts under the stage, not what the caller
+                # does with a chunk between two next() calls
+                with timer("io.read_latency_csv"):
+                    chunk = next(reader, None)
+                    if chunk is None:
+                        break
+                    check_required_columns(chunk, csv_file_path)
+                    chunk = optimize_dtypes(chunk)
+                    count("io.rows_read", len(chunk))
+                rows += len(chunk)
+                yield chunk
+    except pd.errors.EmptyDataError:
+        raise ValueError(f"CSV file is empty: {csv_file_path}")
+    except pd.errors.ParserError as e:
+        raise ValueError(f"CSV file could not be parsed: {csv_file_path}\n{e}")
+
+    if verbose:
+        print(f"Streamed {rows} rows in chunks of {chunksize}")
+
+
+def optimize_dtypes(df):
+    """
+    Convert a freshly read results frame to the compact column types
+    (see read_latency_csv). Also strips whitespace off the URLs.
+    """
+    import pandas as pd
+
+    for col in category_columns:
+        if col not in df.columns:
+            continue
+        if not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+        # clean up by stripping whitespace, on the few categories instead of every row
+        categories = df[col].cat.categories
+        stripped = categories.astype(str).str.strip()
+        if stripped.has_duplicates:
+            df[col] = df[col].astype(str).str.strip().astype("category")
+        elif not stripped.equals(categories):
+            df[col] = df[col].cat.rename_categories(stripped)
+            df[col] = df[col].cat.reorder_categories(sorted(stripped))
+
+    for col in integer_columns:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+
+    if "run_started_at" in df.columns:
+        df["run_started_at"] = pd.to_datetime(
+            df["run_started_at"], format=time_format, errors="coerce"
+        )
+
+    return df
+
+
+def memory_footprint(df):
+    """
+    Bytes a DataFrame takes in memory, including the strings it points at.
+    """
+    return int(df.memory_usage(deep=True).sum())
+
+
+def concat_results(frames):
+    """
+    pd.concat for typed results frames that keeps url / label categorical
+    (plain concat turns categoricals with different categories back into strings).
+    """
+    import pandas as pd
+
+    frames = [df for df in frames if df is not None]
+    for col in category_columns:
+        if all(col in df.columns for df in frames):
+            categories = sorted(set().union(*(df[col].cat.categories for df in frames)))
+            for df in frames:
+                df[col] = df[col].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
+
+
+def check_required_columns(df, csv_file_path):
+    """
+    Raise ValueError if the results data is missing a column the analysis needs.
+    """
+    # if any required column is missing, raise error
+    for col in required_columns:
+        if col not in df.columns:
+            raise ValueError(
+                f"Missing required column '{col}' in CSV file: {csv_file_path}"
+            )
+
+
+def read_appended_rows(csv_file_path, offset, header=None):
+    """
+    Read only the rows added to the results file after byte offset.
+    With offset 0 the header line is read from the file, otherwise
+    header (the column names) has to be passed in.
+    A row still being written (no newline yet) is left for next time.
+    Returns (DataFrame, new offset).
+    """
+    import pandas as pd
+
+    with open(csv_file_path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+
+    # stop after the last complete line
+    end = data.rfind(b"\n") + 1
+    if end == 0:
+        if offset == 0:
+            raise ValueError(f"CSV file is empty: {csv_file_path}")
+        return optimize_dtypes(pd.DataFrame(columns=header)), offset  # nothing new yet
+
+    options = _read_options()
+    try:
+        if offset == 0:
+            df = pd.read_csv(io.BytesIO(data[:end]), **options)
+        else:
+            df = pd.read_csv(io.BytesIO(data[:end]), header=None, names=header, **options)
+    except pd.errors.ParserError as e:
+        raise ValueError(f"CSV file could not be parsed: {csv_file_path}\n{e}")
+
+    check_required_columns(df, csv_file_path)
+    return optimize_dtypes(df), offset + end
+
+
+def trim_rows_before(csv_file_path, cutoff):
+    """
+    Rewrite the results file without the rows that started before cutoff
+    (a datetime). Rows with an unreadable run_started_at are kept.
+    Hold results_lock while calling this, so no append gets lost.
+    Written to a temp file and swapped in like widen_header.
+    Returns how many rows were dropped.
+    """
+    # run_started_at is written as %Y-%m-%d %H:%M:%S, which sorts like the times do
+    cutoff_text = cutoff.strftime(time_format)
+    temp_path = csv_file_path + ".tmp"
+    dropped = 0
+    replaced = False
+
+    try:
+        with open(csv_file_path, newline="") as src, open(temp_path, "w", newline="") as dst:
+            reader = csv.reader(src)
+            writer = csv.writer(dst)
+            header = next(reader, None)
+            if header is None:
+                return 0
+            writer.writerow(header)
+            column = header.index("run_started_at") if "run_started_at" in header else None
+
+            for row in reader:
+                started = row[column] if column is not None and column < len(row) else ""
+                if len(started) == len(cutoff_text) and started < cutoff_text:
+                    dropped += 1
+                    continue
+                writer.writerow(row)
+
+        # nothing to drop: leave the file (and its inode) alone
+        if dropped:
+            os.replace(temp_path, csv_file_path)
+            replaced = True
+        return dropped
+    finally:
+        # empty file, nothing dropped or an error: the temp file mustn't linger
+        if not replaced:
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+
+
+def delete_results_csv(csv_file_path=None):
+    """
+    Deletes the csv passed in or default results_file
+    (or a SQLite results database, see open_backend)
+    """
+    if open_backend(csv_file_path).delete():
+        print("Results file successfully cleared.")
+    else:
+        print("The file does not exist, so nothing to do.")
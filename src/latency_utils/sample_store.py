@@ -0,0 +1,210 @@
+"""
+File: sample_store.py
+Description: Compact append-only store for every individual attempt (Result),
+    The results CSV only keeps session min/max/avg, so real percentiles
+    can't be computed from it. This keeps each raw sample as a fixed-size
+    24 byte binary record (timestamp, url id, label id, elapsed, status, ok)
+    in results/samples.bin, with urls and labels stored once as integer
+    codes in results/samples_ids.json.
+    Reading uses numpy.memmap, so loading doesn't copy the file into memory.
+
+Author: William TenCate
+Email: wtencate@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import json
+import os
+
+import numpy as np
+
+from latency.result import ResultList
+from latency_utils.io_utils import _file_lock, results_folder, write_atomic
+
+samples_file = os.path.join(results_folder, "samples.bin")
+
+# one record per attempt, little endian so the file is portable between machines
+sample_dtype = np.dtype(
+    [
+        ("timestamp", "<f8"),  # unix time the request was sent
+        ("url_id", "<u4"),
+        ("label_id", "<u4"),
+        ("elapsed_ms", "<f4"),
+        ("status", "<u2"),  # 0 when there was no response
+        ("ok", "u1"),
+        ("_pad", "u1"),  # keeps records 8 byte aligned
+    ]
+)
+
+
+def ids_path_for(samples_path):
+    """
+    results/samples.bin -> results/samples_ids.json
+    """
+    base, _ = os.path.splitext(samples_path)
+    return base + "_ids.json"
+
+
+class SampleStore:
+    """
+    Append-only binary store of raw per-attempt samples.
+        samples_path: the .bin file, defaults to results/samples.bin
+    """
+
+    def __init__(self, samples_path=None):
+        self.samples_path = samples_path or samples_file
+        self.ids_path = ids_path_for(self.samples_path)
+        self._load_ids()
+
+    def _load_ids(self):
+        try:
+            with open(self.ids_path) as f:
+                ids = json.load(f)
+        except FileNotFoundError:
+            ids = {"urls": [], "labels": []}
+
+        self.urls = ids["urls"]
+        self.labels = ids["labels"]
+        self._url_codes = {url: i for i, url in enumerate(self.urls)}
+        self._label_codes = {label: i for i, label in enumerate(self.labels)}
+
+    def _save_ids(self):
+        with write_atomic(self.ids_path) as f:
+            json.dump({"urls": self.urls, "labels": self.labels}, f)
+
+    def _code(self, value, values, codes):
+        if value not in codes:
+            codes[value] = len(values)
+            values.append(value)
+        return codes[value]
+
+    def append(self, results, label):
+        """
+        Append a list of Result objects (one session) under label.
+        Returns how many samples were written.
+        Safe with other processes appending to the same store (the daemon
+        and `latency probe --samples`): codes are assigned and the records
+        written under a samples.bin.lock file lock.
+        """
+        if len(results) == 0:
+            return 0
+
+        with _file_lock(self.samples_path):
+            # another process may have added urls / labels since we last looked,
+            # a code from a stale list could point at someone else's url
+            self._load_ids()
+            old_sizes = (len(self.urls), len(self.labels))
+            records = self._records(results, label)
+
+            # ids have to be on disk before any sample that uses them
+            if (len(self.urls), len(self.labels)) != old_sizes:
+                self._save_ids()
+
+            with open(self.samples_path, "ab") as f:
+                # a crash mid-append leaves part of a record at the end, cut it
+                # off or every record after it would be read shifted
+                size = f.seek(0, os.SEEK_END)
+                torn = size % sample_dtype.itemsize
+                if torn:
+                    f.truncate(size - torn)
+                # one write for the whole session
+                f.write(records.tobytes())
+
+        return len(records)
+
+    def _records(self, results, label):
+        records = np.zeros(len(results), dtype=sample_dtype)
+        label_id = self._code(label, self.labels, self._label_codes)
+
+        if isinstance(results, ResultList):
+            # already column arrays, copy them over whole instead of one Result at a time
+            columns = results.columns()
+            records["timestamp"] = columns["timestamp"]
+            records["url_id"] = self._code(results.url, self.urls, self._url_codes)
+            records["label_id"] = label_id
+            records["elapsed_ms"] = columns["elapsed_ms"]
+            records["status"] = columns["status_code"]
+            records["ok"] = columns["ok"]
+        else:
+            for i, r in enumerate(results):
+                records[i] = (
+                    r.timestamp,
+                    self._code(r.url, self.urls, self._url_codes),
+                    label_id,
+                    r.elapsed_ms,
+                    r.status_code or 0,
+                    r.ok,
+                    0,
+                )
+        return records
+
+    def load(self):
+        """
+        Memory-map every sample as a numpy structured array (read only, no copy).
+        A partly written last record (crash mid-append) is ignored.
+        """
+        # size first, ids second: append saves new ids before the samples that
+        # use them, so every sample up to this size has its url / label loaded
+        try:
+            size = os.path.getsize(self.samples_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Sample file not found: {self.samples_path}")
+        self._load_ids()
+
+        count = size // sample_dtype.itemsize
+        if count == 0:
+            return np.zeros(0, dtype=sample_dtype)
+
+        return np.memmap(self.samples_path, dtype=sample_dtype, mode="r", shape=(count,))
+
+    def to_dataframe(self):
+        """
+        Load samples into a pandas DataFrame with url/label as categoricals.
+        Numeric columns are built straight from the memory-mapped columns.
+        """
+        import pandas as pd
+
+        records = self.load()  # also reloads urls / labels to match
+
+        return pd.DataFrame(
+            {
+                "timestamp": pd.to_datetime(records["timestamp"], unit="s"),
+                "url": pd.Categorical.from_codes(
+                    np.asarray(records["url_id"], dtype=np.int32), categories=self.urls
+                ),
+                "label": pd.Categorical.from_codes(
+                    np.asarray(records["label_id"], dtype=np.int32),
+                    categories=self.labels,
+                ),
+                "elapsed_ms": records["elapsed_ms"],
+                "status": records["status"],
+                "ok": records["ok"].astype(bool),
+            },
+            copy=False,
+        )
+
+
+def append_session_samples(tester, samples_path=None):
+    """
+    Append every attempt of a finished LatencyTester session to the sample store.
+    Unlike append_session_row, failed attempts are kept too (ok = 0).
+    """
+    store = SampleStore(samples_path)
+    count = store.append(tester.results, tester.label)
+    print(f"\n{count} raw samples appended to the sample store")
+    return count
+
+
+def delete_samples(samples_path=None):
+    """
+    Deletes the sample store (samples file and its ids file)
+    """
+    samples_path = samples_path or samples_file
+
+    for path in (samples_path, ids_path_for(samples_path)):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    print("Sample store successfully cleared.")
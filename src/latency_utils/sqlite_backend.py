@@ -0,0 +1,314 @@
+"""
+File: sqlite_backend.py
+Description: SQLite results backend,
+    Session rows go into a `sessions` table of a SQLite database in WAL
+    mode instead of the results csv, so several probers can append while
+    analysts read (readers never block the writer or each other).
+        - each batch of rows is one transaction (BEGIN IMMEDIATE + executemany)
+        - indexes on (url, run_started_at) and (label, run_started_at) for
+          DataAnalyzer.query and time windows
+        - per_url_statistics / overall_statistics aggregates run as SQL, so
+          they don't need every row loaded into pandas first
+        - new row keys (phase timings, cold/warm, ...) become new columns,
+          like widen_header does for the csv
+    Picked by open_backend for .db / .sqlite / .sqlite3 paths.
+
+Author: William TenCate
+Email: wtencate@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import os
+import sqlite3
+import threading
+
+from latency_utils.io_utils import (
+    ResultsBackend,
+    category_columns,
+    check_required_columns,
+    ensure_folder_for,
+    optimize_dtypes,
+    time_format,
+)
+from latency.probe import phase_columns
+
+table = "sessions"
+
+# columns every database starts with, in the order LatencyTester writes them
+base_columns = [
+    ("run_started_at", "TEXT"),
+    ("label", "TEXT"),
+    ("url", "TEXT"),
+    ("attempts", "INTEGER"),
+    ("successes", "INTEGER"),
+    ("failures", "INTEGER"),
+    ("min_ms", "REAL"),
+    ("max_ms", "REAL"),
+    ("avg_ms", "REAL"),
+]
+
+indexes = {
+    "sessions_url_time": ("url", "run_started_at"),
+    "sessions_label_time": ("label", "run_started_at"),
+}
+
+
+def _quote(name):
+    # column names come from row keys, never let one break out of the quotes
+    if '"' in name or "\x00" in name:
+        raise ValueError(f"Bad column name: {name!r}")
+    return f'"{name}"'
+
+
+def _sql_type(value):
+    if isinstance(value, (bool, int)):
+        return "INTEGER"
+    if isinstance(value, float):
+        return "REAL"
+    return "TEXT"
+
+
+def _time_text(value):
+    # run_started_at is stored as %Y-%m-%d %H:%M:%S text, which sorts like the times do
+    import pandas as pd
+
+    return pd.Timestamp(value).strftime(time_format)
+
+
+class SqliteBackend(ResultsBackend):
+    """
+    Results in a SQLite database file.
+        path: the database file (created on the first append)
+    One connection per backend, shared by the threads of this process under
+    a lock. Use SqliteBackend.shared(path) to get the one backend for a path.
+    """
+
+    kind = "sqlite"
+    supports_aggregates = True
+
+    _shared = {}  # (process id, absolute path) -> backend
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, path):
+        """
+        The backend for path in this process, so every writer and analyzer
+        of the same database reuses one connection.
+        """
+        key = (os.getpid(), os.path.abspath(path))
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(path)
+            return cls._shared[key]
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._lock = threading.RLock()
+        self._conn = None
+        self._pid = None
+        self._columns = None  # cached column names, refreshed when a row brings new ones
+
+    def _connection(self):
+        # a connection must not be used across fork, open a new one in a child process
+        if self._conn is None or self._pid != os.getpid():
+            ensure_folder_for(self.path)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # WAL stays consistent, only a power cut can lose the last commits
+            self._conn = conn
+            self._pid = os.getpid()
+            self._columns = None
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+            self._columns = None
+
+    def _require_file(self):
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"Results database not found: {self.path}")
+
+    def _table_columns(self, conn):
+        rows = conn.execute(f"PRAGMA table_info({table})").fetchall()
+        return [row[1] for row in rows if row[1] != "id"]
+
+    def _create_schema(self, conn):
+        columns = ", ".join(f"{_quote(name)} {kind}" for name, kind in base_columns)
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY AUTOINCREMENT, {columns})")
+        for name, on in indexes.items():
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(map(_quote, on))})")
+
+    def append_rows(self, rows):
+        """
+        Insert a batch of rows in one transaction. Returns how many were inserted.
+        """
+        if not rows:
+            return 0
+
+        names = list(dict.fromkeys(name for row in rows for name in row))
+        values = [[row.get(name) for name in names] for row in rows]
+
+        # same cleanup optimize_dtypes does on read
+        for i, name in enumerate(names):
+            if name in category_columns:
+                for record in values:
+                    if isinstance(record[i], str):
+                        record[i] = record[i].strip()
+
+        with self._lock:
+            conn = self._connection()
+            # IMMEDIATE takes the write lock up front, so the schema check and
+            # the insert can't interleave with another process's batch
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._columns is None or any(name not in self._columns for name in names):
+                    self._create_schema(conn)
+                    existing = self._table_columns(conn)
+                    for i, name in enumerate(names):
+                        if name not in existing:
+                            # type from the first value the batch has for it
+                            sample = next((record[i] for record in values if record[i] is not None), None)
+                            conn.execute(f"ALTER TABLE {table} ADD COLUMN {_quote(name)} {_sql_type(sample)}")
+                            existing.append(name)
+                    self._columns = existing
+
+                conn.executemany(
+                    f"INSERT INTO {table} ({', '.join(map(_quote, names))}) VALUES ({', '.join('?' * len(names))})",
+                    values,
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        return len(rows)
+
+    def columns(self):
+        if not os.path.exists(self.path):
+            return None
+        with self._lock:
+            columns = self._table_columns(self._connection())
+        return columns or None
+
+    def _where(self, url=None, label=None, start=None, end=None):
+        clauses = []
+        params = []
+        for column, value in (("url", url), ("label", label)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(str(value).strip())
+        if start is not None:
+            clauses.append("run_started_at >= ?")
+            params.append(_time_text(start))
+        if end is not None:
+            clauses.append("run_started_at <= ?")
+            params.append(_time_text(end))
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def read_frame(self, url=None, label=None, start=None, end=None, columns=None):
+        """
+        Rows as a typed DataFrame (same types as read_latency_csv), in insert order.
+        Filters are pushed into the WHERE clause and use the indexes.
+        columns: only read these columns (skips the typing and required column check)
+        """
+        import pandas as pd
+
+        self._require_file()
+        where, params = self._where(url, label, start, end)
+        selected = "*" if columns is None else ", ".join(map(_quote, columns))
+
+        with self._lock:
+            conn = self._connection()
+            if not self._table_columns(conn):
+                raise ValueError(f"Results database is empty: {self.path}")
+            df = pd.read_sql_query(f"SELECT {selected} FROM {table}{where} ORDER BY id", conn, params=params)
+
+        if columns is not None:
+            return df
+
+        df = df.drop(columns="id")
+        if df.empty and not params:
+            raise ValueError(f"Results database is empty: {self.path}")
+        check_required_columns(df, self.path)
+        return optimize_dtypes(df)
+
+    def _aggregate_sql(self, by_url):
+        """
+        SELECT computing the base statistics columns, per URL or over everything.
+        stddev is of the session averages (like pandas std), from the sums of
+        x and x^2 in one pass. Latencies are small positive numbers, so that
+        stays within ~1e-12 of the two pass result.
+        """
+        stored = self.columns() or []
+        phases = [phase for phase in phase_columns if phase in stored]
+        phase_sql = "".join(f", AVG({_quote(phase)}) AS avg_{phase}" for phase in phases)
+        # n / (n - 1) sample variance, NULL (-> NaN) for a single session like pandas
+        variance = (
+            "MAX(0.0, (SUM(avg_ms * avg_ms) - SUM(avg_ms) * SUM(avg_ms) / COUNT(avg_ms)) "
+            "/ (COUNT(avg_ms) - 1)) AS variance"
+        )
+        if by_url:
+            return (
+                "SELECT url, SUM(attempts) AS attempts_total, SUM(successes) AS successes_total, "
+                "SUM(failures) AS failures_total, MIN(min_ms) AS min_latency_ms, MAX(max_ms) AS max_latency_ms, "
+                f"AVG(avg_ms) AS avg_latency_ms, {variance}{phase_sql} FROM {table} GROUP BY url ORDER BY url"
+            )
+        return (
+            "SELECT SUM(attempts) AS total_attempts, SUM(successes) AS total_successes, "
+            f"SUM(failures) AS total_failures, AVG(avg_ms) AS overall_avg_latency_ms, {variance}, "
+            f"MIN(min_ms) AS min_latency_ms, MAX(max_ms) AS max_latency_ms FROM {table}"
+        )
+
+    def per_url_aggregates(self):
+        import numpy as np
+        import pandas as pd
+
+        self._require_file()
+        with self._lock:
+            per_url = pd.read_sql_query(self._aggregate_sql(by_url=True), self._connection(), index_col="url")
+
+        per_url.insert(per_url.columns.get_loc("variance"), "stddev_latency_ms", np.sqrt(per_url.pop("variance")))
+        return per_url
+
+    def overall_aggregates(self):
+        import numpy as np
+        import pandas as pd
+
+        self._require_file()
+        with self._lock:
+            overall = pd.read_sql_query(self._aggregate_sql(by_url=False), self._connection()).iloc[0]
+        overall["overall_stddev_latency_ms"] = np.sqrt(overall.pop("variance"))
+        return overall  # the caller puts the columns in the usual order
+
+    def fingerprint(self):
+        """
+        (last row id, row count, column count). Ids are never reused
+        (AUTOINCREMENT), so any insert, delete or new column changes it.
+        None if the database doesn't exist or has no rows.
+        """
+        if not os.path.exists(self.path):
+            return None
+        with self._lock:
+            conn = self._connection()
+            columns = self._table_columns(conn)
+            if not columns:
+                return None
+            last, count = conn.execute(f"SELECT MAX(id), COUNT(*) FROM {table}").fetchone()
+        if count == 0:
+            return None
+        return (last, count, len(columns))
+
+    def delete(self):
+        self.close()
+        deleted = False
+        for path in (self.path, self.path + "-wal", self.path + "-shm"):
+            try:
+                os.remove(path)
+                deleted = True
+            except FileNotFoundError:
+                pass
+        return deleted
@@ -0,0 +1,61 @@
+"""
+File: bench_async_tester.py
+Description: Benchmark for the asyncio probe engine,
+    Runs the same batch of sessions against a local stand-in server
+    at different in-flight limits and prints sessions/second, so you
+    can see throughput scale with the concurrency limit.
+    Run with: python tests/bench_async_tester.py
+Author: William TenCate
+Email: wtencate@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import os
+import sys
+import time
+
+here = os.path.dirname(os.path.abspath(__file__))  # cd to this file
+sys.path.append(os.path.join(here, "..", "src"))  # let python find src modules
+
+from latency.latency_tester import LatencyTester
+from latency.async_tester import AsyncProbeEngine
+from standin_server import StandInServer
+
+server_delay = 0.02  # 20 ms of fake server think time per request
+sessions = 40
+attempts = 5
+limits = [1, 4, 16, 64]
+
+
+def bench_serial(url):
+    testers = [LatencyTester(url, attempts=attempts) for _ in range(sessions // 4)]
+    start = time.perf_counter()
+    for tester in testers:
+        tester.run_tests()
+    return len(testers) / (time.perf_counter() - start)
+
+
+def bench_async(url, limit):
+    testers = [LatencyTester(url, attempts=attempts) for _ in range(sessions)]
+    engine = AsyncProbeEngine(max_in_flight=limit, per_host=limit)
+    start = time.perf_counter()
+    engine.run(testers)
+    elapsed = time.perf_counter() - start
+
+    # every attempt should have come back ok from the local server
+    assert all(t.create_session_row()["successes"] == attempts for t in testers)
+    return sessions / elapsed
+
+
+def main():
+    with StandInServer(delay=server_delay) as server:
+        print(f"{sessions} sessions x {attempts} attempts, {server_delay * 1000:.0f} ms server delay")
+        print(f"serial run_tests():      {bench_serial(server.url):8.2f} sessions/s")
+        for limit in limits:
+            rate = bench_async(server.url, limit)
+            print(f"async max_in_flight={limit:<3}: {rate:8.2f} sessions/s")
+
+
+if __name__ == "__main__":
+    main()
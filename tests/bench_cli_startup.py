@@ -0,0 +1,118 @@
+"""
+File: bench_cli_startup.py
+Description: Cold start benchmark for the latency command line,
+    Runs `latency probe` against a local stand-in server under
+    python -X importtime and adds up the import time of every top level
+    module, next to what the notebook's setup cell imports. Fails (exit 1)
+    if probe imports pandas / matplotlib or goes over the import budget.
+    Run with: python tests/bench_cli_startup.py [runs]
+Author: William TenCate
+Email: wtencate@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+here = os.path.dirname(os.path.abspath(__file__))  # cd to this file
+src_path = os.path.join(here, "..", "src")
+sys.path.append(src_path)
+
+from standin_server import StandInServer
+
+budget_ms = 120  # imports of a cold `latency probe`, python's own startup not counted
+heavy_modules = ("pandas", "numpy", "matplotlib", "requests")
+
+# what the notebook's setup cell imports
+notebook_imports = (
+    "from latency.latency_tester import LatencyTester; "
+    "from latency.async_tester import AsyncProbeEngine; "
+    "from latency_utils.io_utils import append_session_row; "
+    "from latency_utils.sample_store import append_session_samples; "
+    "from latency_analysis.data_analyzer import DataAnalyzer; "
+    "from latency_analysis.plots import Plots"
+)
+
+
+def import_times(code):
+    """
+    Run code in a fresh interpreter with -X importtime.
+    Returns ({top level module: cumulative microseconds}, wall seconds).
+    """
+    env = dict(os.environ, PYTHONPATH=src_path)
+    start = time.perf_counter()
+    done = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - start
+    if done.returncode != 0:
+        raise RuntimeError(done.stderr[-2000:])
+
+    modules = {}
+    for line in done.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # nested imports are already in their parent's total
+            modules[name.strip()] = int(cumulative)
+    return modules, wall
+
+
+def ours(modules, startup):
+    # python's own startup (site, encodings, ...) happens for every command, leave it out
+    return {name: us for name, us in modules.items() if name not in startup}
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    with StandInServer() as server, tempfile.TemporaryDirectory() as folder:
+        results = os.path.join(folder, "results.csv")
+        probe = (
+            "from latency.cli import main; "
+            f"main(['probe', {server.url!r}, '--attempts', '2', '--results', {results!r}])"
+        )
+
+        startup = set(import_times("pass")[0])
+
+        best = None
+        for _ in range(runs):
+            modules, wall = import_times(probe)
+            total = sum(ours(modules, startup).values()) / 1000
+            if best is None or total < best[0]:
+                best = (total, wall, modules)
+
+        notebook = min(
+            (sum(ours(import_times(notebook_imports)[0], startup).values()) / 1000 for _ in range(runs))
+        )
+
+        total, wall, modules = best
+        heavy = [name for name in modules if name.split(".")[0] in heavy_modules]
+        slowest = sorted(ours(modules, startup).items(), key=lambda item: -item[1])[:8]
+
+        print(f"{'notebook setup cell imports':<32}{notebook:>9.1f} ms")
+        print(f"{'latency probe imports':<32}{total:>9.1f} ms   (budget {budget_ms} ms, best of {runs})")
+        print(f"{'latency probe wall time':<32}{wall * 1000:>9.1f} ms   (interpreter + 2 requests)")
+        print("\nslowest top level imports of probe:")
+        for name, us in slowest:
+            print(f"    {name:<36}{us / 1000:>7.1f} ms")
+
+        ok = True
+        if heavy:
+            print(f"\nFAIL: probe imported {', '.join(heavy)}")
+            ok = False
+        if total > budget_ms:
+            print(f"\nFAIL: probe imports took {total:.1f} ms, budget is {budget_ms} ms")
+            ok = False
+        return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+File: bench_instrumentation.py
+Description: Overhead of the instrumentation layer,
+    - per call cost of a timed function / timer block, disabled vs enabled,
+      next to a plain call
+    - a LatencyTester session against a local stand-in server with
+      instrumentation off and on, and how its time splits between the
+      request (tester.request) and our own bookkeeping (tester.record)
+    Run with: python tests/bench_instrumentation.py [attempts]
+Author: William TenCate
+Email: wtencate@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import os
+import sys
+import time
+
+here = os.path.dirname(os.path.abspath(__file__))  # cd to this file
+sys.path.append(os.path.join(here, "..", "src"))  # let python find src modules
+
+from latency.latency_tester import LatencyTester
+from standin_server import StandInServer
+from latency_utils import instrumentation
+
+calls = 1_000_000
+
+
+def plain():
+    return None
+
+
+@instrumentation.timed("bench.call")
+def decorated():
+    return None
+
+
+def per_call_ns(function):
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def block_ns():
+    start = time.perf_counter()
+    for _ in range(calls):
+        with instrumentation.timer("bench.block"):
+            pass
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def session_seconds(url, attempts):
+    tester = LatencyTester(url, attempts=attempts, keep_results=False)
+    start = time.perf_counter()
+    tester.run_tests()
+    return time.perf_counter() - start
+
+
+def main():
+    attempts = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    baseline = per_call_ns(plain)
+    instrumentation.disable()
+    off = (per_call_ns(decorated), block_ns())
+    instrumentation.enable()
+    on = (per_call_ns(decorated), block_ns())
+    instrumentation.disable()
+    instrumentation.reset()
+
+    print(f"{'per call':<24}{'plain':>10}{'disabled':>10}{'enabled':>10}")
+    print(f"{'timed function (ns)':<24}{baseline:>10.0f}{off[0]:>10.0f}{on[0]:>10.0f}")
+    print(f"{'timer block (ns)':<24}{'':>10}{off[1]:>10.0f}{on[1]:>10.0f}")
+
+    with StandInServer() as server:
+        session_seconds(server.url, 20)  # warm up
+        disabled = min(session_seconds(server.url, attempts) for _ in range(3))
+        instrumentation.enable()
+        enabled = min(session_seconds(server.url, attempts) for _ in range(3))
+        timers = instrumentation.snapshot()["timers"]
+        instrumentation.disable()
+
+    request = timers["tester.request"]["mean_ms"]
+    record = timers["tester.record"]["mean_ms"]
+    print(f"\n{attempts} attempts against a local server (best of 3)")
+    print(f"    instrumentation off   {disabled:.3f} s")
+    print(f"    instrumentation on    {enabled:.3f} s  ({(enabled / disabled - 1) * 100:+.1f}%)")
+    print(f"    tester.request        {request:.4f} ms per attempt")
+    print(f"    tester.record         {record:.4f} ms per attempt ({record / request * 100:.2f}% of the request)")
+
+
+if __name__ == "__main__":
+    main()
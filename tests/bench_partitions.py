@@ -0,0 +1,69 @@
+"""
+File: bench_partitions.py
+Description: Partitioned results ingestion,
+    Writes hosts x days partitions of synthetic session rows, then times
+    per_url_statistics over
+        - one results.csv holding every row
+        - the partitions, aggregated in 1 process and in a pool
+        - the partitions with a one day time range (the rest pruned from
+          their metadata, never opened)
+    Run with: python tests/bench_partitions.py [rows per partition] [workers]
+Author: Johnathan Vu
+Email: jvu2@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+here = os.path.dirname(os.path.abspath(__file__))  # cd to this file
+sys.path.append(os.path.join(here, "..", "src"))  # let python find src modules
+
+import pandas as pd
+
+from latency_analysis.data_analyzer import DataAnalyzer
+from latency_analysis.partitions import append_partitioned_rows
+from bench_per_url_statistics import synthetic_results
+from latency_utils.io_utils import append_session_rows
+
+hosts = ["probe-a", "probe-b", "probe-c"]
+days = pd.date_range("2025-12-01", periods=7, freq="D")
+
+
+def seconds(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+
+    with tempfile.TemporaryDirectory() as folder:
+        root = os.path.join(folder, "partitions")
+        single = os.path.join(folder, "results.csv")
+        for i, (host, day) in enumerate((h, d) for h in hosts for d in days):
+            df = synthetic_results(rows, seed=i)
+            df["run_started_at"] = (day + pd.to_timedelta(range(rows), unit="s") * (86_399 // rows)).strftime("%Y-%m-%d %H:%M:%S")
+            records = df.to_dict("records")
+            append_partitioned_rows(records, root, host)
+            append_session_rows(records, single)
+        total = rows * len(hosts) * len(days)
+
+        print(f"{len(hosts)} hosts x {len(days)} days, {rows} rows each ({total} rows), {os.cpu_count()} CPUs")
+        print(f"    one file                {seconds(lambda: DataAnalyzer(single).per_url_statistics()):.3f} s")
+        print(f"    partitions, 1 process   {seconds(lambda: DataAnalyzer(partitions=root, workers=1).per_url_statistics()):.3f} s")
+        print(f"    partitions, {workers} workers  {seconds(lambda: DataAnalyzer(partitions=root, workers=workers).per_url_statistics()):.3f} s")
+
+        start, end = days[3], days[3] + pd.Timedelta(hours=23, minutes=59)
+        ranged = []
+        took = seconds(lambda: ranged.append(DataAnalyzer(partitions=root, start=start, end=end, workers=workers).per_url_statistics()))
+        print(f"    one day of {len(days)}          {took:.3f} s  ({len(hosts)} of {len(hosts) * len(days)} partitions opened)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+File: bench_per_url_statistics.py
+Description: Benchmark for DataAnalyzer.per_url_statistics,
+    Times the vectorized aggregation against the old lambda based one
+    on synthetic results frames of 10^4 to 10^7 rows and checks that
+    both give the same numbers.
+    Run with: python tests/bench_per_url_statistics.py [max_rows]
+Author: Johnathan Vu
+Email: jvu2@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+here = os.path.dirname(os.path.abspath(__file__))  # cd to this file
+sys.path.append(os.path.join(here, "..", "src"))  # let python find src modules
+
+from latency_analysis.data_analyzer import DataAnalyzer
+
+legacy_row_limit = 10**6  # the old version takes minutes past this, skip it
+
+
+def synthetic_results(rows, seed=551):
+    """
+    Fake results frame shaped like results.csv, ~10 sessions per URL.
+    """
+    rng = np.random.default_rng(seed)
+    urls = max(1, min(rows // 10, 100_000))
+    attempts = rng.integers(1, 20, rows)
+    successes = rng.binomial(attempts, 0.95)
+    low = rng.uniform(5, 100, rows).round(2)
+
+    return pd.DataFrame(
+        {
+            "run_started_at": "2025-12-01 10:00:00",
+            "label": rng.choice(["WIFI", "Wired", "School"], rows),
+            "url": pd.Series(rng.integers(0, urls, rows)).map("https://site{}.com".format),
+            "attempts": attempts,
+            "successes": successes,
+            "failures": attempts - successes,
+            "min_ms": low,
+            "max_ms": (low + rng.uniform(0, 200, rows)).round(2),
+            "avg_ms": (low + rng.uniform(0, 80, rows)).round(2),
+        }
+    )
+
+
+def legacy_per_url_statistics(stats):
+    """
+    The original per_url_statistics aggregation, kept to check equivalence.
+    """
+    per_url = stats.groupby("url").agg(
+        attempts_total = ("attempts", "sum"),
+        successes_total = ("successes", "sum"),
+        failures_total = ("failures", "sum"),
+        success_rate = ("successes", lambda x: x.sum() / stats.loc[x.index, "attempts"].sum() * 100),
+        failure_rate = ("failures", lambda x: x.sum() / stats.loc[x.index, "attempts"].sum() * 100),
+        min_latency_ms = ("min_ms", "min"),
+        max_latency_ms = ("max_ms", "max"),
+        avg_latency_ms = ("avg_ms", "mean"),
+        stddev_latency_ms = ("avg_ms", "std")
+    )
+    per_url["latency_range_ms"] = per_url["max_latency_ms"] - per_url["min_latency_ms"]
+    per_url["max_dev_from_avg"] = per_url["max_latency_ms"] - per_url["avg_latency_ms"]
+    per_url["cv_latency"] = (per_url["stddev_latency_ms"] / per_url["avg_latency_ms"]) * 100
+    per_url["cv_latency"] = per_url["cv_latency"].fillna(0).replace([float("inf"), -float("inf")], 0)
+    per_url["performance_score"] = (1000 / per_url["avg_latency_ms"]) * (per_url["successes_total"] / per_url["attempts_total"])
+    return per_url
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main(max_rows=10**7):
+    print(f"{'rows':>10} {'urls':>8} {'vectorized':>12} {'legacy':>12} {'speedup':>8}")
+
+    rows = 10**4
+    while rows <= max_rows:
+        df = synthetic_results(rows)
+        new, new_time = timed(DataAnalyzer(dataframe=df).per_url_statistics)
+
+        if rows <= legacy_row_limit:
+            old, old_time = timed(legacy_per_url_statistics, df)
+            pd.testing.assert_frame_equal(new, old, check_exact=False, rtol=1e-12)
+            legacy = f"{old_time:11.3f}s"
+            speedup = f"{old_time / new_time:7.1f}x"
+        else:
+            legacy = f"{'skipped':>12}"
+            speedup = f"{'-':>8}"
+
+        print(f"{rows:>10} {len(new):>8} {new_time:11.3f}s {legacy} {speedup}")
+        rows *= 10
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10**7)
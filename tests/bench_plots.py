@@ -0,0 +1,91 @@
+"""
+File: bench_plots.py
+Description: Benchmark for rendering the standard Plots charts,
+    Renders every chart headless to PNG for synthetic data with more and
+    more URLs, once the old way (one bar and one text artist per URL,
+    annotate in an iterrows loop) and once with Plots.render_all
+    (capped top/bottom bars, binned scatter, bar_label).
+    Run with: python tests/bench_plots.py [max_urls]
+Author: Johnathan Vu
+Email: jvu2@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")  # headless, nothing pops up while timing
+
+from matplotlib.figure import Figure
+
+here = os.path.dirname(os.path.abspath(__file__))  # cd to this file
+sys.path.append(os.path.join(here, "..", "src"))  # let python find src modules
+
+from latency_analysis.data_analyzer import DataAnalyzer
+from latency_analysis.plots import Plots
+from bench_per_url_statistics import synthetic_results
+
+legacy_url_limit = 2000  # the old charts take minutes past this, skip them
+bar_columns = ["success_rate", "avg_latency_ms", "latency_range_ms", "cv_latency", "performance_score"]
+
+
+def legacy_render_all(stats, folder):
+    """
+    The original chart code (one artist per URL), drawn on a headless Figure.
+    """
+    for column in bar_columns:
+        df = stats.sort_values(column, ascending=True)
+        values = df[column].values
+        fig = Figure(figsize=(12, max(4, len(df) * 0.5)))
+        ax = fig.add_subplot()
+        ax.barh(df.index, values)
+        for i, v in enumerate(values):
+            ax.text(v, i, f" {v:.2f}", va="center", fontsize=9)
+        ax.invert_yaxis()
+        fig.tight_layout()
+        fig.savefig(os.path.join(folder, f"{column}.png"))
+
+    fig = Figure(figsize=(10, 6))
+    ax = fig.add_subplot()
+    ax.scatter(stats["avg_latency_ms"], stats["performance_score"])
+    for url, row in stats.iterrows():
+        ax.annotate(url, (row["avg_latency_ms"], row["performance_score"]),
+                    textcoords="offset points", xytext=(5, 3), fontsize=8)
+    fig.tight_layout()
+    fig.savefig(os.path.join(folder, "performance_vs_latency.png"))
+
+
+def main(max_urls=100_000):
+    print(f"{'urls':>8} {'render_all':>12} {'legacy':>12} {'speedup':>8}")
+
+    urls = 100
+    while urls <= max_urls:
+        analyzer = DataAnalyzer(dataframe=synthetic_results(urls * 10))
+        plots = Plots(analyzer)  # stats computed here, not timed
+
+        with tempfile.TemporaryDirectory() as folder:
+            start = time.perf_counter()
+            plots.render_all(folder)
+            new_time = time.perf_counter() - start
+
+            if urls <= legacy_url_limit:
+                start = time.perf_counter()
+                legacy_render_all(plots.per_url_stats, folder)
+                old_time = time.perf_counter() - start
+                legacy = f"{old_time:11.2f}s"
+                speedup = f"{old_time / new_time:7.1f}x"
+            else:
+                legacy = f"{'skipped':>12}"
+                speedup = f"{'-':>8}"
+
+        print(f"{len(plots.per_url_stats):>8} {new_time:11.2f}s {legacy} {speedup}")
+        urls *= 10
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,66 @@
+"""
+File: bench_probe_farm.py
+Description: Benchmark for the multi-process probe farm,
+    Runs the same target list against a local multi-threaded stand-in
+    server with 1, 2, 4 ... workers and prints sessions/second, then
+    checks the results file has every session exactly once.
+    Scaling depends on free cores (the stand-in server shares them).
+    Run with: python tests/bench_probe_farm.py [max_workers]
+Author: William TenCate
+Email: wtencate@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+here = os.path.dirname(os.path.abspath(__file__))  # cd to this file
+sys.path.append(os.path.join(here, "..", "src"))  # let python find src modules
+
+from latency_monitor.farm import ProbeFarm
+from latency_monitor.scheduler import ProbeTarget
+from standin_server import StandInServer
+
+server_delay = 0.005  # 5 ms of fake server think time per request
+sessions = 800
+attempts = 5
+
+
+def bench_farm(url, workers):
+    targets = [ProbeTarget(url, label=f"S{i}", attempts=attempts) for i in range(sessions)]
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.csv")
+        farm = ProbeFarm(workers=workers, csv_file_path=path, max_in_flight=64, per_host=64)
+        start = time.perf_counter()
+        farm.run(targets)
+        elapsed = time.perf_counter() - start
+
+        # no duplicate or lost sessions
+        labels = pd.read_csv(path, usecols=["label"])["label"]
+        assert len(labels) == sessions and labels.is_unique
+
+    return sessions / elapsed
+
+
+def main(max_workers=None):
+    max_workers = max_workers or max(4, os.cpu_count() or 1)
+    with StandInServer(delay=server_delay) as server:
+        print(f"{sessions} sessions x {attempts} attempts, {server_delay * 1000:.0f} ms server delay, "
+              f"{os.cpu_count()} cores")
+        base = None
+        workers = 1
+        while workers <= max_workers:
+            rate = bench_farm(server.url, workers)
+            base = base or rate
+            print(f"workers={workers:<3} {rate:8.2f} sessions/s  ({rate / base:4.2f}x)")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else None)
@@ -0,0 +1,98 @@
+"""
+File: bench_result_storage.py
+Description: Benchmark for compact session result storage,
+    Stores a long soak session of attempts the old way (a list of Result
+    objects with a __dict__ each) and in a ResultList (column arrays),
+    and compares memory used and the time to get count/min/max/mean of
+    the successful attempts.
+    Run with: python tests/bench_result_storage.py [attempts]
+Author: William TenCate
+Email: wtencate@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np  # imported up front so ResultList.summary isn't timed with the import
+
+here = os.path.dirname(os.path.abspath(__file__))  # cd to this file
+sys.path.append(os.path.join(here, "..", "src"))  # let python find src modules
+
+from latency.result import Result, ResultList
+
+
+class LegacyResult:
+    """
+    Result the way it was before __slots__, one __dict__ per attempt.
+    """
+
+    def __init__(self, url, attempt, elapsed_ms, status_code, ok, reused=None, phases=None, timestamp=None):
+        self.url = url
+        self.attempt = attempt
+        self.elapsed_ms = elapsed_ms
+        self.status_code = status_code
+        self.ok = ok
+        self.reused = reused
+        self.phases = phases
+        self.timestamp = timestamp
+
+
+def legacy_summary(results):
+    # the old way: list comprehension + python min/max/sum
+    ok_ms = [r.elapsed_ms for r in results if r.ok]
+    return {"count": len(ok_ms), "min": min(ok_ms), "max": max(ok_ms), "mean": sum(ok_ms) / len(ok_ms)}
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    results = build()
+    build_time = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return results, size, build_time
+
+
+def main(attempts=1_000_000):
+    rng = random.Random(15)
+    samples = [(rng.uniform(5, 200), rng.random() > 0.01, time.time()) for _ in range(attempts)]
+    url = "https://example.com"
+
+    def build_legacy():
+        return [LegacyResult(url, i, ms, 200, ok, False, None, ts) for i, (ms, ok, ts) in enumerate(samples, 1)]
+
+    def build_slots():
+        return [Result(url, i, ms, 200, ok, False, None, ts) for i, (ms, ok, ts) in enumerate(samples, 1)]
+
+    def build_compact():
+        results = ResultList(url)
+        for i, (ms, ok, ts) in enumerate(samples, 1):
+            results.append(Result(url, i, ms, 200, ok, False, None, ts))
+        return results
+
+    print(f"{attempts} attempts")
+    print(f"{'storage':<20} {'memory':>10} {'bytes/attempt':>14} {'build':>8} {'summary':>9}")
+    baseline = None
+    for name, build, summarize in (
+        ("list of dict Result", build_legacy, legacy_summary),
+        ("list of __slots__", build_slots, legacy_summary),
+        ("ResultList", build_compact, ResultList.summary),
+    ):
+        results, size, build_time = measure(build)
+        start = time.perf_counter()
+        summary = summarize(results)
+        summary_time = time.perf_counter() - start
+
+        baseline = baseline or summary
+        assert summary["count"] == baseline["count"] and summary["max"] == baseline["max"]
+        print(f"{name:<20} {size / 2**20:8.1f}MB {size / attempts:14.1f} {build_time:7.2f}s {summary_time * 1000:7.1f}ms")
+        del results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
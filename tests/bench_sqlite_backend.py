@@ -0,0 +1,77 @@
+"""
+File: bench_sqlite_backend.py
+Description: Benchmark for the SQLite results backend against the csv,
+    For 10^4 up to 10^6 synthetic rows it times
+        - appending the rows in batches of 500 (one transaction each)
+        - a cold per_url_statistics (load + group for the csv, SQL for SQLite)
+        - a cold query(url=...) for one URL (index lookup in SQLite)
+    and checks both backends give the same per-URL numbers.
+    Run with: python tests/bench_sqlite_backend.py [max_rows]
+Author: William TenCate
+Email: wtencate@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from pandas.testing import assert_frame_equal
+
+here = os.path.dirname(os.path.abspath(__file__))  # cd to this file
+sys.path.append(os.path.join(here, "..", "src"))  # let python find src modules
+
+from latency_analysis.data_analyzer import DataAnalyzer
+from bench_per_url_statistics import synthetic_results
+from latency_utils.io_utils import open_backend
+
+batch_size = 500  # about what a ResultWriter flush holds
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def append_all(path, records):
+    backend = open_backend(path)
+    for start in range(0, len(records), batch_size):
+        backend.append_rows(records[start:start + batch_size])
+
+
+def bench(rows, folder):
+    records = synthetic_results(rows).to_dict("records")
+    url = records[0]["url"]
+    timings = {}
+
+    for name in ("results.csv", "results.db"):
+        path = os.path.join(folder, f"{rows}_{name}")
+        _, append_time = timed(append_all, path, records)
+        stats, stats_time = timed(lambda: DataAnalyzer(path).per_url_statistics())
+        subset, query_time = timed(lambda: DataAnalyzer(path).query(url=url))
+        timings[name] = (append_time, stats_time, query_time, stats, len(subset.data))
+
+    csv, db = timings["results.csv"], timings["results.db"]
+    assert_frame_equal(db[3].sort_index(), csv[3].sort_index(), check_dtype=False, rtol=1e-9)
+    assert db[4] == csv[4]
+    return csv[:3], db[:3]
+
+
+def main():
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10**6
+
+    print(f"{'rows':>9} {'backend':>8} {'append s':>10} {'per_url s':>10} {'query s':>10}")
+    with tempfile.TemporaryDirectory() as folder:
+        rows = 10**4
+        while rows <= max_rows:
+            csv, db = bench(rows, folder)
+            for name, (append_time, stats_time, query_time) in (("csv", csv), ("sqlite", db)):
+                print(f"{rows:>9} {name:>8} {append_time:>10.3f} {stats_time:>10.3f} {query_time:>10.3f}")
+            rows *= 10
+
+
+if __name__ == "__main__":
+    main()
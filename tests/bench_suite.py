@@ -0,0 +1,344 @@
+"""
+File: bench_suite.py
+Description: Reproducible benchmark suite with JSON baselines and regression gates,
+    Everything runs locally (stand-in HTTP / HTTPS server, synthetic
+    results files with fixed seeds), so no network is needed and two runs
+    on the same machine give comparable numbers.
+        probe.*     LatencyTester / async engine throughput and our own
+                    per-attempt overhead (wall time minus tester.request)
+        io.*        append_session_rows / read_latency_csv rows per second
+        analysis.*  cold DataAnalyzer.per_url_statistics
+        plots.*     Plots.render_all, headless
+    Run with:
+        python tests/bench_suite.py run [--output FILE] [--max-rows N] [--repeat N]
+        python tests/bench_suite.py compare BASELINE CURRENT [--threshold 0.2]
+        python tests/bench_suite.py check BASELINE [--threshold 0.2]   (run + compare)
+    compare / check exit 1 if any metric got worse than its baseline by more
+    than the threshold (0.2 = 20%), or is missing from a run that wasn't
+    narrowed down with --only.
+Author: William TenCate
+Email: wtencate@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+here = os.path.dirname(os.path.abspath(__file__))  # cd to this file
+sys.path.append(os.path.join(here, "..", "src"))  # let python find src modules
+
+from standin_server import StandInServer
+
+default_output = os.path.join(here, "baselines", "baseline.json")
+default_threshold = 0.2
+
+# the --only group each metric prefix comes from
+metric_groups = {"probe": "probe", "io": "io", "analysis": "io", "plots": "plots"}
+
+
+def best_of(repeat, function, *args):
+    """
+    Fastest of repeat runs, in seconds. The minimum is the least noisy
+    estimate on a busy machine, everything above it is interference.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def metric(value, unit, better, tolerance=None):
+    """
+    One measurement. tolerance: the slowdown this metric is allowed no
+    matter the threshold, for the ones that are noisy by nature
+    (anything going over the loopback network).
+    """
+    entry = {"value": value, "unit": unit, "better": better}
+    if tolerance is not None:
+        entry["tolerance"] = tolerance
+    return entry
+
+
+probe_tolerance = 0.35  # loopback + server threads on a shared CPU, run to run noise is ~15-20%
+
+
+def bench_probe(repeat, attempts=300):
+    """
+    Sequential sessions over http and https, and the async engine against a
+    server with a little latency and jitter.
+    """
+    from latency.async_tester import AsyncProbeEngine
+    from latency.latency_tester import LatencyTester
+    from latency_utils import instrumentation
+
+    metrics = {}
+
+    for scheme, tls in (("http", False), ("https", True)):
+        with StandInServer(tls=tls) as server:
+            context = server.client_context() if tls else None
+
+            def session():
+                # instrumented mode takes an ssl context, so https can trust the stand-in
+                tester = LatencyTester(
+                    server.url, attempts=attempts, instrumented=tls, ssl_context=context, keep_results=False
+                )
+                tester.run_tests()
+
+            session()  # warm up
+            instrumentation.reset()
+            instrumentation.enable()
+            try:
+                runs = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    session()
+                    runs.append(time.perf_counter() - start)
+                request = instrumentation.snapshot()["timers"]["tester.request"]
+            finally:
+                instrumentation.disable()
+                instrumentation.reset()
+
+        metrics[f"probe.{scheme}.attempts_per_s"] = metric(attempts / min(runs), "attempts/s", "higher", probe_tolerance)
+        # everything but the request itself: our loop, Result building, record()
+        overhead_ms = (sum(runs) - request["total_s"]) / request["count"] * 1000
+        metrics[f"probe.{scheme}.overhead_ms"] = metric(overhead_ms, "ms/attempt", "lower", probe_tolerance)
+
+    with StandInServer(delay=0.005, jitter=0.002, seed=24) as server:
+        testers = [LatencyTester(server.url, attempts=attempts // 10, keep_results=False) for _ in range(10)]
+        engine = AsyncProbeEngine(max_in_flight=50, per_host=50)
+        seconds = best_of(repeat, engine.run, testers)
+    metrics["probe.async.attempts_per_s"] = metric(attempts / seconds, "attempts/s", "higher", probe_tolerance)
+
+    return metrics
+
+
+def _sizes(max_rows):
+    sizes = []
+    rows = 10**3
+    while rows <= max_rows:
+        sizes.append(rows)
+        rows *= 10
+    return sizes
+
+
+def bench_io_and_analysis(repeat, max_rows, folder):
+    """
+    Append / read throughput and per-URL aggregation time for results files
+    of 10^3 rows up to max_rows.
+    """
+    from latency_analysis.data_analyzer import DataAnalyzer
+    from bench_per_url_statistics import synthetic_results
+    from latency_utils.io_utils import append_session_rows, read_latency_csv
+
+    batch = 10**5  # rows generated (untimed) and appended at a time
+    metrics = {}
+
+    for rows in _sizes(max_rows):
+        path = os.path.join(folder, f"results_{rows}.csv")
+
+        def append_all():
+            if os.path.exists(path):
+                os.remove(path)
+            written = 0
+            for start in range(0, rows, batch):
+                records = synthetic_results(min(batch, rows - start), seed=start).to_dict("records")
+                begin = time.perf_counter()
+                written += append_session_rows(records, path)
+                timings.append(time.perf_counter() - begin)
+            return written
+
+        best = None
+        for _ in range(repeat):
+            timings = []
+            written = append_all()
+            best = sum(timings) if best is None else min(best, sum(timings))
+        metrics[f"io.append_rows_per_s@{rows}"] = metric(written / best, "rows/s", "higher")
+
+        seconds = best_of(repeat, read_latency_csv, path)
+        metrics[f"io.read_rows_per_s@{rows}"] = metric(written / seconds, "rows/s", "higher")
+
+        seconds = best_of(repeat, lambda: DataAnalyzer(path).per_url_statistics())
+        metrics[f"analysis.per_url_s@{rows}"] = metric(seconds, "s", "lower")
+
+    return metrics
+
+
+def bench_plots(repeat, folder, rows=10**4):
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+    from latency_analysis.data_analyzer import DataAnalyzer
+    from latency_analysis.plots import Plots
+    from bench_per_url_statistics import synthetic_results
+
+    path = os.path.join(folder, "plots_results.csv")
+    synthetic_results(rows).to_csv(path, index=False)
+    analyzer = DataAnalyzer(path)
+    analyzer.per_url_statistics()  # stats are cached, this times the drawing
+
+    output_dir = os.path.join(folder, "plots")
+    seconds = best_of(repeat, lambda: Plots(analyzer, output_dir=output_dir).render_all())
+    return {f"plots.render_all_s@{rows}": metric(seconds, "s", "lower")}
+
+
+def run_suite(max_rows=10**5, repeat=3, include=("probe", "io", "plots")):
+    """
+    Run the benchmarks, returns the results document (see save_results).
+    """
+    metrics = {}
+    with tempfile.TemporaryDirectory() as folder:
+        if "probe" in include:
+            metrics.update(bench_probe(repeat))
+        if "io" in include:
+            metrics.update(bench_io_and_analysis(repeat, max_rows, folder))
+        if "plots" in include:
+            metrics.update(bench_plots(repeat, folder))
+
+    return {
+        "created": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "settings": {"max_rows": max_rows, "repeat": repeat, "include": list(include)},
+        "metrics": metrics,
+    }
+
+
+def save_results(results, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
+    return path
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, current, threshold=default_threshold):
+    """
+    Compare two results documents metric by metric.
+    Returns a list of (name, baseline value, current value, change, status),
+    change is the fraction it got worse by (negative = better) and status is
+    one of ok / improved / regressed / missing (not in current) / skipped
+    (not in current, its group was left out with --only) / new.
+    A metric's own tolerance (from the baseline) wins if it's bigger than threshold.
+    """
+    old = baseline["metrics"]
+    new = current["metrics"]
+    # what the current run included, None = everything (saved before settings existed)
+    include = current.get("settings", {}).get("include")
+    report = []
+
+    for name in sorted(set(old) | set(new)):
+        if name not in new:
+            skipped = include is not None and metric_groups.get(name.split(".")[0]) not in include
+            report.append((name, old[name]["value"], None, None, "skipped" if skipped else "missing"))
+            continue
+        if name not in old:
+            report.append((name, None, new[name]["value"], None, "new"))
+            continue
+
+        before = old[name]["value"]
+        after = new[name]["value"]
+        if before == 0:
+            change = 0.0 if after == 0 else float("inf")
+        elif new[name]["better"] == "higher":
+            change = (before - after) / before  # lost throughput
+        else:
+            change = (after - before) / before  # more time
+
+        allowed = max(threshold, old[name].get("tolerance", 0.0))
+        if change > allowed:
+            status = "regressed"
+        elif change < -allowed:
+            status = "improved"
+        else:
+            status = "ok"
+        report.append((name, before, after, change, status))
+
+    return report
+
+
+def print_report(report, threshold):
+    print(f"{'metric':<34}{'baseline':>14}{'current':>14}{'worse by':>10}  status")
+    for name, before, after, change, status in report:
+        before = "-" if before is None else f"{before:.4g}"
+        after = "-" if after is None else f"{after:.4g}"
+        change = "-" if change is None else f"{change * 100:+.1f}%"
+        print(f"{name:<34}{before:>14}{after:>14}{change:>10}  {status}")
+
+    regressed = [row[0] for row in report if row[4] == "regressed"]
+    missing = [row[0] for row in report if row[4] == "missing"]
+    if regressed:
+        print(f"\nFAIL: {len(regressed)} metric(s) regressed by more than {threshold * 100:.0f}%")
+    if missing:
+        # a benchmark that stopped producing its metric can't be let through
+        print(f"\nFAIL: {len(missing)} metric(s) missing from the run: {', '.join(missing)}")
+    if regressed or missing:
+        return 1
+    print(f"\nOK: nothing regressed by more than {threshold * 100:.0f}%")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Python Latency Analyzer benchmark suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    running = argparse.ArgumentParser(add_help=False)
+    running.add_argument("--max-rows", type=int, default=10**5, help="largest results file (up to 10000000)")
+    running.add_argument("--repeat", type=int, default=3, help="runs per benchmark, the best one counts")
+    running.add_argument("--only", choices=["probe", "io", "plots"], action="append", default=None)
+
+    gate = argparse.ArgumentParser(add_help=False)
+    gate.add_argument("--threshold", type=float, default=default_threshold, help="allowed slowdown (0.2 = 20%%)")
+
+    p = commands.add_parser("run", parents=[running], help="run the suite and save the results")
+    p.add_argument("--output", default=default_output)
+
+    p = commands.add_parser("compare", parents=[gate], help="compare two saved results")
+    p.add_argument("baseline")
+    p.add_argument("current")
+
+    p = commands.add_parser("check", parents=[running, gate], help="run the suite and compare it to a baseline")
+    p.add_argument("baseline")
+    p.add_argument("--output", default=None, help="also save this run")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        return print_report(compare(load_results(args.baseline), load_results(args.current), args.threshold), args.threshold)
+
+    baseline = load_results(args.baseline) if args.command == "check" else None
+    # a check runs what the baseline has, unless told otherwise
+    include = args.only or (baseline["settings"]["include"] if baseline else ["probe", "io", "plots"])
+    max_rows = baseline["settings"]["max_rows"] if baseline and args.max_rows == 10**5 else args.max_rows
+
+    results = run_suite(max_rows=max_rows, repeat=args.repeat, include=include)
+    if args.output:
+        print(f"results saved to {save_results(results, args.output)}\n")
+
+    if baseline is None:
+        for name, value in results["metrics"].items():
+            print(f"{name:<34}{value['value']:>14.4g} {value['unit']}")
+        return 0
+    return print_report(compare(baseline, results, args.threshold), args.threshold)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""
+File: standin_server.py
+Description: Local stand-in HTTP server for tests and benchmarks,
+    so latency tests don't need network access or hit real sites.
+    Runs a threaded http.server in the background on 127.0.0.1.
+Author: William TenCate
+Email: wtencate@stevens.edu
+Created: 10/18/26
+Last Edited: 10/18/26
+"""
+
+import os
+import random
+import ssl
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+here = os.path.dirname(os.path.abspath(__file__))
+# self-signed cert for localhost / 127.0.0.1 used by the HTTPS stand-in
+cert_file = os.path.join(here, "certs", "localhost.pem")
+key_file = os.path.join(here, "certs", "localhost.key")
+
+
+class _StandInHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # default of 5 refuses connections under load
+    tls_context = None
+
+    def finish_request(self, request, client_address):
+        # TLS handshake happens here, in the handler thread, not in the accept loop
+        if self.tls_context is not None:
+            try:
+                request = self.tls_context.wrap_socket(request, server_side=True)
+            except (ssl.SSLError, OSError):
+                return  # client gave up / didn't trust us
+        super().finish_request(request, client_address)
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive so pooled clients can reuse sockets
+
+    def do_GET(self):
+        server = self.server
+        config = server.config
+
+        # track how many requests are being handled at the same time
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            server.requests_seen += 1
+
+        try:
+            # an injected stall holds every request until it's over (like a GC pause)
+            now = time.monotonic()
+            stalled = server.stall_until - now
+            if config["stall_every"]:
+                # periodic stalls: the first stall_for seconds of every stall_every seconds
+                phase = (now - server.started_at) % config["stall_every"]
+                if phase < config["stall_for"]:
+                    stalled = max(stalled, config["stall_for"] - phase)
+            if stalled > 0:
+                time.sleep(stalled)
+
+            with server.lock:
+                extra = server.rng.uniform(0, config["jitter"]) if config["jitter"] else 0.0
+                failed = config["error_rate"] and server.rng.random() < config["error_rate"]
+            if config["delay"] + extra > 0:
+                time.sleep(config["delay"] + extra)
+
+            if failed and config["error_status"] is None:
+                self.close_connection = True  # hang up without answering, a connection error for the client
+                return
+
+            body = config["body"]
+            self.send_response(config["error_status"] if failed else config["status"])
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # client timed out while we were stalled / sleeping
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, format, *args):  # keep test output quiet
+        pass
+
+
+class StandInServer:
+    """
+    Background HTTP server used as a stand-in for real URLs.
+        delay: seconds the server sleeps before answering each request
+        status: status code returned for every request
+        body: bytes sent back as the response body
+        tls: serve HTTPS with the self-signed cert in tests/certs
+        jitter: up to this many extra seconds on top of delay (uniform)
+        error_rate: fraction of requests answered with error_status instead
+            (error_status=None hangs up without answering)
+        stall_every / stall_for: stop answering for stall_for seconds at the
+            start of every stall_every seconds (see also stall())
+        seed: seed for the jitter / errors, so a run can be repeated
+
+    Use as a context manager:
+        with StandInServer(delay=0.01) as server:
+            tester = LatencyTester(server.url, attempts=3)
+    """
+
+    def __init__(
+        self,
+        delay=0.0,
+        status=200,
+        body=b"ok",
+        tls=False,
+        jitter=0.0,
+        error_rate=0.0,
+        error_status=503,
+        stall_every=None,
+        stall_for=0.0,
+        seed=None,
+    ):
+        self.httpd = _StandInHTTPServer(("127.0.0.1", 0), _StandInHandler)
+        self.tls = tls
+        if tls:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(cert_file, key_file)
+            self.httpd.tls_context = context
+        self.httpd.config = {
+            "delay": delay,
+            "status": status,
+            "body": body,
+            "jitter": jitter,
+            "error_rate": error_rate,
+            "error_status": error_status,
+            "stall_every": stall_every,
+            "stall_for": stall_for,
+        }
+        self.httpd.rng = random.Random(seed)
+        self.httpd.lock = threading.Lock()
+        self.httpd.in_flight = 0
+        self.httpd.max_in_flight = 0  # peak concurrent requests seen
+        self.httpd.requests_seen = 0
+        self.httpd.stall_until = 0.0  # time.monotonic() the current stall ends at
+        self.httpd.started_at = time.monotonic()
+        self.thread = None
+
+    @property
+    def port(self):
+        return self.httpd.server_address[1]
+
+    @property
+    def url(self):
+        scheme = "https" if self.tls else "http"
+        return f"{scheme}://127.0.0.1:{self.port}/"
+
+    def client_context(self):
+        """
+        SSL context that trusts the stand-in's self-signed cert.
+        """
+        return ssl.create_default_context(cafile=cert_file)
+
+    @property
+    def max_in_flight(self):
+        return self.httpd.max_in_flight
+
+    @property
+    def requests_seen(self):
+        return self.httpd.requests_seen
+
+    def stall(self, seconds):
+        """
+        Stop answering for the next `seconds`: every request that arrives
+        meanwhile is held until the stall is over.
+        """
+        self.httpd.stall_until = time.monotonic() + seconds
+
+    def stall_later(self, after, seconds):
+        """
+        Start a stall `after` seconds from now, in the background.
+        """
+        timer = threading.Timer(after, self.stall, (seconds,))
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    def start(self):
+        self.httpd.started_at = time.monotonic()
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
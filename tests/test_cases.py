@@ -20,26 +20,34 @@ sys.path.append(src_path)  # let python search for modules inside of src folder.
 
 
 from latency.latency_tester import LatencyTester
-from analysis.data_analyzer import DataAnalyzer
+from latency_analysis.data_analyzer import DataAnalyzer
 
 
 def test_real_url():
-    tester = LatencyTester("https://www.google.com", attempts=2)
-    tester.run_tests()
+    from standin_server import StandInServer
+
+    with StandInServer() as server:
+        tester = LatencyTester(server.url, attempts=2)
+        tester.run_tests()
     session = tester.create_session_row()
 
-    assert session["url"] == "https://www.google.com"
+    assert session["url"] == server.url
     assert session["attempts"] == 2
     assert session["successes"] == 2
     assert session["failures"] == 0
 
 
 def test_fake_url():
-    tester = LatencyTester("https://shflksdjflks.com", attempts=2)
+    from standin_server import StandInServer
+
+    with StandInServer() as server:
+        url = server.url
+    # the server is gone, nothing listens on its port anymore
+    tester = LatencyTester(url, attempts=2, timeout=1)
     tester.run_tests()
     session = tester.create_session_row()
 
-    assert session["url"] == "https://shflksdjflks.com"
+    assert session["url"] == url
     assert session["attempts"] == 2
     assert session["successes"] == 0
     assert session["failures"] == 2
@@ -56,4 +64,1920 @@ def test_empty_file():
         with pytest.raises(ValueError):
             DataAnalyzer(path)
     finally:
-        os.remove(path)
\ No newline at end of file
+        os.remove(path)
+
+def test_async_engine_matches_serial_rows():
+    from latency.async_tester import run_sessions
+    from standin_server import StandInServer
+
+    with StandInServer() as server:
+        serial = LatencyTester(server.url, attempts=3, label="Local")
+        serial.run_tests()
+
+        concurrent = [LatencyTester(server.url, attempts=3, label="Local") for _ in range(4)]
+        run_sessions(concurrent, max_in_flight=8, per_host=4)
+
+    expected = serial.create_session_row()
+    for tester in concurrent:
+        row = tester.create_session_row()
+        assert row.keys() == expected.keys()
+        assert [r.attempt for r in tester.results] == [1, 2, 3]
+        assert row["successes"] == 3
+        assert row["failures"] == 0
+
+
+def test_async_engine_respects_per_host_limit():
+    from latency.async_tester import run_sessions
+    from standin_server import StandInServer
+
+    with StandInServer(delay=0.05) as server:
+        testers = [LatencyTester(server.url, attempts=4) for _ in range(3)]
+        run_sessions(testers, max_in_flight=10, per_host=2)
+
+        assert server.requests_seen == 12
+        assert server.max_in_flight <= 2
+
+
+def test_async_engine_failure_is_recorded():
+    from latency.async_tester import run_sessions
+
+    tester = LatencyTester("http://127.0.0.1:9/", attempts=2, timeout=1)
+    run_sessions([tester])
+    row = tester.create_session_row()
+
+    assert row["successes"] == 0
+    assert row["failures"] == 2
+
+
+def test_pooled_mode_reuses_connections():
+    from latency import connection_pool
+    from standin_server import StandInServer
+
+    connection_pool.close_shared_session()  # start cold
+    try:
+        with StandInServer() as server:
+            first = LatencyTester(server.url, attempts=3, pooled=True)
+            first.run_tests()
+            second = LatencyTester(server.url, attempts=2, pooled=True)
+            second.run_tests()
+    finally:
+        connection_pool.close_shared_session()
+
+    assert [r.reused for r in first.results] == [False, True, True]
+    # the pool is shared across testers, so the second one starts warm
+    assert [r.reused for r in second.results] == [True, True]
+
+    row = first.create_session_row()
+    assert row["cold_avg_ms"] == round(first.results[0].elapsed_ms, 2)
+    assert row["warm_avg_ms"] is not None
+    assert second.create_session_row()["cold_avg_ms"] is None
+
+
+def test_pooled_reuse_ignores_other_hosts_pools():
+    from latency import connection_pool
+    from standin_server import StandInServer
+
+    connection_pool.close_shared_session()
+    try:
+        with StandInServer() as a, StandInServer() as b:
+            warm = LatencyTester(a.url, attempts=1, pooled=True)
+            warm.run_tests()
+            session = connection_pool.shared_session()
+            pool = connection_pool.pool_for(session, a.url)
+            before = connection_pool.new_connections(pool, a.url)
+            # a cold connection to another host opens while a stays warm
+            LatencyTester(b.url, attempts=1, pooled=True).run_tests()
+            assert connection_pool.new_connections(pool, a.url) == before
+            assert connection_pool.new_connections(pool) == before + 1
+
+            again = LatencyTester(a.url, attempts=1, pooled=True)
+            again.run_tests()
+    finally:
+        connection_pool.close_shared_session()
+
+    assert [r.reused for r in again.results] == [True]
+
+
+def test_async_engine_rejects_pooled_and_instrumented_testers():
+    from latency.async_tester import run_sessions
+
+    with pytest.raises(ValueError, match="run_tests"):
+        run_sessions([LatencyTester("http://127.0.0.1:9/", attempts=1, pooled=True)])
+    with pytest.raises(ValueError, match="run_tests"):
+        run_sessions([LatencyTester("http://127.0.0.1:9/", attempts=1, instrumented=True)])
+
+
+def test_unpooled_row_has_no_cold_warm_columns():
+    from standin_server import StandInServer
+
+    with StandInServer() as server:
+        tester = LatencyTester(server.url, attempts=2)
+        tester.run_tests()
+
+    assert all(r.reused is False for r in tester.results)
+    assert "cold_avg_ms" not in tester.create_session_row()
+
+
+def test_append_widens_existing_header():
+    from latency_utils.io_utils import append_session_row, read_latency_csv
+
+    base = {"run_started_at": "2025-12-01 10:00:00", "label": "A", "url": "https://a.com",
+            "attempts": 2, "successes": 2, "failures": 0,
+            "min_ms": 1.0, "max_ms": 2.0, "avg_ms": 1.5}
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.csv")
+        append_session_row(base, path)
+        append_session_row(dict(base, cold_avg_ms=2.0, warm_avg_ms=1.0), path)
+
+        df = read_latency_csv(path)
+
+    assert list(df.columns[-2:]) == ["cold_avg_ms", "warm_avg_ms"]
+    assert len(df) == 2
+    assert df["warm_avg_ms"].isna().tolist() == [True, False]
+
+
+def test_instrumented_phases_http():
+    from latency.probe import phase_columns
+    from standin_server import StandInServer
+
+    with StandInServer(delay=0.02) as server:
+        tester = LatencyTester(server.url, attempts=2, instrumented=True)
+        tester.run_tests()
+
+    row = tester.create_session_row()
+    assert row["successes"] == 2
+    for result in tester.results:
+        assert set(result.phases) == set(phase_columns)
+        assert result.phases["tls_ms"] == 0  # plain http, no handshake
+        assert result.phases["ttfb_ms"] >= 20  # server sleeps before answering
+        assert sum(result.phases.values()) <= result.elapsed_ms
+    assert row["ttfb_ms"] >= 20
+
+
+def test_instrumented_phases_https_self_signed():
+    from standin_server import StandInServer
+
+    with StandInServer(tls=True) as server:
+        trusted = LatencyTester(server.url, attempts=2, instrumented=True,
+                                ssl_context=server.client_context())
+        trusted.run_tests()
+        # default context doesn't trust the self-signed cert, so it has to fail
+        untrusted = LatencyTester(server.url, attempts=1, instrumented=True)
+        untrusted.run_tests()
+
+    assert trusted.create_session_row()["successes"] == 2
+    assert all(r.phases["tls_ms"] > 0 for r in trusted.results)
+    assert untrusted.create_session_row()["successes"] == 0
+
+
+def test_phase_columns_flow_to_per_url_statistics():
+    from latency_utils.io_utils import append_session_row
+
+    rows = [
+        {"run_started_at": "2025-12-01 10:00:00", "label": "A", "url": "https://a.com",
+         "attempts": 2, "successes": 2, "failures": 0, "min_ms": 1.0, "max_ms": 3.0,
+         "avg_ms": 2.0, "dns_ms": 1.0, "connect_ms": 2.0, "tls_ms": 3.0,
+         "ttfb_ms": 4.0, "body_ms": 5.0},
+        {"run_started_at": "2025-12-01 11:00:00", "label": "A", "url": "https://a.com",
+         "attempts": 2, "successes": 2, "failures": 0, "min_ms": 1.0, "max_ms": 3.0,
+         "avg_ms": 2.0, "dns_ms": 3.0, "connect_ms": 2.0, "tls_ms": 3.0,
+         "ttfb_ms": 4.0, "body_ms": 5.0},
+    ]
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.csv")
+        for row in rows:
+            append_session_row(row, path)
+        stats = DataAnalyzer(path).per_url_statistics()
+
+    assert stats.loc["https://a.com", "avg_dns_ms"] == 2.0
+    assert stats.loc["https://a.com", "avg_ttfb_ms"] == 4.0
+
+
+def test_sample_store_round_trip_and_percentiles():
+    from latency.result import Result
+    from latency_utils.sample_store import SampleStore, sample_dtype
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "samples.bin")
+        store = SampleStore(path)
+        a = [Result("https://a.com", i, float(i), 200, True, timestamp=1000.0 + i)
+             for i in range(1, 101)]
+        b = [Result("https://b.com", 1, 5.0, 200, True),
+             Result("https://b.com", 2, 30.0, None, False)]
+        store.append(a, "WIFI")
+        store.append(b, "Wired")
+
+        # 24 byte fixed records, urls/labels only stored once in the ids file
+        assert os.path.getsize(path) == 102 * sample_dtype.itemsize == 102 * 24
+
+        records = SampleStore(path).load()
+        assert records.shape == (102,)
+        assert records["status"][-1] == 0 and records["ok"][-1] == 0
+
+        analyzer = DataAnalyzer(dataframe=SampleStore(path).to_dataframe())
+        stats = analyzer.sample_statistics(path)
+
+    assert stats.loc["https://a.com", "samples"] == 100
+    assert stats.loc["https://a.com", "p50_ms"] == 50.5
+    assert stats.loc["https://a.com", "p99_ms"] == pytest.approx(99.01)
+    assert stats.loc["https://b.com", "success_rate"] == 50
+    assert stats.loc["https://b.com", "max_latency_ms"] == 5.0  # failure not counted
+
+
+def test_sample_store_ignores_torn_record():
+    from latency.result import Result
+    from latency_utils.sample_store import SampleStore
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "samples.bin")
+        SampleStore(path).append([Result("https://a.com", 1, 1.0, 200, True)], "A")
+        with open(path, "ab") as f:
+            f.write(b"\x00" * 10)  # half a record, like a crash mid-write
+
+        assert len(SampleStore(path).load()) == 1
+
+        # the next append cuts the torn bytes off instead of shifting everything after them
+        SampleStore(path).append([Result("https://a.com", 2, 2.0, 200, True)], "A")
+        records = SampleStore(path).load()
+        assert list(records["elapsed_ms"]) == [1.0, 2.0]
+        assert list(records["status"]) == [200, 200]
+
+
+def test_sample_store_writers_share_url_codes():
+    from latency.result import Result
+    from latency_utils.sample_store import SampleStore
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "samples.bin")
+        daemon = SampleStore(path)  # stays open, like the daemon's
+        daemon.append([Result("https://a.com", 1, 1.0, 200, True)], "A")
+        SampleStore(path).append([Result("https://b.com", 1, 2.0, 200, True)], "B")  # a probe run
+        daemon.append([Result("https://c.com", 1, 3.0, 200, True)], "A")
+
+        samples = SampleStore(path).to_dataframe()
+        assert list(samples["url"]) == ["https://a.com", "https://b.com", "https://c.com"]
+        assert list(samples["label"]) == ["A", "B", "A"]
+
+
+def test_sample_store_load_never_sees_samples_without_ids():
+    from latency.result import Result
+    from latency_utils.sample_store import SampleStore
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "samples.bin")
+        SampleStore(path).append([Result("https://a.com", 1, 1.0, 200, True)], "A")
+        reader = SampleStore(path)
+        load_ids = reader._load_ids
+
+        def load_ids_then_race():
+            load_ids()
+            # another process appends a new url right after the ids were read
+            SampleStore(path).append([Result("https://b.com", 1, 2.0, 200, True)], "B")
+
+        reader._load_ids = load_ids_then_race
+        samples = reader.to_dataframe()
+
+    assert list(samples["url"]) == ["https://a.com"]
+
+
+def test_write_atomic_keeps_old_file_on_error():
+    from latency_utils.io_utils import write_atomic
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "state.json")
+        with write_atomic(path) as f:
+            f.write("old")
+        with pytest.raises(RuntimeError):
+            with write_atomic(path) as f:
+                f.write("half")
+                raise RuntimeError("crash")
+
+        with open(path) as f:
+            assert f.read() == "old"
+        assert os.listdir(folder) == ["state.json"]
+
+
+def test_sketch_quantiles_and_merge():
+    import random
+    from latency.sketch import LatencySketch
+
+    rng = random.Random(551)
+    values = [rng.lognormvariate(3, 1) for _ in range(20000)]
+    halves = [LatencySketch(), LatencySketch()]
+    for i, v in enumerate(values):
+        halves[i % 2].add(v)
+
+    merged = LatencySketch.from_string(halves[0].to_string()).merge(halves[1])
+    values.sort()
+    for q in (0.5, 0.9, 0.99, 0.999):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(merged.quantile(q) - exact) <= 0.02 * exact
+    assert merged.count == 20000
+    assert len(merged.bins) <= merged.max_bins
+
+
+def test_sketch_memory_is_bounded():
+    from latency.sketch import LatencySketch
+
+    sketch = LatencySketch(max_bins=64)
+    for i in range(1, 100000):
+        sketch.add(i * 0.37)
+
+    assert len(sketch.bins) == 64
+    # collapsing only touches the low end, the tail stays accurate
+    assert abs(sketch.quantile(0.99) - 99000 * 0.37) <= 0.02 * 99000 * 0.37
+
+
+def test_session_sketch_percentiles_per_url_and_label():
+    from latency.result import Result
+    from latency_utils.io_utils import append_session_row
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.csv")
+        for label, values in (("WIFI", range(1, 51)), ("Wired", range(51, 101))):
+            tester = LatencyTester("https://a.com", attempts=50, label=label,
+                                   keep_results=False)
+            for i, v in enumerate(values, start=1):
+                tester.record(Result("https://a.com", i, float(v), 200, True))
+            assert len(tester.results) == 0  # nothing retained
+            append_session_row(tester.create_session_row(), path)
+
+        analyzer = DataAnalyzer(path)
+        per_url = analyzer.per_url_statistics()
+        per_label = analyzer.percentile_statistics(by="label")
+
+    assert per_url.loc["https://a.com", "p50_ms"] == pytest.approx(50, rel=0.02)
+    assert per_url.loc["https://a.com", "p99_ms"] == pytest.approx(99, rel=0.02)
+    assert per_label.loc["WIFI", "p90_ms"] == pytest.approx(45, rel=0.02)
+    assert per_label.loc["Wired", "p999_ms"] == pytest.approx(100, rel=0.02)
+
+
+class FakeClock:
+    """
+    Clock for the daemon tests, sleeping just moves time forward.
+    """
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_scheduler_spreads_and_jitters_targets():
+    import random
+    from latency_monitor.scheduler import ProbeScheduler, ProbeTarget
+
+    scheduler = ProbeScheduler(jitter=0.1, rng=random.Random(1))
+    for i in range(1000):
+        scheduler.add(ProbeTarget(f"https://site{i}.com", interval=60), now=0)
+
+    # first runs are spread over the whole interval, not all at t=0
+    assert 400 < len(scheduler.pop_due(30)) < 600
+    scheduler.pop_due(60)
+    assert len(scheduler) == 0
+
+    target = ProbeTarget("https://a.com", interval=60)
+    for _ in range(200):
+        scheduler.reschedule(target, now=100)
+        assert 154 <= scheduler.next_due() <= 166
+        scheduler.pop_due(1000)
+
+
+def test_daemon_probes_on_schedule_and_flushes_batches():
+    import random
+    from latency_monitor.daemon import MonitorDaemon
+    from latency_monitor.scheduler import ProbeTarget
+    from standin_server import StandInServer
+
+    clock = FakeClock()
+    with StandInServer() as server, tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.csv")
+        targets = [ProbeTarget(server.url, label=f"T{i}", interval=60, attempts=2)
+                   for i in range(3)]
+        daemon = MonitorDaemon(targets, csv_file_path=path, batch_size=4,
+                               flush_interval=1000, clock=clock, sleep=clock.sleep,
+                               rng=random.Random(2))
+        daemon.run(until=600)
+
+        df = DataAnalyzer(path).data
+
+    # ~10 sessions per target over 600s of fake time, every one written
+    assert 25 <= daemon.sessions_run <= 36
+    assert len(df) == daemon.rows_written == daemon.sessions_run
+    assert set(df["label"]) == {"T0", "T1", "T2"}
+    assert (df["successes"] == 2).all()
+
+
+def test_daemon_sigterm_flushes_buffered_rows():
+    import signal
+    from latency_monitor.daemon import MonitorDaemon, load_targets
+
+    clock = FakeClock()
+
+    def fake_probe(testers):
+        from latency.result import Result
+        for tester in testers:
+            tester.record(Result(tester.url, 1, 12.5, 200, True))
+        if daemon.sessions_run + len(testers) >= 5:
+            os.kill(os.getpid(), signal.SIGTERM)
+
+    with tempfile.TemporaryDirectory() as folder:
+        targets_path = os.path.join(folder, "targets.csv")
+        with open(targets_path, "w") as f:
+            f.write("url,label,interval,attempts\nhttps://a.com,WIFI,10,1\n")
+        path = os.path.join(folder, "results.csv")
+
+        daemon = MonitorDaemon(load_targets(targets_path), csv_file_path=path,
+                               batch_size=1000, flush_interval=10**6,
+                               clock=clock, sleep=clock.sleep, probe=fake_probe)
+        old_handler = signal.getsignal(signal.SIGTERM)
+        daemon.install_signal_handlers()
+        try:
+            daemon.run()
+        finally:
+            signal.signal(signal.SIGTERM, old_handler)
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+
+        # nothing hit the batch size, so everything was written on shutdown
+        assert daemon.stopping
+        assert len(DataAnalyzer(path).data) == daemon.sessions_run == 5
+
+
+def test_daemon_slow_target_does_not_hold_up_the_others():
+    import threading
+    import time
+    from latency.result import Result
+    from latency_monitor.daemon import MonitorDaemon
+    from latency_monitor.scheduler import ProbeTarget
+
+    fast_runs = []
+    slow_done = threading.Event()
+
+    def fake_probe(testers):
+        for tester in testers:
+            if tester.url == "https://slow.com":
+                time.sleep(0.5)  # one session of a target that barely answers
+                slow_done.set()
+            elif not slow_done.is_set():
+                fast_runs.append(time.monotonic())
+            tester.record(Result(tester.url, 1, 12.5, 200, True))
+
+    with tempfile.TemporaryDirectory() as folder:
+        targets = [ProbeTarget("https://slow.com", interval=0.01, attempts=1),
+                   ProbeTarget("https://fast.com", interval=0.02, attempts=1)]
+        daemon = MonitorDaemon(targets, csv_file_path=os.path.join(folder, "results.csv"),
+                               jitter=0, probe=fake_probe)
+        daemon.run(until=time.monotonic() + 0.6)
+
+    # the fast target kept its own 20 ms schedule while the slow one was stuck
+    assert slow_done.is_set()
+    assert len(fast_runs) >= 10
+    assert daemon.rows_written == daemon.sessions_run
+
+
+def test_load_targets_reports_bad_line():
+    from latency_monitor.daemon import load_targets
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "targets.csv")
+        with open(path, "w") as f:
+            f.write("url,interval\nhttps://a.com,30\nftp://b.com,30\n")
+        with pytest.raises(ValueError, match="line 3"):
+            load_targets(path)
+
+
+def _session_row(i, label="A"):
+    return {"run_started_at": "2025-12-01 10:00:00", "label": label,
+            "url": f"https://site{i % 7}.com", "attempts": 3, "successes": 3,
+            "failures": 0, "min_ms": 1.0, "max_ms": 3.0, "avg_ms": 2.0}
+
+
+def _write_rows_in_process(path, label, count):
+    from latency_utils.io_utils import ResultWriter
+
+    with ResultWriter(path, max_rows=7, max_age=60) as writer:
+        for i in range(count):
+            writer.write(_session_row(i, label))
+
+
+def test_result_writer_batches_and_threads():
+    import threading
+    from latency_utils.io_utils import ResultWriter, read_latency_csv
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.csv")
+        writer = ResultWriter(path, max_rows=25, max_age=60)
+
+        def produce(label):
+            for i in range(100):
+                writer.write(_session_row(i, label))
+
+        threads = [threading.Thread(target=produce, args=(f"T{n}",)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        writer.close()
+
+        df = read_latency_csv(path)
+        with open(path) as f:
+            headers = sum(1 for line in f if line.startswith("run_started_at"))
+
+    assert len(df) == writer.rows_written == 800
+    assert headers == 1
+    assert writer.flushes <= 800 // 25 + 8  # batched, not one write per row
+    assert df.groupby("label").size().tolist() == [100] * 8
+
+
+def test_result_writer_flushes_by_age():
+    from latency_utils.io_utils import ResultWriter
+
+    clock = FakeClock()
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.csv")
+        writer = ResultWriter(path, max_rows=100, max_age=5, clock=clock)
+        writer.write(_session_row(1))
+        writer.flush_if_due()
+        assert not os.path.exists(path)
+
+        clock.sleep(5)
+        writer.flush_if_due()
+        assert writer.rows_written == 1 and len(writer) == 0
+
+
+def test_result_writer_keeps_batch_when_write_fails():
+    from latency_utils.io_utils import ResultWriter, read_latency_csv
+
+    clock = FakeClock()
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.csv")
+        writer = ResultWriter(path, max_rows=100, max_age=5, clock=clock)
+        writer.write_many([_session_row(1), _session_row(2)])
+
+        def disk_full(rows):
+            raise OSError(28, "No space left on device")
+
+        writer.backend.append_rows = disk_full
+        with pytest.raises(OSError):
+            writer.flush()
+        assert len(writer) == 2 and writer.rows_written == 0
+
+        del writer.backend.append_rows  # the disk has room again
+        clock.sleep(1)
+        writer.write(_session_row(3))
+        clock.sleep(4)
+        writer.flush_if_due()  # still due from the first rows' age
+        assert writer.rows_written == 3
+        assert read_latency_csv(path)["url"].tolist() == ["https://site1.com", "https://site2.com", "https://site3.com"]
+
+
+def test_result_writer_processes_do_not_interleave():
+    import multiprocessing
+    from latency_utils.io_utils import read_latency_csv
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.csv")
+        workers = [multiprocessing.Process(target=_write_rows_in_process,
+                                           args=(path, f"P{n}", 300))
+                   for n in range(4)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+
+        df = read_latency_csv(path)
+
+    assert len(df) == 1200
+    assert df.groupby("label").size().tolist() == [300] * 4
+    assert (df["avg_ms"] == 2.0).all()
+
+
+def test_torn_row_is_repaired_before_append():
+    from latency_utils.io_utils import append_session_rows, read_latency_csv
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.csv")
+        append_session_rows([_session_row(1)], path)
+        with open(path, "a") as f:
+            f.write("2025-12-01 10:00:00,A,https://torn.com,3,")  # crash mid-row
+
+        append_session_rows([_session_row(2)], path)
+        df = read_latency_csv(path)
+
+    assert len(df) == 2
+    assert "https://torn.com" not in set(df["url"])
+
+
+def test_read_skips_torn_last_row():
+    from latency_utils.io_utils import append_session_rows, read_latency_csv
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.csv")
+        append_session_rows([_session_row(1), _session_row(2)], path)
+        with open(path, "a") as f:
+            f.write("2025-12-01 10:00:00,A,https://torn.com,3,")  # still being written
+        size = os.path.getsize(path)
+
+        df = read_latency_csv(path)
+        chunks = list(read_latency_csv(path, chunksize=1))
+        assert os.path.getsize(path) == size  # reading doesn't touch the file
+
+    assert len(df) == 2
+    assert "https://torn.com" not in set(df["url"])
+    assert df["failures"].dtype.kind == "i"  # no NaN from the half row
+    assert sum(len(chunk) for chunk in chunks) == 2
+
+
+def _random_rows(rng, count, urls=5, extra=False):
+    rows = []
+    for _ in range(count):
+        attempts = rng.randint(1, 10)
+        successes = rng.randint(1, attempts)
+        low = rng.uniform(5, 50)
+        row = {"run_started_at": "2025-12-01 10:00:00", "label": rng.choice("AB"),
+               "url": f"https://site{rng.randrange(urls)}.com", "attempts": attempts,
+               "successes": successes, "failures": attempts - successes,
+               "min_ms": round(low, 2), "max_ms": round(low + rng.uniform(0, 80), 2),
+               "avg_ms": round(low + rng.uniform(0, 40), 2)}
+        if extra:
+            row["dns_ms"] = round(rng.uniform(0, 5), 2)
+        rows.append(row)
+    return rows
+
+
+def test_incremental_analyzer_matches_full_reload():
+    import random
+    from pandas.testing import assert_frame_equal, assert_series_equal
+    from latency_utils.io_utils import append_session_rows
+
+    rng = random.Random(8)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.csv")
+        append_session_rows(_random_rows(rng, 50), path)
+        live = DataAnalyzer(path, incremental=True)
+        assert len(live.data) == 50
+
+        append_session_rows(_random_rows(rng, 30), path)
+        assert live.refresh() == 30
+        assert live.refresh() == 0  # nothing new since last time
+
+        # a row still being written is left for the next refresh
+        with open(path, "a") as f:
+            f.write("2025-12-01 10:00:00,A,https://site1.com,3")
+        assert live.refresh() == 0
+
+        append_session_rows(_random_rows(rng, 20), path)  # trims the torn row
+        assert live.refresh() == 20
+
+        full = DataAnalyzer(path)
+        assert_frame_equal(live.per_url_statistics(), full.per_url_statistics(),
+                           check_dtype=False, rtol=1e-9)
+        assert_series_equal(live.overall_statistics(), full.overall_statistics(),
+                            check_dtype=False, rtol=1e-9)
+        # refreshes only queued their chunks, the statistics didn't need them joined
+        assert len(live._pending) == 2 and len(live._data) == 50
+        assert_frame_equal(live.data, full.data)
+
+        # widening the header replaces the file, so the analyzer starts over
+        append_session_rows(_random_rows(rng, 10, extra=True), path)
+        live.refresh()
+        full = DataAnalyzer(path)
+        assert len(live.data) == 110
+        assert_frame_equal(live.per_url_statistics(), full.per_url_statistics(),
+                           check_dtype=False, rtol=1e-9)
+
+
+def test_vectorized_per_url_statistics_matches_legacy():
+    from pandas.testing import assert_frame_equal
+    from bench_per_url_statistics import legacy_per_url_statistics, synthetic_results
+
+    df = synthetic_results(5000)
+    assert_frame_equal(DataAnalyzer(dataframe=df).per_url_statistics(),
+                       legacy_per_url_statistics(df), check_exact=False, rtol=1e-12)
+
+
+def test_typed_loader_dtypes_memory_and_filter():
+    import random
+    import pandas as pd
+    from latency_utils.io_utils import append_session_rows, read_latency_csv, memory_footprint
+
+    rng = random.Random(10)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.csv")
+        rows = _random_rows(rng, 2000, urls=20)
+        rows[0]["url"] = "  https://site3.com "  # hand edited file with stray spaces
+        append_session_rows(rows, path)
+
+        df = read_latency_csv(path, verbose=True)
+        plain = pd.read_csv(path)
+        projected = read_latency_csv(path, usecols=["url"])
+
+        analyzer = DataAnalyzer(path)
+        site = analyzer.filter_by_value("url", "https://site3.com")
+        label = analyzer.filter_by_value("label", "A")
+
+    assert isinstance(df["url"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["label"].dtype, pd.CategoricalDtype)
+    assert "https://site3.com" in df["url"].cat.categories
+    assert "  https://site3.com " not in df["url"].cat.categories
+    assert pd.api.types.is_datetime64_any_dtype(df["run_started_at"])
+    assert df["attempts"].dtype.itemsize == 1
+    assert memory_footprint(df) < memory_footprint(plain) / 2
+
+    # projection still keeps what DataAnalyzer needs
+    assert "url" in projected.columns and "avg_ms" in projected.columns
+
+    assert (site["url"] == "https://site3.com").all() and len(site) > 0
+    assert (label["label"] == "A").all()
+    stats = DataAnalyzer(dataframe=site).per_url_statistics()
+    assert list(stats.index) == ["https://site3.com"]
+
+
+def test_chunked_aggregation_matches_single_pass():
+    import random
+    from latency_analysis.aggregates import aggregate_csv, aggregate_frame
+    from latency_utils.io_utils import append_session_rows, read_latency_csv
+
+    rng = random.Random(11)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.csv")
+        append_session_rows(_random_rows(rng, 1000), path)
+
+        whole = aggregate_frame(read_latency_csv(path))
+        chunked = aggregate_csv(path, chunksize=64)
+
+    assert whole.keys() == chunked.keys()
+    for url, agg in whole.items():
+        assert chunked[url].attempts == agg.attempts
+        assert chunked[url].min_ms == agg.min_ms
+        assert chunked[url].avg_ms == pytest.approx(agg.avg_ms, rel=1e-12)
+        assert chunked[url].std_ms == pytest.approx(agg.std_ms, rel=1e-9)
+
+
+def test_query_matches_boolean_masks():
+    import random
+    import pandas as pd
+    from pandas.testing import assert_frame_equal
+    from latency_utils.io_utils import append_session_rows
+
+    rng = random.Random(12)
+    rows = _random_rows(rng, 500, urls=8)
+    start = pd.Timestamp("2025-12-01 10:00:00")
+    for i, row in enumerate(rows):
+        row["run_started_at"] = str(start + pd.Timedelta(minutes=i))
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.csv")
+        append_session_rows(rows, path)
+        analyzer = DataAnalyzer(path)
+
+    df = analyzer.data
+    times = df["run_started_at"]
+    window = (times >= "2025-12-01 12:00:00") & (times <= "2025-12-01 14:00:00")
+    mask = (df["url"] == "https://site2.com") & (df["label"] == "B") & window
+
+    both = analyzer.query(url="https://site2.com", label="B",
+                          start="2025-12-01 12:00:00", end="2025-12-01 14:00:00")
+    assert_frame_equal(both.data, df[mask])
+
+    # a time window alone on an append-only file is one contiguous slice
+    assert_frame_equal(analyzer.query(start="2025-12-01 12:00:00",
+                                      end="2025-12-01 14:00:00").data, df[window])
+    assert len(analyzer.query(end="2025-12-01 10:09:00").data) == 10
+
+    assert_frame_equal(analyzer.filter_by_value("label", "A"), df[df["label"] == "A"])
+    assert analyzer.query(url="https://nowhere.com") is None
+    assert analyzer.query(url="https://site2.com", start="2030-01-01") is None
+
+
+def test_query_indexes_follow_refresh():
+    import random
+    from latency_utils.io_utils import append_session_rows
+
+    rng = random.Random(13)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.csv")
+        append_session_rows(_random_rows(rng, 40, urls=3), path)
+        live = DataAnalyzer(path, incremental=True)
+        before = len(live.query(url="https://site1.com").data)
+
+        new_rows = _random_rows(rng, 30, urls=3)
+        append_session_rows(new_rows, path)
+        live.refresh()
+
+    added = sum(row["url"] == "https://site1.com" for row in new_rows)
+    assert len(live.query(url="https://site1.com").data) == before + added
+
+
+def test_stats_cache_reused_and_invalidated_on_refresh():
+    import random
+    from latency_analysis.plots import Plots
+    from latency_utils.io_utils import append_session_rows
+
+    rng = random.Random(14)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.csv")
+        append_session_rows(_random_rows(rng, 40), path)
+        live = DataAnalyzer(path, incremental=True)
+
+        first = Plots(live)
+        Plots(live)
+        str(live)
+        assert live.stats_cache.misses == 2  # per_url + overall, once each
+        assert live.stats_cache.hits == 4
+
+        first.per_url_stats["avg_latency_ms"] = -1  # callers get copies
+        assert (live.per_url_statistics()["avg_latency_ms"] > 0).all()
+
+        version = live.data_version
+        assert live.refresh() == 0
+        assert live.data_version == version  # nothing new, cache kept
+
+        append_session_rows(_random_rows(rng, 10), path)
+        live.refresh()
+        assert live.data_version == version + 1
+        assert live.overall_statistics()["total_attempts"] == live.data["attempts"].sum()
+
+
+def test_stats_cache_persists_until_file_changes():
+    import random
+    from pandas.testing import assert_frame_equal
+    from latency_utils.io_utils import append_session_rows
+
+    rng = random.Random(15)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.csv")
+        append_session_rows(_random_rows(rng, 40), path)
+
+        first = DataAnalyzer(path, persist_stats=True)
+        expected = first.per_url_statistics()
+        assert os.path.exists(os.path.join(folder, "results_stats.pkl"))
+
+        # fresh analyzer, same file: served from disk
+        second = DataAnalyzer(path, persist_stats=True)
+        assert "per_url" in second.stats_cache
+        assert_frame_equal(second.per_url_statistics(), expected)
+        assert second.stats_cache.misses == 0
+
+        # the file changed, so the saved statistics are ignored
+        append_session_rows(_random_rows(rng, 5), path)
+        third = DataAnalyzer(path, persist_stats=True)
+        assert "per_url" not in third.stats_cache
+        assert third.overall_statistics()["total_attempts"] == third.data["attempts"].sum()
+
+        with pytest.raises(ValueError):
+            DataAnalyzer(path, incremental=True, persist_stats=True)
+
+
+def test_adaptive_session_stops_when_converged():
+    from latency.async_tester import AsyncProbeEngine
+    from standin_server import StandInServer
+
+    with StandInServer(delay=0.02) as server:
+        tester = LatencyTester(server.url, attempts=200, target_error=0.2, min_attempts=5)
+        tester.run_tests()
+
+        engine_tester = LatencyTester(server.url, attempts=200, target_error=0.2, min_attempts=5)
+        fixed = LatencyTester(server.url, attempts=3)
+        AsyncProbeEngine().run([engine_tester, fixed])
+
+    for t in (tester, engine_tester):
+        row = t.create_session_row()
+        assert t.converged
+        assert 5 <= row["samples_used"] == row["attempts"] < 200
+        assert 0 <= row["error_ms"] <= 0.2 * row["avg_ms"]
+        assert [r.attempt for r in t.results] == list(range(1, row["attempts"] + 1))
+    assert fixed.create_session_row()["attempts"] == 3
+    assert "samples_used" not in fixed.create_session_row()
+
+
+def test_adaptive_session_budgets_and_percentile_target():
+    import random
+    from latency.convergence import t_quantile
+    from latency.result import Result
+
+    assert t_quantile(0.975, 2) == pytest.approx(4.303, abs=1e-3)
+    assert t_quantile(0.975, 9) == pytest.approx(2.262, abs=1e-3)
+
+    # jittery endpoint: the attempt budget runs out before the p90 settles
+    rng = random.Random(16)
+    noisy = LatencyTester("https://noisy.example", attempts=30, target_error=0.01, quantile=0.9)
+    while not noisy.done():
+        noisy.record(Result(noisy.url, noisy.recorded + 1, rng.expovariate(1 / 50), 200, True))
+    row = noisy.create_session_row()
+    assert row["samples_used"] == 30 and row["converged"] is False
+    assert row["error_ms"] > 0
+
+    # a time budget stops the session too
+    timed = LatencyTester("https://noisy.example", attempts=1000, target_error=0.01, max_seconds=0)
+    assert timed.done() is False  # starts the clock
+    assert timed.done() is True
+
+    with pytest.raises(ValueError):
+        LatencyTester(attempts=3, target_error=0.05, min_attempts=5)
+    # the default minimum shrinks to fit a small budget
+    assert LatencyTester(attempts=3, target_error=0.05).min_attempts == 3
+    assert LatencyTester(attempts=200, target_error=0.05).min_attempts == 5
+    # one sample can't give an interval, say so instead of blaming min_attempts
+    with pytest.raises(ValueError, match="attempts >= 2"):
+        LatencyTester(attempts=1, target_error=0.05)
+
+
+def test_probe_farm_writes_every_row_exactly_once():
+    import multiprocessing
+    import pandas as pd
+    from latency_monitor.farm import ProbeFarm, shard_targets
+    from latency_monitor.scheduler import ProbeTarget
+    from standin_server import StandInServer
+
+    assert [len(s) for s in shard_targets(list(range(7)), 3)] == [3, 2, 2]
+    assert len(shard_targets([1], 4)) == 1
+
+    with StandInServer() as server, tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.csv")
+        targets = [ProbeTarget(server.url, label=f"T{i}", attempts=2) for i in range(40)]
+        farm = ProbeFarm(workers=3, csv_file_path=path, batch_size=4, flush_rows=7,
+                         mp_context=multiprocessing.get_context("fork"))
+        assert farm.run(targets) == 40
+        written = pd.read_csv(path)
+
+    assert farm.rows_written == 40
+    assert sorted(written["label"]) == sorted(t.label for t in targets)
+    assert (written["successes"] == 2).all()
+
+
+def test_probe_farm_reports_failed_worker(monkeypatch):
+    import multiprocessing
+    import pandas as pd
+    from latency_monitor import farm
+    from latency_monitor.scheduler import ProbeTarget
+    from standin_server import StandInServer
+
+    real_tester = farm.LatencyTester
+
+    def flaky_tester(url, label, **kwargs):
+        if label == "boom":
+            raise OSError("worker fell over")
+        return real_tester(url, label=label, **kwargs)
+
+    monkeypatch.setattr(farm, "LatencyTester", flaky_tester)  # inherited by forked workers
+
+    with StandInServer() as server, tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.csv")
+        targets = [ProbeTarget(server.url, label=f"T{i}", attempts=1) for i in range(4)]
+        targets.append(ProbeTarget(server.url, label="boom", attempts=1))
+        probe_farm = farm.ProbeFarm(workers=2, csv_file_path=path, batch_size=1,
+                                    mp_context=multiprocessing.get_context("fork"))
+        with pytest.raises(RuntimeError, match="worker fell over"):
+            probe_farm.run(targets)
+        written = pd.read_csv(path)
+
+    # the healthy worker's rows and the failed worker's earlier batches still land, once
+    assert sorted(written["label"]) == ["T0", "T1", "T2", "T3"]
+
+
+def test_result_list_round_trips_and_summarizes():
+    from latency.probe import phase_columns
+    from latency.result import Result, ResultList
+
+    phases = dict.fromkeys(phase_columns, 1.5)
+    originals = [
+        Result("https://a.com", i, float(i * 10), 200 if i % 3 else None, bool(i % 3),
+               reused=[None, False, True][i % 3], phases=phases if i > 4 else None,
+               timestamp=1000.0 + i)
+        for i in range(1, 20)
+    ]
+    results = ResultList()
+    results.extend(originals)
+
+    assert len(results) == 19
+    for old, new in zip(originals, results):
+        assert (new.url, new.attempt, new.elapsed_ms, new.status_code, new.ok, new.reused,
+                new.phases, new.timestamp) == (old.url, old.attempt, old.elapsed_ms,
+                                               old.status_code, old.ok, old.reused,
+                                               old.phases, old.timestamp)
+    assert results[-1].attempt == 19 and [r.attempt for r in results[2:4]] == [3, 4]
+
+    ok_ms = [r.elapsed_ms for r in originals if r.ok]
+    summary = results.summary()
+    assert summary == {"count": len(ok_ms), "min": min(ok_ms), "max": max(ok_ms),
+                       "mean": pytest.approx(sum(ok_ms) / len(ok_ms))}
+    assert ResultList().summary()["count"] == 0
+    assert results.nbytes() < 19 * 80  # phases included
+
+    with pytest.raises(ValueError):
+        results.append(Result("https://b.com", 1, 5.0, 200, True))
+    with pytest.raises(AttributeError):
+        originals[0].extra = 1  # __slots__, no per-instance dict
+
+
+def test_tester_results_stored_compactly():
+    from latency.result import Result, ResultList
+    from latency_utils.sample_store import SampleStore
+
+    tester = LatencyTester("https://a.com", attempts=1000, label="L")
+    for i in range(1, 1001):
+        tester.record(Result("https://a.com", i, float(i % 97), 200, i % 50 != 0, timestamp=float(i)))
+
+    row = tester.create_session_row()
+    summary = tester.results.summary()
+    assert isinstance(tester.results, ResultList)
+    assert (row["successes"], row["min_ms"], row["max_ms"]) == (summary["count"], summary["min"], summary["max"])
+    assert row["avg_ms"] == round(summary["mean"], 2)
+
+    with tempfile.TemporaryDirectory() as folder:
+        store = SampleStore(os.path.join(folder, "samples.bin"))
+        assert store.append(tester.results, "L") == 1000
+        samples = store.to_dataframe()
+    assert samples["ok"].sum() == 980
+    assert samples["elapsed_ms"].iloc[95] == 96  # attempt 96
+
+
+def _timed_rows(rng, count, start, step_minutes, extra=False):
+    import pandas as pd
+
+    rows = _random_rows(rng, count, extra=extra)
+    for i, row in enumerate(rows):
+        row["run_started_at"] = str(pd.Timestamp(start) + pd.Timedelta(minutes=i * step_minutes))
+    return rows
+
+
+def test_rollups_answer_ranges_exactly_at_coarsest_resolution():
+    import random
+    from pandas.testing import assert_frame_equal
+    from latency_utils.io_utils import append_session_rows
+
+    rng = random.Random(16)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.csv")
+        append_session_rows(_timed_rows(rng, 300, "2025-12-01 00:00:00", 17), path)
+        analyzer = DataAnalyzer(path, rollups=True)
+        append_session_rows(_timed_rows(rng, 100, "2025-12-04 12:00:00", 7), path)
+        # a wider header swaps the file out, already rolled up rows mustn't count twice
+        append_session_rows(_timed_rows(rng, 20, "2025-12-05 02:00:00", 3, extra=True), path)
+        full = DataAnalyzer(path)
+
+        store = analyzer.rollups
+        assert store.pick_resolution("2025-12-02", "2025-12-04") == "1d"
+        assert store.pick_resolution("2025-12-02 05:00", "2025-12-04") == "1h"
+        assert store.pick_resolution("2025-12-02 05:01", None) == "1min"
+        assert store.pick_resolution("2025-12-02 05:01:30", None) is None
+
+        for start, end, resolution in (("2025-12-02", "2025-12-04", "1d"),
+                                       ("2025-12-01 05:00", "2025-12-04 13:00", "1h"),
+                                       (None, None, "1d")):
+            by_rollup = analyzer.range_statistics(start, end)
+            by_raw = full.range_statistics(start, end)
+            assert by_rollup.attrs["resolution"] == resolution
+            assert by_raw.attrs["resolution"] == "raw"
+            by_raw = by_raw.drop(columns=[c for c in by_raw.columns if c.startswith("avg_") and c != "avg_latency_ms"])
+            assert_frame_equal(by_rollup, by_raw, check_dtype=False, rtol=1e-9)
+
+
+def test_rollups_take_a_replaced_file_as_new_rows():
+    import random
+    from latency_analysis.rollups import RollupStore
+    from latency_utils.io_utils import append_session_rows
+
+    rng = random.Random(19)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.csv")
+        old = _timed_rows(rng, 50, "2025-12-01 00:00:00", 7)
+        append_session_rows(old, path)
+        store = RollupStore(path)
+        assert store.update() == 50
+
+        # deleted and started over, and bigger than before by the next update
+        os.remove(path)
+        fresh = _timed_rows(rng, 80, "2025-12-10 00:00:00", 7)
+        append_session_rows(fresh, path)
+        assert store.update() == 80
+
+        table = store.load("1d")
+
+    # none of the new file's first 50 rows were skipped as already rolled up
+    assert table[table["bucket"] >= "2025-12-10"]["attempts"].sum() == sum(r["attempts"] for r in fresh)
+    assert table[table["bucket"] < "2025-12-10"]["attempts"].sum() == sum(r["attempts"] for r in old)
+
+
+def test_trim_rows_before_never_leaves_temp_file():
+    import datetime
+    import random
+    from latency_utils.io_utils import append_session_rows, trim_rows_before
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.csv")
+        open(path, "w").close()  # no header yet
+        assert trim_rows_before(path, datetime.datetime(2025, 12, 2)) == 0
+        assert os.listdir(folder) == ["results.csv"]
+
+        os.remove(path)
+        append_session_rows(_timed_rows(random.Random(10), 48, "2025-12-01 00:00:00", 60), path)
+        assert trim_rows_before(path, datetime.datetime(2025, 11, 1)) == 0  # nothing that old
+        assert trim_rows_before(path, datetime.datetime(2025, 12, 2)) > 0
+        assert sorted(os.listdir(folder)) == ["results.csv", "results.csv.lock"]
+
+
+def test_rollup_retention_keeps_history_bounded():
+    import random
+    import pandas as pd
+    from latency_analysis.rollups import RollupStore
+    from latency_utils.io_utils import append_session_rows, read_latency_csv
+
+    rng = random.Random(17)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.csv")
+        rows = _timed_rows(rng, 600, "2025-12-01 00:00:00", 10)  # ~4 days
+        append_session_rows(rows, path)
+        before = DataAnalyzer(path).per_url_statistics()
+
+        store = RollupStore(path, retention={"raw": pd.Timedelta(days=1), "1min": pd.Timedelta(days=2)})
+        dropped = store.compact(now="2025-12-05 04:00:00")
+        raw = read_latency_csv(path)
+        one_minute = store.load("1min")
+
+        analyzer = DataAnalyzer(path, rollups=store)
+        everything = analyzer.range_statistics()
+        old_window = analyzer.range_statistics("2025-12-01 03:05", "2025-12-01 05:55")
+        store.update()  # nothing new, nothing counted twice
+        again = analyzer.range_statistics()
+
+    assert dropped["raw"] == len(rows) - len(raw)
+    assert raw["run_started_at"].min() >= pd.Timestamp("2025-12-04 04:00:00")
+    assert one_minute["bucket"].min() >= pd.Timestamp("2025-12-03 04:00:00")
+    assert dropped["1min"] > 0 and dropped["1d"] == 0
+
+    # the coarse tables still hold the trimmed history, exactly
+    assert everything.attrs["resolution"] == "1d"
+    assert everything["attempts_total"].sum() == before["attempts_total"].sum()
+    assert everything["avg_latency_ms"].to_numpy() == pytest.approx(before["avg_latency_ms"].to_numpy())
+    assert again["attempts_total"].sum() == before["attempts_total"].sum()
+
+    # minute detail and raw rows are gone there, so whole hours answer it
+    assert old_window.attrs["resolution"] == "1h"
+
+
+def test_plots_render_headless_and_cap_large_url_sets():
+    import matplotlib.pyplot as plt
+    from latency_analysis.plots import Plots
+    from bench_per_url_statistics import synthetic_results
+
+    analyzer = DataAnalyzer(dataframe=synthetic_results(30_000))  # ~3000 URLs
+    plots = Plots(analyzer, max_bars=20, max_points=1000)
+
+    shown = plots.bar_frame("avg_latency_ms")
+    ranked = plots.per_url_stats["avg_latency_ms"].sort_values()
+    assert len(shown) == 20
+    assert list(shown.index) == list(ranked.index[:10]) + list(ranked.index[-10:])
+
+    with tempfile.TemporaryDirectory() as folder:
+        paths = plots.render_all(folder)
+        svg = Plots(analyzer, output_dir=folder, file_format="svg").plot_domain_vs_others(
+            "https://site1.com", "cv_latency")
+        assert len(paths) == 6 and all(os.path.getsize(p) > 0 for p in paths)
+        assert os.path.basename(paths[-1]) == "performance_vs_latency.png"
+        assert svg.endswith(".svg") and os.path.exists(svg)
+    assert plots.output_dir is None  # render_all's folder was only for that pass
+    assert plt.get_fignums() == []  # nothing left open in pyplot
+
+    with pytest.raises(ValueError):
+        Plots(analyzer, file_format="gif")
+
+
+def _latency_series(rng, levels, url="https://site.com", noise=0.05):
+    # levels: list of (sessions, mean ms), one row per session, 5 minutes apart
+    rows = []
+    for count, mean in levels:
+        for _ in range(count):
+            when = f"2025-12-01 {len(rows) * 5 // 60:02d}:{len(rows) * 5 % 60:02d}:00"
+            rows.append({"url": url, "label": "A", "run_started_at": when,
+                         "avg_ms": mean * (1 + rng.normal(0, noise))})
+    return rows
+
+
+def test_anomaly_detector_flags_step_changes_once():
+    import numpy as np
+    from latency_monitor.anomaly import AnomalyDetector, read_alerts
+
+    rng = np.random.default_rng(18)
+    with tempfile.TemporaryDirectory() as folder:
+        state = os.path.join(folder, "state.json")
+        alerts_path = os.path.join(folder, "alerts.jsonl")
+
+        # plain noise plus one big spike: nothing to report
+        quiet = _latency_series(rng, [(200, 100.0)])
+        quiet[120]["avg_ms"] = 400.0
+        assert AnomalyDetector(state, alerts_path).observe_rows(quiet) == []
+        os.remove(state)
+
+        rows = _latency_series(rng, [(60, 100.0), (60, 150.0), (60, 90.0)])
+        alerts = AnomalyDetector(state, alerts_path).observe_rows(rows)
+        assert read_alerts(alerts_path) == alerts
+
+    assert [a["direction"] for a in alerts] == ["up", "down"]
+    up, down = alerts
+    assert up["url"] == "https://site.com" and up["label"] == "A"
+    assert up["baseline_ms"] == pytest.approx(100, rel=0.05)
+    assert up["level_ms"] == pytest.approx(150, rel=0.05)
+    assert up["magnitude_pct"] == pytest.approx(50, abs=12)  # a few noisy sessions in, not exact
+    assert up["start"] == rows[60]["run_started_at"]  # where the step was, not where it was confirmed
+    assert down["start"] in {r["run_started_at"] for r in rows[120:124]}
+    assert down["level_ms"] == pytest.approx(90, rel=0.05)
+
+
+def test_anomaly_state_persists_and_writer_feeds_detector():
+    import numpy as np
+    from latency_monitor.anomaly import AnomalyDetector, read_alerts
+    from latency_utils.io_utils import ResultWriter
+
+    rng = np.random.default_rng(7)
+    rows = _latency_series(rng, [(40, 50.0), (30, 80.0)])
+    for row in rows:
+        row.update(attempts=5, successes=5, failures=0)
+
+    with tempfile.TemporaryDirectory() as folder:
+        state = os.path.join(folder, "state.json")
+        alerts_path = os.path.join(folder, "alerts.jsonl")
+        csv_path = os.path.join(folder, "results.csv")
+
+        # baseline learned by one detector is picked up by the next one
+        AnomalyDetector(state, alerts_path).observe_rows(rows[:40])
+        detector = AnomalyDetector(state, alerts_path)
+        assert detector.baselines["A|https://site.com"].mean == pytest.approx(50, rel=0.05)
+
+        with ResultWriter(csv_path, max_rows=10, listeners=[detector.observe_rows]) as writer:
+            writer.write_many(rows[40:])
+
+        alerts = read_alerts(alerts_path)
+        assert len(alerts) == 1
+        assert alerts[0]["direction"] == "up"
+        assert alerts[0]["start"] == rows[40]["run_started_at"]
+        assert writer.rows_written == 30
+
+
+def test_anomaly_detectors_in_two_processes_share_baselines():
+    import numpy as np
+    from latency_monitor.anomaly import AnomalyDetector
+
+    rng = np.random.default_rng(3)
+    a_rows = _latency_series(rng, [(20, 50.0)], url="https://a.com")
+    b_rows = _latency_series(rng, [(20, 80.0)], url="https://b.com")
+
+    with tempfile.TemporaryDirectory() as folder:
+        state = os.path.join(folder, "state.json")
+        alerts_path = os.path.join(folder, "alerts.jsonl")
+
+        # the daemon and a CLI probe, each with its own detector on the same files
+        daemon, cli = AnomalyDetector(state, alerts_path), AnomalyDetector(state, alerts_path)
+        for a_row, b_row in zip(a_rows, b_rows):
+            daemon.observe_rows([a_row])
+            cli.observe_rows([b_row, a_row])
+
+        # a detector that only saves (no observe_rows) keeps the others' baselines too
+        cli.observe(b_rows[0])
+        cli.save()
+
+        saved = AnomalyDetector(state, alerts_path).baselines
+
+    assert saved["A|https://a.com"].count == 40
+    assert saved["A|https://b.com"].count == 21
+
+
+def test_daemon_alerts_live_next_to_its_results_file(monkeypatch):
+    from latency_monitor import daemon
+
+    built = {}
+
+    class FakeDaemon:
+        sessions_run = rows_written = 0
+        scheduler = []
+
+        def __init__(self, targets, **kwargs):
+            built.update(kwargs)
+
+        def install_signal_handlers(self):
+            pass
+
+        def run(self):
+            pass
+
+    monkeypatch.setattr(daemon, "MonitorDaemon", FakeDaemon)
+    with tempfile.TemporaryDirectory() as folder:
+        targets = os.path.join(folder, "targets.csv")
+        with open(targets, "w") as f:
+            f.write("url\nhttps://site.com\n")
+        results = os.path.join(folder, "other", "results.csv")
+        daemon.main([targets, "--results", results, "--alerts"])
+
+    detector = built["detector"]
+    assert detector.state_path == os.path.join(folder, "other", "anomaly_state.json")
+    assert detector.alerts_path == os.path.join(folder, "other", "alerts.jsonl")
+
+
+def test_cli_probe_analyze_plot_clear(capsys):
+    from latency.cli import main
+    from standin_server import StandInServer
+
+    with StandInServer() as server, tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.csv")
+
+        assert main(["probe", server.url, "--attempts", "3", "--label", "CLI", "--samples", "--results", path]) == 0
+        assert main(["probe", "https://shflksdjflks.com", "--attempts", "1", "--results", path]) == 1
+        rows = DataAnalyzer(path).data
+        assert list(rows["url"]) == [server.url] and list(rows["label"]) == ["CLI"]
+        assert os.path.exists(os.path.join(folder, "samples.bin"))
+
+        capsys.readouterr()
+        assert main(["analyze", "--label", "CLI", "--results", path]) == 0
+        assert server.url in capsys.readouterr().out
+
+        assert main(["plot", "--results", path]) == 0
+        assert len(os.listdir(os.path.join(folder, "plots"))) == 6
+
+        assert main(["clear", "--yes", "--results", path]) == 0
+        left = set(os.listdir(folder))
+        for name in ("results.csv", "samples.bin", "results_stats.pkl", "anomaly_state.json"):
+            assert name not in left
+        assert main(["analyze", "--results", path]) == 1  # nothing left to analyze
+
+    with pytest.raises(SystemExit):
+        main(["probe", "not-a-url"])
+
+
+def test_cli_probe_does_not_import_pandas_or_matplotlib():
+    import subprocess
+    from standin_server import StandInServer
+
+    with StandInServer() as server, tempfile.TemporaryDirectory() as folder:
+        code = (
+            "import sys; from latency.cli import main; "
+            f"code = main(['probe', {server.url!r}, '--attempts', '2', '--results', {os.path.join(folder, 'r.csv')!r}]); "
+            "print(code, sorted(m for m in ('pandas', 'numpy', 'matplotlib', 'requests') if m in sys.modules))"
+        )
+        done = subprocess.run(
+            [sys.executable, "-c", code],
+            env=dict(os.environ, PYTHONPATH=src_path),
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+
+    assert done.returncode == 0, done.stderr
+    assert done.stdout.strip().splitlines()[-1] == "0 []"
+
+
+def test_installed_package_writes_results_under_cwd_or_env():
+    import shutil
+    import subprocess
+    from standin_server import StandInServer
+
+    with StandInServer() as server, tempfile.TemporaryDirectory() as folder:
+        # the packages alone in a fake site-packages, no project around them
+        site = os.path.join(folder, "lib", "python3", "site-packages")
+        for name in ("latency", "latency_utils", "latency_analysis", "latency_monitor"):
+            shutil.copytree(os.path.join(src_path, name), os.path.join(site, name),
+                            ignore=shutil.ignore_patterns("__pycache__"))
+        work = os.path.join(folder, "work")
+        os.makedirs(work)
+        env = dict(os.environ, PYTHONPATH=site)
+        env.pop("LATENCY_RESULTS_DIR", None)
+        probe = [sys.executable, "-m", "latency.cli", "probe", server.url, "--attempts", "2"]
+
+        done = subprocess.run(probe, cwd=work, env=env, capture_output=True, text=True, timeout=60)
+        assert done.returncode == 0, done.stdout + done.stderr
+        for name in ("results.csv", "anomaly_state.json"):
+            assert os.path.exists(os.path.join(work, "results", name))
+
+        elsewhere = os.path.join(folder, "data", "latency")
+        env["LATENCY_RESULTS_DIR"] = elsewhere
+        done = subprocess.run(probe, cwd=work, env=env, capture_output=True, text=True, timeout=60)
+        assert done.returncode == 0, done.stdout + done.stderr
+        assert os.path.exists(os.path.join(elsewhere, "results.csv"))
+
+
+def _sketched_rows(rng, count):
+    from latency.sketch import LatencySketch
+
+    rows = _timed_rows(rng, count, "2025-12-01 00:00:00", 7, extra=True)
+    for row in rows:
+        sketch = LatencySketch()
+        for _ in range(row["successes"]):
+            sketch.add(rng.uniform(row["min_ms"], row["max_ms"]))
+        row["sketch"] = sketch.to_string()
+    return rows
+
+
+def test_sqlite_backend_matches_csv_and_pushes_down():
+    import random
+    import sqlite3
+    from pandas.testing import assert_frame_equal, assert_series_equal
+    from latency_utils.io_utils import append_session_rows, delete_results_csv, open_backend
+
+    rng = random.Random(20)
+    rows = _sketched_rows(rng, 300)
+    rows[5]["url"] = " https://site1.com "  # stripped on the way in, like the csv loader does
+    rows.append(dict(rows[0], successes=0))  # skipped, like for the csv
+
+    with tempfile.TemporaryDirectory() as folder:
+        csv_path = os.path.join(folder, "results.csv")
+        db_path = os.path.join(folder, "results.db")
+        for path in (csv_path, db_path):
+            append_session_rows(rows[:100], path)
+            append_session_rows([{k: v for k, v in row.items() if k != "dns_ms"} for row in rows[100:150]], path)
+            append_session_rows(rows[150:], path)  # batches with and without a column
+
+        csv = DataAnalyzer(csv_path)
+        db = DataAnalyzer(db_path)
+        assert db.backend.kind == "sqlite" and db._lazy
+
+        # statistics come from SQL without loading a single row into pandas
+        assert_frame_equal(db.per_url_statistics(), csv.per_url_statistics(), check_dtype=False, rtol=1e-9)
+        assert_series_equal(db.overall_statistics(), csv.overall_statistics(), check_dtype=False, rtol=1e-9)
+        assert db._lazy
+
+        # filtered queries run in the database too, and match the pandas indexes
+        window = {"label": "A", "start": "2025-12-01 05:00:00", "end": "2025-12-01 20:00:00"}
+        assert_frame_equal(db.query(**window).data.reset_index(drop=True),
+                           csv.query(**window).data.reset_index(drop=True),
+                           check_dtype=False, check_categorical=False)
+        assert db.query(url="https://nowhere.com") is None
+        assert db._lazy
+
+        # loading everything gives the same typed frame as the csv
+        assert_frame_equal(db.data, csv.data, check_dtype=False, check_categorical=False)
+        assert str(db.data["url"].dtype) == "category"
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        index_columns = {name: [c[2] for c in conn.execute(f"PRAGMA index_info({name})")]
+                         for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        plan = " ".join(str(r) for r in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM sessions WHERE url = ? AND run_started_at >= ?", ("x", "y")))
+        conn.close()
+        assert index_columns == {"sessions_url_time": ["url", "run_started_at"],
+                                 "sessions_label_time": ["label", "run_started_at"]}
+        assert "sessions_url_time" in plan
+
+        delete_results_csv(db_path)
+        assert not os.path.exists(db_path)
+        with pytest.raises(FileNotFoundError):
+            DataAnalyzer(db_path)
+        with pytest.raises(ValueError):
+            DataAnalyzer(db_path, incremental=True)
+        assert open_backend(csv_path).kind == "csv"
+
+
+def test_results_backend_subclasses_must_implement_interface():
+    from latency_utils.io_utils import CsvBackend, ResultsBackend
+
+    class HalfBackend(ResultsBackend):
+        def append_rows(self, rows):
+            return len(rows)
+
+    with pytest.raises(TypeError):
+        HalfBackend("results.csv")  # no read_frame, columns, fingerprint or delete
+    assert not CsvBackend("results.csv").supports_aggregates
+
+
+def test_sqlite_backend_takes_concurrent_writers():
+    import multiprocessing
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.sqlite")
+        workers = [multiprocessing.get_context("fork").Process(
+            target=_write_rows_in_process, args=(path, f"P{n}", 300)) for n in range(4)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+
+        analyzer = DataAnalyzer(path, persist_stats=True)
+        stats = analyzer.per_url_statistics()
+        df = analyzer.data
+
+    assert all(w.exitcode == 0 for w in workers)
+    assert len(df) == 1200
+    assert df.groupby("label").size().tolist() == [300] * 4
+    assert stats["attempts_total"].sum() == 3600
+
+
+def test_open_loop_measures_stalls_closed_loop_hides():
+    from standin_server import StandInServer
+
+    with StandInServer() as server:
+        # 200 req/s for 1 s, the server freezes for 0.3 s in the middle
+        open_loop = LatencyTester(server.url, attempts=200, rate=200, max_in_flight=100)
+        server.stall_later(0.2, 0.3)
+        open_loop.run_tests()
+
+        closed_loop = LatencyTester(server.url, attempts=400)
+        server.stall_later(0.2, 0.3)
+        closed_loop.run_tests()
+
+    opened = open_loop.create_session_row()
+    closed = closed_loop.create_session_row()
+
+    # same row shape, open-loop only adds its own columns
+    assert set(closed) < set(opened)
+    assert opened["attempts"] == opened["successes"] == 200
+    assert opened["dropped"] == 0
+    assert opened["arrival"] == "constant" and opened["rate_per_s"] == 200
+    assert opened["max_ms"] >= 250
+
+    # every request meant to go out during the stall waited for it ...
+    slow_open = sum(1 for r in open_loop.results if r.ok and r.elapsed_ms > 50)
+    assert slow_open >= 40
+    # ... while the closed loop only sat through it once
+    slow_closed = sum(1 for r in closed_loop.results if r.ok and r.elapsed_ms > 50)
+    assert slow_closed <= 2
+    assert opened["avg_ms"] > 5 * closed["avg_ms"]
+
+
+def test_open_loop_schedule_late_and_dropped_sends():
+    from latency.async_tester import AsyncProbeEngine
+    from latency.open_loop import arrival_offsets
+    from standin_server import StandInServer
+
+    assert arrival_offsets(4, 3) == [0.0, 0.25, 0.5]
+    poisson = arrival_offsets(100, 2000, "poisson", seed=7)
+    assert poisson == arrival_offsets(100, 2000, "poisson", seed=7)
+    assert poisson[-1] / 1999 == pytest.approx(0.01, rel=0.1)
+
+    with pytest.raises(ValueError):
+        LatencyTester(rate=0)
+    with pytest.raises(ValueError):
+        LatencyTester(rate=10, arrival="bursty")
+    with pytest.raises(ValueError):
+        LatencyTester(rate=10, pooled=True)
+
+    with StandInServer() as server:
+        # only 2 requests in flight, so a stall backs the schedule up
+        tester = LatencyTester(
+            server.url, attempts=100, timeout=0.15, rate=200, arrival="poisson", seed=1, max_in_flight=2
+        )
+        server.stall_later(0.1, 0.4)
+        AsyncProbeEngine().run([tester])
+
+    row = tester.create_session_row()
+    assert row["attempts"] == row["successes"] + row["failures"] == 100
+    assert len(tester.results) == 100
+    assert row["late"] > 0
+    assert 0 < row["dropped"] <= row["failures"]
+    # the queueing behind busy slots only shows up from the intended send time
+    assert row["service_avg_ms"] < row["avg_ms"]
+
+
+def test_dns_cache_ttl_lru_negative_and_pins():
+    import socket
+    from latency.dns_cache import DnsCache
+
+    calls = []
+
+    def stub(host):
+        calls.append(host)
+        if host == "short.test":
+            return ["10.0.0.2"], 5  # the resolver's own TTL
+        if host.endswith(".test"):
+            return ["10.0.0.1", "::1"], None
+        raise socket.gaierror(socket.EAI_NONAME, "unknown host")
+
+    clock = FakeClock()
+    cache = DnsCache(max_hosts=2, ttl=60, negative_ttl=2, resolver=stub, clock=clock)
+
+    assert cache.resolve("a.test") == ["10.0.0.1", "::1"]
+    assert cache.resolve("A.TEST") == ["10.0.0.1", "::1"]  # hostnames aren't case sensitive
+    assert cache.resolve("short.test") == ["10.0.0.2"]
+    assert calls == ["a.test", "short.test"]
+
+    clock.sleep(10)  # past short.test's own TTL, within the default one
+    cache.resolve("short.test")
+    cache.resolve("a.test")
+    assert calls == ["a.test", "short.test", "short.test"]
+
+    # a third host evicts the least recently used one (short.test)
+    cache.resolve("b.test")
+    cache.resolve("a.test")
+    cache.resolve("short.test")
+    assert calls[-2:] == ["b.test", "short.test"]
+    assert cache.stats()["evictions"] == 2
+
+    # failures are remembered for negative_ttl only
+    for _ in range(3):
+        with pytest.raises(socket.gaierror):
+            cache.resolve("gone.example")
+    assert calls.count("gone.example") == 1
+    clock.sleep(3)
+    with pytest.raises(socket.gaierror):
+        cache.resolve("gone.example")
+    assert calls.count("gone.example") == 2
+
+    # pinned hosts never reach the resolver and survive clear()
+    cache.pin("gone.example", "127.0.0.1")
+    cache.clear()
+    assert cache.resolve("gone.example") == ["127.0.0.1"]
+    assert [a[4] for a in cache.addresses("a.test", 443)] == [("10.0.0.1", 443), ("::1", 443, 0, 0)]
+    with pytest.raises(ValueError):
+        cache.pin("x.test", "not-an-ip")
+
+    assert cache.resolve("127.0.0.1") == ["127.0.0.1"]
+    assert "127.0.0.1" not in calls
+
+
+def test_dns_cache_preresolves_and_marks_results():
+    from latency.async_tester import AsyncProbeEngine
+    from latency.dns_cache import DnsCache
+    from latency.result import Result, ResultList
+    from standin_server import StandInServer
+
+    calls = []
+
+    def stub(host):
+        calls.append(host)
+        return ["127.0.0.1"], None
+
+    with StandInServer() as server:
+        url = f"http://probe.test:{server.port}/"  # only the stub knows this name
+        cache = DnsCache(resolver=stub)
+
+        # every path resolves through the cache, after one lookup before the session
+        sessions = [LatencyTester(url, attempts=3, dns_cache=cache, **options)
+                    for options in ({}, {"instrumented": True}, {"rate": 100})]
+        for tester in sessions:
+            tester.run_tests()
+        engine_session = LatencyTester(url, attempts=3, dns_cache=cache)
+        AsyncProbeEngine().run([engine_session])
+
+        for tester in sessions + [engine_session]:
+            assert tester.create_session_row()["successes"] == 3
+            assert [r.dns_hit for r in tester.results] == [True] * 3
+        assert calls == ["probe.test"]
+
+        # a pin sends the host to a fixed IP without asking the resolver
+        cache.pin("pinned.test", "127.0.0.1")
+        pinned = LatencyTester(f"http://pinned.test:{server.port}/", attempts=2, dns_cache=cache)
+        pinned.run_tests()
+        assert pinned.create_session_row()["successes"] == 2
+        assert calls == ["probe.test"]
+
+        # without a cache nothing is flagged
+        plain = LatencyTester(server.url, attempts=2)
+        plain.run_tests()
+        assert [r.dns_hit for r in plain.results] == [None, None]
+
+    results = ResultList()
+    results.extend([Result(url, i, 1.0, 200, True, dns_hit=hit) for i, hit in enumerate((True, False, None))])
+    assert [r.dns_hit for r in results] == [True, False, None]
+
+
+def test_instrumentation_times_hot_paths_and_exports():
+    import json
+    import pstats
+    from standin_server import StandInServer
+    from latency_utils import instrumentation
+    from latency_utils.io_utils import append_session_row, append_session_rows, read_latency_csv
+
+    instrumentation.reset()
+    try:
+        # disabled: nothing recorded, the block still runs
+        with instrumentation.timer("tester.request"):
+            instrumentation.count("tester.failures")
+        assert instrumentation.snapshot() == {"timers": {}, "counters": {}}
+
+        instrumentation.enable(profile=["io.read_latency_csv"])
+        with StandInServer() as server, tempfile.TemporaryDirectory() as folder:
+            tester = LatencyTester(server.url, attempts=4)
+            tester.run_tests()
+            path = os.path.join(folder, "results.csv")
+            append_session_row(tester.create_session_row(), path)
+            read_latency_csv(path)
+            DataAnalyzer(path).per_url_statistics()
+
+            metrics = instrumentation.snapshot()
+            timers = metrics["timers"]
+            assert timers["tester.request"]["count"] == timers["tester.record"]["count"] == 4
+            # bookkeeping is a tiny fraction of the request itself
+            assert timers["tester.record"]["total_s"] < timers["tester.request"]["total_s"]
+            for stage in ("io.append_session_rows", "io.read_latency_csv", "analysis.per_url_statistics"):
+                assert timers[stage]["count"] >= 1
+                assert 0 <= timers[stage]["min_ms"] <= timers[stage]["mean_ms"] <= timers[stage]["max_ms"]
+            assert metrics["counters"]["io.rows_appended"] == 1
+
+            prom = instrumentation.prometheus_text()
+            assert '# TYPE latency_tool_stage_seconds summary' in prom
+            assert 'latency_tool_stage_seconds_count{stage="tester.request"} 4' in prom
+            assert 'latency_tool_events_total{name="io.rows_appended"} 1' in prom
+
+            saved = instrumentation.write_json(os.path.join(folder, "metrics.json"))
+            with open(saved) as f:
+                assert json.load(f)["timers"]["tester.request"]["count"] == 4
+
+            # the profiled stage has read_csv in its profile
+            stats = instrumentation.profile_stats("io.read_latency_csv")
+            assert any(function[2] == "read_csv" for function in stats.stats)
+            dumped = instrumentation.dump_profiles(os.path.join(folder, "profiles"))
+            assert len(dumped) == 1 and pstats.Stats(dumped[0]).total_calls > 0
+
+            # a chunked read is timed and counted as its chunks are consumed
+            from latency_analysis.aggregates import aggregate_csv
+
+            append_session_rows([tester.create_session_row()] * 4, path)
+            instrumentation.reset()
+            chunks = read_latency_csv(path, chunksize=2)
+            assert "io.read_latency_csv" not in instrumentation.snapshot()["timers"]
+            assert sum(len(chunk) for chunk in chunks) == 5
+            aggregate_csv(path, chunksize=2)
+            metrics = instrumentation.snapshot()
+            assert metrics["counters"]["io.rows_read"] == 10
+            assert metrics["timers"]["io.read_latency_csv"]["count"] == 2 * 4  # 3 chunks + end of file, twice
+    finally:
+        instrumentation.disable()
+        instrumentation.reset()
+
+
+def test_cli_writes_metrics_and_profiles():
+    from latency.cli import main
+    from standin_server import StandInServer
+    from latency_utils import instrumentation
+
+    instrumentation.reset()
+    try:
+        with StandInServer() as server, tempfile.TemporaryDirectory() as folder:
+            results = os.path.join(folder, "results.csv")
+            assert main(["probe", server.url, "--attempts", "2", "--results", results, "--no-alerts"]) == 0
+
+            metrics = os.path.join(folder, "metrics.prom")
+            assert main(["analyze", "--results", results, "--metrics", metrics,
+                         "--profile", "analysis.per_url_statistics"]) == 0
+            with open(metrics) as f:
+                text = f.read()
+            assert 'latency_tool_stage_seconds_count{stage="analysis.per_url_statistics"} 1' in text
+            assert os.path.exists(os.path.join(folder, "analysis.per_url_statistics.prof"))
+    finally:
+        instrumentation.disable()
+        instrumentation.reset()
+
+
+def test_standin_server_jitter_errors_and_periodic_stalls():
+    from latency.async_tester import AsyncProbeEngine
+    from standin_server import StandInServer
+
+    with StandInServer(delay=0.01, jitter=0.01, error_rate=0.3, seed=5) as server:
+        tester = LatencyTester(server.url, attempts=40)
+        AsyncProbeEngine(max_in_flight=10, per_host=10).run([tester])
+    statuses = [r.status_code for r in tester.results]
+    assert statuses.count(503) > 0 and statuses.count(200) > 0
+    latencies = [r.elapsed_ms for r in tester.results]
+    assert min(latencies) >= 10 and max(latencies) - min(latencies) > 2  # jitter spreads them
+
+    # error_status=None hangs up instead, the client sees a failure
+    with StandInServer(error_rate=1.0, error_status=None) as server:
+        tester = LatencyTester(server.url, attempts=3)
+        tester.run_tests()
+    assert tester.create_session_row()["failures"] == 3
+
+    # every request that lands in the first 0.2 s of each 0.5 s waits for the stall to end
+    with StandInServer(stall_every=0.5, stall_for=0.2) as server:
+        tester = LatencyTester(server.url, attempts=1)
+        tester.run_tests()
+    assert tester.results[0].elapsed_ms >= 100
+
+
+def test_bench_suite_compare_gates_regressions(capsys):
+    import json
+    from bench_suite import compare, main, metric
+
+    baseline = {"metrics": {
+        "io.read_rows_per_s@1000": metric(1000.0, "rows/s", "higher"),
+        "analysis.per_url_s@1000": metric(2.0, "s", "lower"),
+        "probe.http.attempts_per_s": metric(500.0, "attempts/s", "higher", 0.35),
+        "plots.render_all_s@10000": metric(4.0, "s", "lower"),
+    }}
+    current = {"metrics": {
+        "io.read_rows_per_s@1000": metric(700.0, "rows/s", "higher"),  # 30% less throughput
+        "analysis.per_url_s@1000": metric(1.0, "s", "lower"),  # twice as fast
+        "probe.http.attempts_per_s": metric(400.0, "attempts/s", "higher"),  # within its own tolerance
+        "io.append_rows_per_s@1000": metric(9.0, "rows/s", "higher"),
+    }}
+
+    report = {name: (change, status) for name, _, _, change, status in compare(baseline, current, 0.2)}
+    assert report["io.read_rows_per_s@1000"] == (pytest.approx(0.3), "regressed")
+    assert report["analysis.per_url_s@1000"] == (pytest.approx(-0.5), "improved")
+    assert report["probe.http.attempts_per_s"][1] == "ok"
+    assert report["plots.render_all_s@10000"][1] == "missing"
+    assert report["io.append_rows_per_s@1000"][1] == "new"
+    looser = {row[0]: row[4] for row in compare(baseline, current, 0.5)}
+    assert looser["io.read_rows_per_s@1000"] == "ok"  # a looser gate lets the 30% through
+
+    # a run narrowed with --only skips the groups it left out instead of failing on them
+    narrowed = {**current, "settings": {"include": ["probe", "io"]}}
+    assert {row[0]: row[4] for row in compare(baseline, narrowed, 0.2)}["plots.render_all_s@10000"] == "skipped"
+
+    with tempfile.TemporaryDirectory() as folder:
+        paths = []
+        for name, document in (("baseline", baseline), ("current", current)):
+            paths.append(os.path.join(folder, f"{name}.json"))
+            with open(paths[-1], "w") as f:
+                json.dump(document, f)
+
+        assert main(["compare", *paths]) == 1
+        assert "FAIL: 1 metric(s) regressed" in capsys.readouterr().out
+        # the 30% passes the looser gate, the plot that never ran still fails it
+        assert main(["compare", *paths, "--threshold", "0.5"]) == 1
+        assert "missing from the run: plots.render_all_s@10000" in capsys.readouterr().out
+        assert main(["compare", paths[0], paths[0]]) == 0
+
+        with open(paths[1], "w") as f:
+            json.dump(narrowed, f)
+        assert main(["compare", *paths, "--threshold", "0.5"]) == 0
+
+
+def test_partitioned_analyzer_matches_single_file():
+    import random
+    from pandas.testing import assert_frame_equal, assert_series_equal
+    from latency_analysis.partitions import append_partitioned_rows
+    from latency_utils.io_utils import append_session_rows
+
+    rng = random.Random(25)
+    with tempfile.TemporaryDirectory() as folder:
+        root = os.path.join(folder, "partitions")
+        path = os.path.join(folder, "results.csv")
+        for host in ("probe-a", "probe-b", "probe-c"):
+            rows = _sketched_rows(rng, 400)  # 2025-12-01 .. 2025-12-02 every 7 minutes
+            assert append_partitioned_rows(rows, root, host) == 400
+            append_session_rows(rows, path)
+
+        full = DataAnalyzer(path)
+        parted = DataAnalyzer(partitions=root, workers=2)
+        assert len(parted.backend.partitions) == 6  # 3 hosts x 2 days
+        assert parted._lazy  # statistics came from the merged partials, no rows loaded
+        assert_frame_equal(parted.per_url_statistics(), full.per_url_statistics(), check_dtype=False, rtol=1e-9)
+        assert_series_equal(parted.overall_statistics(), full.overall_statistics(), check_dtype=False, rtol=1e-9)
+
+        # a time range narrows to the rows inside it, in the pool or not
+        start, end = "2025-12-01 20:00:00", "2025-12-02 03:30:00"
+        expected = full.query(start=start, end=end).per_url_statistics()
+        for workers in (1, 3):
+            ranged = DataAnalyzer(partitions=root, start=start, end=end, workers=workers)
+            assert_frame_equal(ranged.per_url_statistics(), expected, check_dtype=False, rtol=1e-9)
+        assert len(ranged.data) == len(full.query(start=start, end=end).data)
+
+        # a glob picks hosts, query still filters the rows
+        one_host = DataAnalyzer(partitions=os.path.join(root, "host=probe-b", "**", "*.csv"), workers=1)
+        assert {p.host for p in one_host.backend.partitions} == {"probe-b"}
+        assert one_host.overall_statistics()["total_attempts"] < full.overall_statistics()["total_attempts"]
+        site = one_host.query(url="https://site1.com")
+        assert set(site.data["url"]) == {"https://site1.com"}
+
+        with pytest.raises(ValueError):
+            DataAnalyzer(partitions=root, start="2026-01-01")
+        with pytest.raises(ValueError):
+            DataAnalyzer(path, start=start)
+
+
+def test_partitions_pruned_from_metadata_without_opening():
+    import random
+    from latency_analysis.partitions import PartitionSet, append_partitioned_rows, meta_suffix, partition_path
+
+    rng = random.Random(52)
+    with tempfile.TemporaryDirectory() as folder:
+        root = os.path.join(folder, "partitions")
+        append_partitioned_rows(_timed_rows(rng, 30, "2025-12-01 08:00:00", 60), root, "probe-a")  # 12-01 .. 12-02 13:00
+        append_partitioned_rows(_timed_rows(rng, 10, "2025-12-03 01:00:00", 5), root, "probe-a")
+        append_partitioned_rows(_timed_rows(rng, 10, "2025-12-03 09:00:00", 5), root, "probe-a")  # same partition, meta widens
+
+        day1 = partition_path(root, "2025-12-01", "probe-a")
+        day2 = partition_path(root, "2025-12-02", "probe-a")
+        day3 = partition_path(root, "2025-12-03", "probe-a")
+        parts = {p.path: p for p in PartitionSet(root).found}
+        assert parts[day3].rows == 20
+        assert str(parts[day3].start) == "2025-12-03 01:00:00"
+        assert str(parts[day3].end) == "2025-12-03 09:45:00"
+
+        # ruin the out of range partitions: opening either one would fail
+        with open(day1, "w") as f:
+            f.write('not,a\n"results file')
+        os.remove(day2 + meta_suffix)  # no metadata: the date= folder bounds it
+        with open(day2, "w") as f:
+            f.write('not,a\n"results file')
+
+        analyzer = DataAnalyzer(partitions=root, start="2025-12-03 05:00:00", workers=2)
+        assert [p.path for p in analyzer.backend.partitions] == [day3]
+        assert analyzer.overall_statistics()["total_attempts"] == analyzer.data["attempts"].sum()
+        assert len(analyzer.data) == 10
+
+        # the metadata is tight: a window after the last row skips day 3 too
+        with pytest.raises(ValueError):
+            DataAnalyzer(partitions=root, start="2025-12-03 10:00:00")
+
+        # a file with no metadata and no date= folder can't be pruned, it's always read
+        loose = os.path.join(root, "host=probe-b", "old.csv")
+        os.makedirs(os.path.dirname(loose))
+        with open(day3) as src, open(loose, "w") as dst:
+            dst.write(src.read())
+        analyzer = DataAnalyzer(partitions=root, start="2025-12-03 05:00:00", workers=1)
+        assert len(analyzer.backend.partitions) == 2
+        assert len(analyzer.data) == 20